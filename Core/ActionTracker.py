@@ -52,38 +52,16 @@ class ActionTracker:
                 return None
             
             ActionId = str(uuid.uuid4())
-            StartTime = datetime.now().isoformat()
             
-            # Add to database
-            ColumnDict = {
+            # Add to database and session state
+            self.StoreAction(SessionId, {
                 "ActionId": ActionId,
-                "SessionId": SessionId,
                 "ActionType": ActionType,
-                "StartTime": StartTime,
+                "StartTime": datetime.now().isoformat(),
                 "Status": "STARTED",
-                "Params": json.dumps(Params) if Params else None
-            }
-            
-            with self.ActionLock:
-                self.DatabaseManager.InsertWithId("Actions", ColumnDict)
-            
-            # Update session state
-            State = self.SessionManager.LoadSessionState()
-            if State:
-                if "Actions" not in State:
-                    State["Actions"] = []
-                
-                Action = {
-                    "ActionId": ActionId,
-                    "ActionType": ActionType,
-                    "StartTime": StartTime,
-                    "Status": "STARTED",
-                    "Params": Params,
-                    "Result": None
-                }
-                
-                State["Actions"].append(Action)
-                self.SessionManager.SaveSessionState(State)
+                "Params": Params,
+                "Result": None
+            })
             
             self.Logger.info(f"Action {ActionType} recorded with ID {ActionId}")
             
@@ -101,6 +79,50 @@ class ActionTracker:
             self.Logger.error(f"Error recording action: {e}")
             return None
     
+    def SerializeValue(self, Value):
+        """
+        Serialize the params or result of an action for its Actions row.
+        
+        A value json cannot encode is replaced by its repr, so an action that
+        has already run is still recorded.
+        
+        Args:
+            Value (Any): Value to serialize
+            
+        Returns:
+            tuple: (value to keep in session state, JSON text)
+        """
+        try:
+            return Value, json.dumps(Value)
+        except (TypeError, ValueError) as e:
+            self.Logger.warning(f"Recording repr of a value that cannot be serialized: {e}")
+            Value = {"Unserializable": repr(Value)}
+            return Value, json.dumps(Value)
+    
+    def StoreAction(self, SessionId, Action):
+        """
+        Insert an action into the Actions table and append it to the session state.
+        
+        Args:
+            SessionId (str): Session the action belongs to
+            Action (dict): Action as kept in session state; Params and Result are
+                replaced by serializable values if needed
+        """
+        Row = dict(Action, SessionId=SessionId, Params=None, Result=None)
+        if Action["Params"]:
+            Action["Params"], Row["Params"] = self.SerializeValue(Action["Params"])
+        if Action["Result"] is not None:
+            Action["Result"], Row["Result"] = self.SerializeValue(Action["Result"])
+        
+        with self.ActionLock:
+            self.DatabaseManager.InsertWithId("Actions", Row)
+        
+        # Update session state
+        State = self.SessionManager.LoadSessionState()
+        if State:
+            State.setdefault("Actions", []).append(Action)
+            self.SessionManager.SaveSessionState(State)
+    
     def CompleteAction(self, ActionId, Result=None, Status="COMPLETED"):
         """
         Mark an action as completed with its result.
@@ -122,10 +144,13 @@ class ActionTracker:
             EndTime = datetime.now().isoformat()
             
             # Update database
+            ResultJson = None
+            if Result is not None:
+                Result, ResultJson = self.SerializeValue(Result)
             UpdateDict = {
                 "EndTime": EndTime,
                 "Status": Status,
-                "Result": json.dumps(Result) if Result is not None else None
+                "Result": ResultJson
             }
             
             WhereClause = "ActionId = ?"
@@ -162,7 +187,7 @@ class ActionTracker:
             self.Logger.error(f"Error completing action: {e}")
             return False
     
-    def ExecuteAction(self, ActionType, ActionFunction, Params=None):
+    def ExecuteAction(self, ActionType, ActionFunction, Params=None, Durable=True):
         """
         Execute an action with tracking.
         
@@ -173,10 +198,16 @@ class ActionTracker:
             ActionType (str): Type of action being performed
             ActionFunction (callable): Function to execute
             Params (dict, optional): Parameters for the function
+            Durable (bool, optional): Record the start before running, so a crash
+                leaves a STARTED action behind. When False, the action is written
+                once, after it finishes.
             
         Returns:
             tuple: (success, result, action_id)
         """
+        if not Durable:
+            return self.ExecuteActionDeferred(ActionType, ActionFunction, Params)
+        
         try:
             # Record the action
             ActionId = self.RecordAction(ActionType, Params)
@@ -206,6 +237,72 @@ class ActionTracker:
             self.Logger.error(f"Error executing action: {e}")
             return (False, {"Error": str(e)}, None)
     
+    def ExecuteActionDeferred(self, ActionType, ActionFunction, Params=None):
+        """
+        Execute an action and record its start and end with a single write.
+        
+        Args:
+            ActionType (str): Type of action being performed
+            ActionFunction (callable): Function to execute
+            Params (dict, optional): Parameters for the function
+            
+        Returns:
+            tuple: (success, result, action_id)
+        """
+        try:
+            SessionId = self.SessionManager.SessionId
+            if not SessionId:
+                self.Logger.warning("No active session to record action for")
+                return (False, {"Error": "Failed to record action"}, None)
+            
+            ActionId = str(uuid.uuid4())
+            StartTime = datetime.now().isoformat()
+            
+            try:
+                # Execute the function
+                if Params:
+                    Result = ActionFunction(**Params)
+                else:
+                    Result = ActionFunction()
+                Success = True
+                Status = "COMPLETED"
+            except Exception as e:
+                Result = {
+                    "Error": str(e),
+                    "ErrorType": type(e).__name__
+                }
+                Success = False
+                Status = "FAILED"
+                self.Logger.error(f"Action {ActionType} failed: {str(e)}")
+            
+            # Add the finished action to the database and session state
+            Action = {
+                "ActionId": ActionId,
+                "ActionType": ActionType,
+                "StartTime": StartTime,
+                "EndTime": datetime.now().isoformat(),
+                "Status": Status,
+                "Params": Params,
+                "Result": Result
+            }
+            self.StoreAction(SessionId, Action)
+            
+            self.Logger.info(f"Action {ActionId} completed with status {Status}")
+            
+            # Log to database
+            self.DatabaseManager.LogToDatabase(
+                "INFO",
+                "ActionTracker",
+                f"Action {ActionType} completed with status {Status}",
+                SessionId,
+                {"ActionId": ActionId, "Params": Action["Params"], "Result": Action["Result"]}
+            )
+            
+            return (Success, Result, ActionId)
+        except Exception as e:
+            self.Logger.error(f"Error executing action: {e}")
+            return (False, {"Error": str(e)}, None)
+    
     def GetActionById(self, ActionId):
         """
         Get an action by its ID.
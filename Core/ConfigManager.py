@@ -6,10 +6,14 @@
 # Description: Manages application configuration stored in the database
 
 import json
+import time
 import logging
 from datetime import datetime
 import threading
 
+# Marks a cache miss, since None is a valid cached value
+_MISSING = object()
+
 class ConfigManager:
     """
     Manages application configuration from database.
@@ -21,10 +25,16 @@ class ConfigManager:
     - Type conversion for configuration values
     """
     
+    # Seconds a key found missing is answered from the cache; another
+    # ConfigManager or connection may create it in the meantime
+    MISSING_KEY_TTL = 5.0
+    
     def __init__(self, DatabaseManager):
         """Initialize the configuration manager."""
         self.DatabaseManager = DatabaseManager
         self.ConfigCache = {}
+        # Keys found absent from the database, mapped to when that answer expires
+        self.MissingKeys = {}
         self.CacheLock = threading.RLock()
         
         # Set up logging
@@ -44,6 +54,7 @@ class ConfigManager:
             
             with self.CacheLock:
                 self.ConfigCache.clear()
+                self.MissingKeys.clear()
                 for Row in Rows:
                     Key = Row['ConfigKey']
                     Value = self.ConvertValueFromString(Row['ConfigValue'], Row['ConfigType'])
@@ -119,9 +130,15 @@ class ConfigManager:
         Returns:
             Any: Configuration value
         """
-        with self.CacheLock:
-            if Key in self.ConfigCache:
-                return self.ConfigCache[Key]
+        # Cache hits are read without the lock; single dict and set lookups are
+        # atomic, and every writer still updates the cache under CacheLock
+        Value = self.ConfigCache.get(Key, _MISSING)
+        if Value is not _MISSING:
+            return Value
+        
+        Expiry = self.MissingKeys.get(Key)
+        if Expiry is not None and time.monotonic() < Expiry:
+            return DefaultValue
         
         # If not in cache, try to load from database
         try:
@@ -142,6 +159,9 @@ class ConfigManager:
                 
                 return Value
             else:
+                with self.CacheLock:
+                    self.MissingKeys[Key] = time.monotonic() + self.MISSING_KEY_TTL
+                
                 # If we have a default value supplied, use it
                 if DefaultValue is not None:
                     return DefaultValue
@@ -214,6 +234,7 @@ class ConfigManager:
             # Update cache
             with self.CacheLock:
                 self.ConfigCache[Key] = Value
+                self.MissingKeys.pop(Key, None)
             
             self.Logger.info(f"Configuration '{Key}' set to '{Value}'")
             return True
@@ -239,6 +260,7 @@ class ConfigManager:
             with self.CacheLock:
                 if Key in self.ConfigCache:
                     del self.ConfigCache[Key]
+                self.MissingKeys[Key] = time.monotonic() + self.MISSING_KEY_TTL
             
             self.Logger.info(f"Configuration '{Key}' deleted")
             return RowsAffected > 0
@@ -33,13 +33,14 @@ class ContinuityDocGenerator:
         
         self.Logger.info("ContinuityDocGenerator initialized")
     
-    def GenerateContinuityDocument(self, ResumedFrom=None, Final=False):
+    def GenerateContinuityDocument(self, ResumedFrom=None, Final=False, OutputPath=None):
         """
         Generate a session continuity document.
         
         Args:
             ResumedFrom (str, optional): ID of session being resumed
             Final (bool, optional): Whether this is a final document for a completed session
+            OutputPath (str, optional): Where to write the document (defaults to the session directory)
             
         Returns:
             str: Path to the generated document
@@ -51,7 +52,10 @@ class ContinuityDocGenerator:
                 return None
             
             # Get directory paths based on session status
-            if Final:
+            if OutputPath:
+                DocPath = OutputPath
+                os.makedirs(os.path.dirname(DocPath) or ".", exist_ok=True)
+            elif Final:
                 CompletedSessionDir = self.SessionManager.CompletedSessionDir
                 DocPath = f"{CompletedSessionDir}/{SessionId}/continuity.md"
                 os.makedirs(os.path.dirname(DocPath), exist_ok=True)
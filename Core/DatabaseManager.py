@@ -6,11 +6,181 @@
 # Description: Manages database connections and operations with transaction support
 
 import os
+import atexit
 import sqlite3
-import json
+import queue
 import threading
+from contextlib import contextmanager
 from datetime import datetime
 import logging
+import logging.handlers
+
+from Core.JsonUtils import DumpJson
+
+# Schema for all tables, executed as a single script by InitializeDatabase
+SCHEMA_SQL = """
+-- Sessions table
+CREATE TABLE IF NOT EXISTS Sessions (
+    SessionId TEXT PRIMARY KEY,
+    StartTime TEXT,
+    EndTime TEXT,
+    Status TEXT,
+    Summary TEXT
+);
+
+-- conversations table
+CREATE TABLE IF NOT EXISTS Conversations (
+    MessageId TEXT PRIMARY KEY,
+    SessionId TEXT,
+    Timestamp TEXT,
+    Source TEXT,
+    Content TEXT,
+    FOREIGN KEY (SessionId) REFERENCES Sessions (SessionId)
+);
+
+-- actions table
+CREATE TABLE IF NOT EXISTS Actions (
+    ActionId TEXT PRIMARY KEY,
+    SessionId TEXT,
+    ActionType TEXT,
+    StartTime TEXT,
+    EndTime TEXT,
+    Status TEXT,
+    Params TEXT,
+    Result TEXT,
+    FOREIGN KEY (SessionId) REFERENCES Sessions (SessionId)
+);
+
+-- models table
+CREATE TABLE IF NOT EXISTS Models (
+    ModelId TEXT PRIMARY KEY,
+    ModelName TEXT,
+    ModelType TEXT,
+    Location TEXT,
+    Status TEXT,
+    LastUsed TEXT,
+    Capabilities TEXT
+);
+
+-- routing rules table
+CREATE TABLE IF NOT EXISTS RoutingRules (
+    RuleId TEXT PRIMARY KEY,
+    TaskType TEXT,
+    PreferredModel TEXT,
+    FallbackModel TEXT,
+    Priority INTEGER,
+    FOREIGN KEY (PreferredModel) REFERENCES Models (ModelId),
+    FOREIGN KEY (FallbackModel) REFERENCES Models (ModelId)
+);
+
+-- state snapshots table
+CREATE TABLE IF NOT EXISTS StateSnapshots (
+    SnapshotId TEXT PRIMARY KEY,
+    SessionId TEXT,
+    Timestamp TEXT,
+    StateData TEXT,
+    FOREIGN KEY (SessionId) REFERENCES Sessions (SessionId)
+);
+
+-- session relationships table
+CREATE TABLE IF NOT EXISTS SessionRelationships (
+    RelationshipId INTEGER PRIMARY KEY AUTOINCREMENT,
+    ParentSessionId TEXT,
+    ChildSessionId TEXT,
+    RelationType TEXT,
+    FOREIGN KEY (ParentSessionId) REFERENCES Sessions (SessionId),
+    FOREIGN KEY (ChildSessionId) REFERENCES Sessions (SessionId)
+);
+
+-- configuration table
+CREATE TABLE IF NOT EXISTS Configuration (
+    ConfigKey TEXT PRIMARY KEY,
+    ConfigValue TEXT,
+    ConfigType TEXT,
+    DefaultValue TEXT,
+    Description TEXT,
+    LastModified TEXT
+);
+
+-- validation rules table
+CREATE TABLE IF NOT EXISTS ValidationRules (
+    RuleId TEXT PRIMARY KEY,
+    RuleType TEXT,
+    Pattern TEXT,
+    ErrorMessage TEXT,
+    Description TEXT
+);
+
+-- input fields table
+CREATE TABLE IF NOT EXISTS InputFields (
+    FieldId TEXT PRIMARY KEY,
+    FieldName TEXT,
+    ValidationRuleId TEXT,
+    Required INTEGER,
+    Description TEXT,
+    FOREIGN KEY (ValidationRuleId) REFERENCES ValidationRules (RuleId)
+);
+
+-- log table
+CREATE TABLE IF NOT EXISTS SystemLogs (
+    LogId INTEGER PRIMARY KEY AUTOINCREMENT,
+    Timestamp TEXT,
+    LogLevel TEXT,
+    Component TEXT,
+    Message TEXT,
+    SessionId TEXT,
+    AdditionalData TEXT
+);
+
+-- schema version table
+CREATE TABLE IF NOT EXISTS SchemaVersion (
+    VersionId INTEGER PRIMARY KEY AUTOINCREMENT,
+    VersionNumber TEXT,
+    AppliedAt TEXT,
+    Description TEXT
+);
+
+-- indexes
+CREATE INDEX IF NOT EXISTS IX_Conversations_SessionId_Timestamp ON Conversations (SessionId, Timestamp);
+CREATE INDEX IF NOT EXISTS IX_StateSnapshots_SessionId_Timestamp ON StateSnapshots (SessionId, Timestamp DESC);
+CREATE INDEX IF NOT EXISTS IX_SessionRelationships_Child ON SessionRelationships (ChildSessionId, RelationType);
+CREATE INDEX IF NOT EXISTS IX_SessionRelationships_Parent ON SessionRelationships (ParentSessionId);
+CREATE INDEX IF NOT EXISTS IX_Sessions_Status_StartTime ON Sessions (Status, StartTime DESC);
+CREATE INDEX IF NOT EXISTS IX_Sessions_StartTime ON Sessions (StartTime DESC);
+"""
+
+# Unique keys on rule types and field names. Databases created before these keys
+# existed may hold duplicates, so the newest row (highest rowid) of each is kept,
+# fields are pointed at the surviving rule, and the rest are removed first.
+UNIQUE_KEYS_SQL = """
+BEGIN;
+
+UPDATE InputFields
+SET ValidationRuleId = (
+    SELECT k.RuleId FROM ValidationRules k
+    WHERE k.RuleType = (SELECT r.RuleType FROM ValidationRules r WHERE r.RuleId = InputFields.ValidationRuleId)
+    ORDER BY k.rowid DESC
+    LIMIT 1
+)
+WHERE ValidationRuleId IN (
+    SELECT RuleId FROM ValidationRules
+    WHERE RuleType IS NOT NULL
+      AND rowid NOT IN (SELECT MAX(rowid) FROM ValidationRules GROUP BY RuleType)
+);
+
+DELETE FROM ValidationRules
+WHERE RuleType IS NOT NULL
+  AND rowid NOT IN (SELECT MAX(rowid) FROM ValidationRules GROUP BY RuleType);
+
+DELETE FROM InputFields
+WHERE FieldName IS NOT NULL
+  AND rowid NOT IN (SELECT MAX(rowid) FROM InputFields GROUP BY FieldName);
+
+CREATE UNIQUE INDEX IF NOT EXISTS UX_ValidationRules_RuleType ON ValidationRules (RuleType);
+CREATE UNIQUE INDEX IF NOT EXISTS UX_InputFields_FieldName ON InputFields (FieldName);
+
+COMMIT;
+"""
 
 class DatabaseManager:
     """
@@ -24,17 +194,38 @@ class DatabaseManager:
     - Database migration
     """
     
+    # Number of parameter sets sent to a single executemany call
+    BATCH_SIZE = 500
+    
+    # Pages copied per backup step, with a short pause between steps so writers can proceed
+    BACKUP_PAGES = 256
+    BACKUP_SLEEP_SECONDS = 0.001
+    
     def __init__(self, DbPath="State/AIDevHub.db"):
         """Initialize the database manager."""
         self.DbPath = DbPath
+        # "file:" paths are SQLite URIs, e.g. shared in-memory databases for tests
+        self.UseUri = DbPath.startswith("file:")
         self.ConnectionLock = threading.Lock()
         self.LocalStorage = threading.local()
         
+        # Background writer for SystemLogs entries
+        self.LogQueue = queue.Queue()
+        self.LogWriterThread = None
+        self.LogWriterLock = threading.Lock()
+        
+        # (schema_version, table names) loaded by TableExists; DDL from any connection bumps the version
+        self.TableCache = None
+        
+        # INSERT statements built by InsertWithIdPositional, keyed by (Table, Columns)
+        self.InsertSqlCache = {}
+        
         # Set up logging
         self.SetupLogging()
         
         # Ensure database directory exists
-        os.makedirs(os.path.dirname(self.DbPath), exist_ok=True)
+        if not self.UseUri:
+            os.makedirs(os.path.dirname(self.DbPath), exist_ok=True)
         
         # Initialize database schema
         self.InitializeDatabase()
@@ -42,7 +233,12 @@ class DatabaseManager:
         self.Logger.info(f"DatabaseManager initialized with database at {self.DbPath}")
     
     def SetupLogging(self):
-        """Set up logging for the database manager."""
+        """
+        Set up logging for the database manager.
+        
+        Records are handed to a queue and written to the file and console by a
+        listener thread, so query paths never block on log I/O.
+        """
         # Create logs directory if it doesn't exist
         os.makedirs("Logs", exist_ok=True)
         
@@ -50,6 +246,10 @@ class DatabaseManager:
         self.Logger = logging.getLogger("DatabaseManager")
         self.Logger.setLevel(logging.INFO)
         
+        # The logger is shared by all instances, so only attach handlers once
+        if self.Logger.handlers:
+            return
+        
         # File handler
         LogFile = f"Logs/database_manager_{datetime.now().strftime('%Y%m%d')}.log"
         FileHandler = logging.FileHandler(LogFile)
@@ -62,9 +262,17 @@ class DatabaseManager:
         FileHandler.setFormatter(Formatter)
         ConsoleHandler.setFormatter(Formatter)
         
-        # Add handlers
-        self.Logger.addHandler(FileHandler)
-        self.Logger.addHandler(ConsoleHandler)
+        # Route records through a queue to a listener thread that owns the handlers
+        RecordQueue = queue.SimpleQueue()
+        self.Logger.addHandler(logging.handlers.QueueHandler(RecordQueue))
+        
+        Listener = logging.handlers.QueueListener(
+            RecordQueue, FileHandler, ConsoleHandler, respect_handler_level=True
+        )
+        Listener.start()
+        
+        # Flush remaining records on interpreter exit
+        atexit.register(Listener.stop)
     
     def GetConnection(self):
         """
@@ -73,12 +281,14 @@ class DatabaseManager:
         For thread safety, each thread gets its own connection.
         """
         if not hasattr(self.LocalStorage, 'connection'):
-            self.LocalStorage.connection = sqlite3.connect(self.DbPath)
+            # A larger statement cache keeps the prepared plans for every query this app issues
+            self.LocalStorage.connection = sqlite3.connect(self.DbPath, uri=self.UseUri, cached_statements=256)
             # Enable foreign keys
             self.LocalStorage.connection.execute("PRAGMA foreign_keys = ON")
             # Configure for better performance and safety
             self.LocalStorage.connection.execute("PRAGMA journal_mode = WAL")
             self.LocalStorage.connection.execute("PRAGMA synchronous = NORMAL")
+            self.LocalStorage.connection.execute("PRAGMA temp_store = MEMORY")
             
             # Row factory to get dictionary-like results
             self.LocalStorage.connection.row_factory = sqlite3.Row
@@ -89,214 +299,79 @@ class DatabaseManager:
         """Initialize the database schema if it doesn't exist."""
         self.Logger.info("Initializing database schema")
         
-        # Use a connection just for initialization
-        Conn = sqlite3.connect(self.DbPath)
+        # Use this thread's pooled connection so later calls reuse it
+        Conn = self.GetConnection()
         Cursor = Conn.cursor()
         
-        # Create sessions table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Sessions (
-            SessionId TEXT PRIMARY KEY,
-            StartTime TEXT,
-            EndTime TEXT,
-            Status TEXT,
-            Summary TEXT
-        )
-        ''')
-        
-        # Create conversations table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Conversations (
-            MessageId TEXT PRIMARY KEY,
-            SessionId TEXT,
-            Timestamp TEXT,
-            Source TEXT,
-            Content TEXT,
-            FOREIGN KEY (SessionId) REFERENCES Sessions (SessionId)
-        )
-        ''')
-        
-        # Create actions table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Actions (
-            ActionId TEXT PRIMARY KEY,
-            SessionId TEXT,
-            ActionType TEXT,
-            StartTime TEXT,
-            EndTime TEXT,
-            Status TEXT,
-            Params TEXT,
-            Result TEXT,
-            FOREIGN KEY (SessionId) REFERENCES Sessions (SessionId)
-        )
-        ''')
-        
-        # Create models table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Models (
-            ModelId TEXT PRIMARY KEY,
-            ModelName TEXT,
-            ModelType TEXT,
-            Location TEXT,
-            Status TEXT,
-            LastUsed TEXT,
-            Capabilities TEXT
-        )
-        ''')
-        
-        # Create routing rules table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS RoutingRules (
-            RuleId TEXT PRIMARY KEY,
-            TaskType TEXT,
-            PreferredModel TEXT,
-            FallbackModel TEXT,
-            Priority INTEGER,
-            FOREIGN KEY (PreferredModel) REFERENCES Models (ModelId),
-            FOREIGN KEY (FallbackModel) REFERENCES Models (ModelId)
-        )
-        ''')
-        
-        # Create state snapshots table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS StateSnapshots (
-            SnapshotId TEXT PRIMARY KEY,
-            SessionId TEXT,
-            Timestamp TEXT,
-            StateData TEXT,
-            FOREIGN KEY (SessionId) REFERENCES Sessions (SessionId)
-        )
-        ''')
-        
-        # Create session relationships table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS SessionRelationships (
-            RelationshipId INTEGER PRIMARY KEY AUTOINCREMENT,
-            ParentSessionId TEXT,
-            ChildSessionId TEXT,
-            RelationType TEXT,
-            FOREIGN KEY (ParentSessionId) REFERENCES Sessions (SessionId),
-            FOREIGN KEY (ChildSessionId) REFERENCES Sessions (SessionId)
-        )
-        ''')
-        
-        # Create configuration table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS Configuration (
-            ConfigKey TEXT PRIMARY KEY,
-            ConfigValue TEXT,
-            ConfigType TEXT,
-            DefaultValue TEXT,
-            Description TEXT,
-            LastModified TEXT
-        )
-        ''')
-        
-        # Create validation rules table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ValidationRules (
-            RuleId TEXT PRIMARY KEY,
-            RuleType TEXT,
-            Pattern TEXT,
-            ErrorMessage TEXT,
-            Description TEXT
-        )
-        ''')
-        
-        # Create input fields table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS InputFields (
-            FieldId TEXT PRIMARY KEY,
-            FieldName TEXT,
-            ValidationRuleId TEXT,
-            Required INTEGER,
-            Description TEXT,
-            FOREIGN KEY (ValidationRuleId) REFERENCES ValidationRules (RuleId)
-        )
-        ''')
-        
-        # Create log table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS SystemLogs (
-            LogId INTEGER PRIMARY KEY AUTOINCREMENT,
-            Timestamp TEXT,
-            LogLevel TEXT,
-            Component TEXT,
-            Message TEXT,
-            SessionId TEXT,
-            AdditionalData TEXT
-        )
-        ''')
-        
-        # Create schema version table
-        Cursor.execute('''
-        CREATE TABLE IF NOT EXISTS SchemaVersion (
-            VersionId INTEGER PRIMARY KEY AUTOINCREMENT,
-            VersionNumber TEXT,
-            AppliedAt TEXT,
-            Description TEXT
+        # Create tables
+        Conn.executescript(SCHEMA_SQL)
+        
+        # Add the unique keys once, removing duplicates left by older databases
+        Cursor.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND name IN (?, ?)",
+            ("UX_ValidationRules_RuleType", "UX_InputFields_FieldName")
         )
-        ''')
+        if Cursor.fetchone()[0] < 2:
+            self.Logger.info("Adding unique keys to ValidationRules and InputFields")
+            Conn.executescript(UNIQUE_KEYS_SQL)
+        
+        # Seed defaults only into empty tables, so rows the user deleted stay deleted
+        Now = datetime.now().isoformat()
+        DefaultConfigs = [
+            ('SESSION_TIMEOUT_MINUTES', '60', 'INTEGER', '60', 'Session timeout in minutes', Now),
+            ('MAX_MESSAGES_PER_SESSION', '1000', 'INTEGER', '1000', 'Maximum number of messages per session', Now),
+            ('DEFAULT_AI_MODEL', 'LOCAL_LLAMA', 'TEXT', 'LOCAL_LLAMA', 'Default AI model to use', Now),
+            ('ENABLE_CRASH_RECOVERY', 'true', 'BOOLEAN', 'true', 'Enable crash recovery', Now),
+            ('LOG_LEVEL', 'INFO', 'TEXT', 'INFO', 'Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)', Now),
+            ('STATE_BACKUP_COUNT', '5', 'INTEGER', '5', 'Number of state backups to keep', Now),
+            ('UI_THEME', 'LIGHT', 'TEXT', 'LIGHT', 'UI theme (LIGHT, DARK)', Now)
+        ]
+        
+        # Keys added after the first release are also added to existing databases
+        AddedConfigs = [
+            ('SNAPSHOT_INTERVAL_SECONDS', '30', 'INTEGER', '30', 'Minimum seconds between session state snapshots', Now),
+            ('SNAPSHOT_MESSAGE_DELTA', '20', 'INTEGER', '20', 'New messages that force a session state snapshot', Now)
+        ]
+        
+        InsertConfigSql = "INSERT OR IGNORE INTO Configuration (ConfigKey, ConfigValue, ConfigType, DefaultValue, Description, LastModified) VALUES (?, ?, ?, ?, ?, ?)"
         
-        # Insert default configuration if it doesn't exist
         Cursor.execute("SELECT COUNT(*) FROM Configuration")
-        ConfigCount = Cursor.fetchone()[0]
-        
-        if ConfigCount == 0:
+        if Cursor.fetchone()[0] == 0:
             self.Logger.info("Inserting default configuration values")
-            DefaultConfigs = [
-                ('SESSION_TIMEOUT_MINUTES', '60', 'INTEGER', '60', 'Session timeout in minutes', datetime.now().isoformat()),
-                ('MAX_MESSAGES_PER_SESSION', '1000', 'INTEGER', '1000', 'Maximum number of messages per session', datetime.now().isoformat()),
-                ('DEFAULT_AI_MODEL', 'LOCAL_LLAMA', 'TEXT', 'LOCAL_LLAMA', 'Default AI model to use', datetime.now().isoformat()),
-                ('ENABLE_CRASH_RECOVERY', 'true', 'BOOLEAN', 'true', 'Enable crash recovery', datetime.now().isoformat()),
-                ('LOG_LEVEL', 'INFO', 'TEXT', 'INFO', 'Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)', datetime.now().isoformat()),
-                ('STATE_BACKUP_COUNT', '5', 'INTEGER', '5', 'Number of state backups to keep', datetime.now().isoformat()),
-                ('UI_THEME', 'LIGHT', 'TEXT', 'LIGHT', 'UI theme (LIGHT, DARK)', datetime.now().isoformat())
-            ]
-            
-            Cursor.executemany(
-                "INSERT INTO Configuration (ConfigKey, ConfigValue, ConfigType, DefaultValue, Description, LastModified) VALUES (?, ?, ?, ?, ?, ?)",
-                DefaultConfigs
-            )
+            Cursor.executemany(InsertConfigSql, DefaultConfigs)
         
-        # Insert default validation rules if they don't exist
-        Cursor.execute("SELECT COUNT(*) FROM ValidationRules")
-        RulesCount = Cursor.fetchone()[0]
+        Cursor.executemany(InsertConfigSql, AddedConfigs)
         
-        if RulesCount == 0:
+        DefaultRules = [
+            ('EMAIL_RULE', 'EMAIL', '^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', 'Invalid email format', 'Email validation rule'),
+            ('USERNAME_RULE', 'USERNAME', '^[a-zA-Z0-9_-]{3,16}$', 'Username must be 3-16 characters and contain only letters, numbers, underscores, and hyphens', 'Username validation rule'),
+            ('PATH_RULE', 'PATH', '^(/[^/ ]*)+/?$', 'Invalid path format', 'File path validation rule'),
+            ('URL_RULE', 'URL', '^(http|https)://[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}(/.*)?$', 'Invalid URL format', 'URL validation rule'),
+            ('IPADDRESS_RULE', 'IPADDRESS', '^(?:[0-9]{1,3}\\.){3}[0-9]{1,3}$', 'Invalid IP address format', 'IP address validation rule')
+        ]
+        
+        Cursor.execute("SELECT COUNT(*) FROM ValidationRules")
+        if Cursor.fetchone()[0] == 0:
             self.Logger.info("Inserting default validation rules")
-            DefaultRules = [
-                ('EMAIL_RULE', 'EMAIL', '^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', 'Invalid email format', 'Email validation rule'),
-                ('USERNAME_RULE', 'USERNAME', '^[a-zA-Z0-9_-]{3,16}$', 'Username must be 3-16 characters and contain only letters, numbers, underscores, and hyphens', 'Username validation rule'),
-                ('PATH_RULE', 'PATH', '^(/[^/ ]*)+/?$', 'Invalid path format', 'File path validation rule'),
-                ('URL_RULE', 'URL', '^(http|https)://[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}(/.*)?$', 'Invalid URL format', 'URL validation rule'),
-                ('IPADDRESS_RULE', 'IPADDRESS', '^(?:[0-9]{1,3}\\.){3}[0-9]{1,3}$', 'Invalid IP address format', 'IP address validation rule')
-            ]
-            
             Cursor.executemany(
                 "INSERT INTO ValidationRules (RuleId, RuleType, Pattern, ErrorMessage, Description) VALUES (?, ?, ?, ?, ?)",
                 DefaultRules
             )
         
-        # Record schema version if not already present
-        Cursor.execute("SELECT COUNT(*) FROM SchemaVersion")
-        VersionCount = Cursor.fetchone()[0]
-        
-        if VersionCount == 0:
-            Cursor.execute(
-                "INSERT INTO SchemaVersion (VersionNumber, AppliedAt, Description) VALUES (?, ?, ?)",
-                ("1.0", datetime.now().isoformat(), "Initial schema creation")
-            )
+        # Record the initial schema version under a fixed ID so it is only inserted once
+        Cursor.execute(
+            "INSERT OR IGNORE INTO SchemaVersion (VersionId, VersionNumber, AppliedAt, Description) VALUES (?, ?, ?, ?)",
+            (1, "1.0", Now, "Initial schema creation")
+        )
         
         Conn.commit()
-        Conn.close()
         
         self.Logger.info("Database schema initialized successfully")
     
     def BeginTransaction(self):
         """Begin a database transaction."""
         Conn = self.GetConnection()
-        self.Logger.info("Beginning transaction")
+        self.Logger.debug("Beginning transaction")
         # Store the current state so we know if we need to commit or rollback
         self.LocalStorage.in_transaction = True
         return Conn
@@ -307,7 +382,7 @@ class DatabaseManager:
             Conn = self.GetConnection()
             Conn.commit()
             self.LocalStorage.in_transaction = False
-            self.Logger.info("Transaction committed")
+            self.Logger.debug("Transaction committed")
     
     def RollbackTransaction(self):
         """Roll back the current transaction."""
@@ -315,7 +390,59 @@ class DatabaseManager:
             Conn = self.GetConnection()
             Conn.rollback()
             self.LocalStorage.in_transaction = False
-            self.Logger.info("Transaction rolled back")
+            self.Logger.debug("Transaction rolled back")
+    
+    @contextmanager
+    def Transaction(self):
+        """
+        Run a block of statements in a single transaction.
+        
+        Opens a BEGIN IMMEDIATE transaction, commits it when the block finishes,
+        and rolls it back if the block raises. If this thread already has an open
+        transaction, the block joins it and the outer owner commits.
+        
+        Yields:
+            sqlite3.Connection: Connection for the current thread
+        """
+        if hasattr(self.LocalStorage, 'in_transaction') and self.LocalStorage.in_transaction:
+            yield self.GetConnection()
+            return
+        
+        Conn = self.BeginTransaction()
+        try:
+            if not Conn.in_transaction:
+                Conn.execute("BEGIN IMMEDIATE")
+            yield Conn
+        except Exception:
+            self.RollbackTransaction()
+            raise
+        else:
+            self.CommitTransaction()
+    
+    @contextmanager
+    def Savepoint(self, Name="SP"):
+        """
+        Run a block inside a savepoint of this thread's open transaction.
+        
+        If the block raises, only its own changes are rolled back and the
+        enclosing transaction stays open for the statements that follow.
+        
+        Args:
+            Name (str, optional): Savepoint name
+        
+        Yields:
+            sqlite3.Connection: Connection for the current thread
+        """
+        Conn = self.GetConnection()
+        Conn.execute(f"SAVEPOINT {Name}")
+        try:
+            yield Conn
+        except Exception:
+            Conn.execute(f"ROLLBACK TO {Name}")
+            Conn.execute(f"RELEASE {Name}")
+            raise
+        else:
+            Conn.execute(f"RELEASE {Name}")
     
     def ExecuteQuery(self, Query, Params=None):
         """
@@ -436,9 +563,14 @@ class DatabaseManager:
             Conn = self.GetConnection()
             Cursor = Conn.cursor()
             
-            Cursor.executemany(Query, ParamsList)
-            
-            RowCount = Cursor.rowcount
+            # Run the statement in fixed-size batches, reusing the prepared statement.
+            # Every batch belongs to the same transaction, so the write lock is held
+            # until the single commit below.
+            ParamsList = list(ParamsList)
+            RowCount = 0
+            for Start in range(0, len(ParamsList), self.BATCH_SIZE):
+                Cursor.executemany(Query, ParamsList[Start:Start + self.BATCH_SIZE])
+                RowCount += Cursor.rowcount
             
             # Only commit if we're not in a transaction
             if not hasattr(self.LocalStorage, 'in_transaction') or not self.LocalStorage.in_transaction:
@@ -490,6 +622,48 @@ class DatabaseManager:
                     self.LocalStorage.connection.rollback()
             raise
     
+    def InsertWithIdPositional(self, Table, Columns, Values):
+        """
+        Insert a row from positional values and return the ID of the new row.
+        
+        The INSERT statement for each (Table, Columns) pair is built once and
+        reused, so hot paths avoid building a dict and the SQL text per row.
+        
+        Args:
+            Table (str): Table name
+            Columns (tuple): Column names, in the same order as Values
+            Values (tuple): Values to insert
+            
+        Returns:
+            Any: ID of the new row (typically the rowid or primary key)
+        """
+        try:
+            Query = self.InsertSqlCache.get((Table, Columns))
+            if Query is None:
+                Placeholders = ", ".join("?" for _ in Columns)
+                Query = f"INSERT INTO {Table} ({', '.join(Columns)}) VALUES ({Placeholders})"
+                self.InsertSqlCache[(Table, Columns)] = Query
+            
+            Conn = self.GetConnection()
+            Cursor = Conn.cursor()
+            
+            Cursor.execute(Query, Values)
+            
+            # Get the ID of the new row
+            NewId = Cursor.lastrowid
+            
+            # Only commit if we're not in a transaction
+            if not hasattr(self.LocalStorage, 'in_transaction') or not self.LocalStorage.in_transaction:
+                Conn.commit()
+            
+            return NewId
+        except sqlite3.Error as e:
+            self.Logger.error(f"Error inserting with ID: {e}")
+            if not hasattr(self.LocalStorage, 'in_transaction') or not self.LocalStorage.in_transaction:
+                if hasattr(self.LocalStorage, 'connection'):
+                    self.LocalStorage.connection.rollback()
+            raise
+    
     def Update(self, Table, ColumnDict, WhereClause, WhereParams=None):
         """
         Update rows in a table.
@@ -504,19 +678,15 @@ class DatabaseManager:
             int: Number of rows affected
         """
         try:
-            SetClause = ", ".join([f"{col} = ?" for col in ColumnDict.keys()])
-            SetParams = [ColumnDict[col] for col in ColumnDict.keys()]
+            Columns = list(ColumnDict)
+            AllParams = [ColumnDict[col] for col in Columns]
+            SetClause = ", ".join(f"{col} = ?" for col in Columns)
             
             Query = f"UPDATE {Table} SET {SetClause} WHERE {WhereClause}"
             
-            # Combine parameters
-            AllParams = SetParams
+            # Combine parameters (AllParams is a fresh list, so the caller's data is untouched)
             if WhereParams:
-                if isinstance(WhereParams, dict):
-                    for param in WhereParams.values():
-                        AllParams.append(param)
-                else:
-                    AllParams.extend(WhereParams)
+                AllParams.extend(WhereParams.values() if isinstance(WhereParams, dict) else WhereParams)
             
             Conn = self.GetConnection()
             Cursor = Conn.cursor()
@@ -567,9 +737,13 @@ class DatabaseManager:
         Returns:
             bool: True if the table exists, False otherwise
         """
-        Query = "SELECT name FROM sqlite_master WHERE type='table' AND name=?"
-        Result = self.ExecuteScalar(Query, (TableName,))
-        return Result is not None
+        # schema_version changes on every schema change, whichever connection or path made it
+        SchemaVersion = self.GetConnection().execute("PRAGMA schema_version").fetchone()[0]
+        if self.TableCache is None or self.TableCache[0] != SchemaVersion:
+            Query = "SELECT name FROM sqlite_master WHERE type='table'"
+            self.TableCache = (SchemaVersion, {Row["name"] for Row in self.ExecuteQuery(Query)})
+        
+        return TableName in self.TableCache[1]
     
     def CreateBackup(self, BackupPath=None):
         """
@@ -590,14 +764,12 @@ class DatabaseManager:
         
         # Lock to prevent other operations during backup
         with self.ConnectionLock:
-            # Get a new connection just for the backup
-            SourceConn = sqlite3.connect(self.DbPath)
+            # Back up from this thread's pooled connection
             DestConn = sqlite3.connect(BackupPath)
             
-            SourceConn.backup(DestConn)
+            self.GetConnection().backup(DestConn, pages=self.BACKUP_PAGES, sleep=self.BACKUP_SLEEP_SECONDS)
             
             DestConn.close()
-            SourceConn.close()
         
         self.Logger.info(f"Database backed up to {BackupPath}")
         return BackupPath
@@ -606,6 +778,9 @@ class DatabaseManager:
         """
         Log a message to the database.
         
+        The entry is queued and written by a background thread, so the caller
+        does not wait on JSON serialization or the INSERT.
+        
         Args:
             LogLevel (str): Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
             Component (str): Component that generated the log
@@ -614,30 +789,97 @@ class DatabaseManager:
             AdditionalData (dict, optional): Additional data to include in the log
             
         Returns:
-            int: ID of the new log entry
+            bool: True if the entry was queued, False otherwise
         """
         try:
             Timestamp = datetime.now().isoformat()
             
-            ColumnDict = {
-                "Timestamp": Timestamp,
-                "LogLevel": LogLevel,
-                "Component": Component,
-                "Message": Message,
-                "SessionId": SessionId
-            }
-            
-            if AdditionalData:
-                ColumnDict["AdditionalData"] = json.dumps(AdditionalData)
-            
-            return self.InsertWithId("SystemLogs", ColumnDict)
+            self.StartLogWriter()
+            self.LogQueue.put((Timestamp, LogLevel, Component, Message, SessionId, AdditionalData))
+            return True
         except Exception as e:
             # If we can't log to the database, at least log to the file
             self.Logger.error(f"Error logging to database: {e}")
-            return None
+            return False
+    
+    def StartLogWriter(self):
+        """Start the background log writer thread if it is not running."""
+        with self.LogWriterLock:
+            if self.LogWriterThread is None or not self.LogWriterThread.is_alive():
+                self.LogWriterThread = threading.Thread(
+                    target=self.LogWriterLoop,
+                    name="DatabaseLogWriter",
+                    daemon=True
+                )
+                self.LogWriterThread.start()
+    
+    def LogWriterLoop(self):
+        """Drain the log queue and write entries to the SystemLogs table."""
+        Query = """
+            INSERT INTO SystemLogs (Timestamp, LogLevel, Component, Message, SessionId, AdditionalData)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        Running = True
+        while Running:
+            # Block for the first entry, then take whatever else is already waiting
+            Entries = [self.LogQueue.get()]
+            while True:
+                try:
+                    Entries.append(self.LogQueue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            Rows = []
+            for Entry in Entries:
+                if Entry is None:
+                    Running = False
+                    continue
+                
+                Timestamp, LogLevel, Component, Message, SessionId, AdditionalData = Entry
+                try:
+                    AdditionalJson = DumpJson(AdditionalData) if AdditionalData else None
+                except Exception as e:
+                    self.Logger.error(f"Error logging to database: {e}")
+                    continue
+                
+                Rows.append((Timestamp, LogLevel, Component, Message, SessionId, AdditionalJson))
+            
+            try:
+                if Rows:
+                    self.ExecuteNonQueryMany(Query, Rows)
+            except Exception as e:
+                self.Logger.error(f"Error logging to database: {e}")
+            finally:
+                for _ in Entries:
+                    self.LogQueue.task_done()
+        
+        # The writer thread owns its own connection
+        self.CloseConnections()
+    
+    def FlushLogs(self):
+        """Wait until all queued log entries have been written."""
+        if self.LogWriterThread is not None and self.LogWriterThread.is_alive():
+            self.LogQueue.join()
+    
+    def StopLogWriter(self):
+        """Write any queued log entries and stop the background log writer."""
+        with self.LogWriterLock:
+            Thread = self.LogWriterThread
+            if Thread is None:
+                return
+            
+            if Thread.is_alive() and Thread is not threading.current_thread():
+                self.LogQueue.put(None)
+                Thread.join()
+            
+            self.LogWriterThread = None
     
     def CloseConnections(self):
         """Close all database connections."""
+        # Make sure queued log entries reach the database first
+        if threading.current_thread() is not self.LogWriterThread:
+            self.StopLogWriter()
+        
         if hasattr(self.LocalStorage, 'connection'):
             try:
                 if hasattr(self.LocalStorage, 'in_transaction') and self.LocalStorage.in_transaction:
@@ -649,6 +891,6 @@ class DatabaseManager:
                 if hasattr(self.LocalStorage, 'in_transaction'):
                     del self.LocalStorage.in_transaction
                 
-                self.Logger.info("Database connection closed")
+                self.Logger.debug("Database connection closed")
             except Exception as e:
                 self.Logger.error(f"Error closing database connection: {e}")
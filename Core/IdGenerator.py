@@ -0,0 +1,64 @@
+# File: IdGenerator.py
+# Path: AIDEV-Hub/Core/IdGenerator.py
+# Standard: AIDEV-PascalCase-1.6
+# Created: 2025-03-20
+# Last Modified: 2025-03-20  11:00AM
+# Description: Generates random UUID strings from batched os.urandom reads
+
+import os
+import threading
+
+# Number of IDs drawn from each os.urandom call
+ID_BATCH_SIZE = 1024
+
+class IdGenerator:
+    """
+    Generates version 4 UUID strings.
+    
+    Random bytes are read from os.urandom in batches and sliced per ID, so most
+    IDs cost no system call. Output matches str(uuid.uuid4()).
+    """
+    
+    def __init__(self, BatchSize=ID_BATCH_SIZE):
+        """
+        Initialize the ID generator.
+        
+        Args:
+            BatchSize (int, optional): Number of IDs to draw per os.urandom call
+        """
+        self.BatchSize = BatchSize
+        self.Buffer = b""
+        self.Offset = 0
+        self.Lock = threading.Lock()
+    
+    def NewId(self):
+        """
+        Generate a new ID.
+        
+        Returns:
+            str: Random UUID in canonical 8-4-4-4-12 form
+        """
+        with self.Lock:
+            if self.Offset >= len(self.Buffer):
+                self.Buffer = os.urandom(16 * self.BatchSize)
+                self.Offset = 0
+            Raw = self.Buffer[self.Offset:self.Offset + 16]
+            self.Offset += 16
+        
+        # Set the version (4) and RFC 4122 variant bits
+        Value = int.from_bytes(Raw, "big")
+        Value = (Value & ~(0xf000 << 64) & ~(0xc000 << 48)) | (0x4000 << 64) | (0x8000 << 48)
+        Hex = "%032x" % Value
+        return f"{Hex[:8]}-{Hex[8:12]}-{Hex[12:16]}-{Hex[16:20]}-{Hex[20:]}"
+
+# Shared generator for the application
+DEFAULT_ID_GENERATOR = IdGenerator()
+
+def NewId():
+    """
+    Generate a new ID from the shared generator.
+    
+    Returns:
+        str: Random UUID string
+    """
+    return DEFAULT_ID_GENERATOR.NewId()
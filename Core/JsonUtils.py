@@ -0,0 +1,66 @@
+# File: JsonUtils.py
+# Path: AIDEV-Hub/Core/JsonUtils.py
+# Standard: AIDEV-PascalCase-1.6
+# Created: 2025-03-20
+# Last Modified: 2025-03-20  10:00AM
+# Description: JSON serialization helpers that use orjson when it is installed
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def DumpJson(Value):
+    """
+    Serialize a value to a compact JSON string, using orjson when it is available.
+    
+    Args:
+        Value (Any): Value to serialize
+        
+    Returns:
+        str: JSON representation of the value
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(Value).decode("utf-8")
+        except TypeError:
+            # orjson is stricter than json (e.g. non-string keys), fall back
+            pass
+    return json.dumps(Value, separators=(",", ":"))
+
+def DumpJsonBytes(Value, Indent=False):
+    """
+    Serialize a value to UTF-8 encoded JSON, using orjson when it is available.
+    
+    Args:
+        Value (Any): Value to serialize
+        Indent (bool, optional): Indent nested values by two spaces instead of writing compact JSON
+        
+    Returns:
+        bytes: UTF-8 encoded JSON representation of the value
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(Value, option=orjson.OPT_INDENT_2 if Indent else None)
+        except TypeError:
+            # orjson is stricter than json (e.g. non-string keys), fall back
+            pass
+    if Indent:
+        return json.dumps(Value, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(Value, separators=(",", ":")).encode("utf-8")
+
+def LoadJson(Text):
+    """
+    Parse a JSON string or bytes, using orjson when it is available.
+    
+    Args:
+        Text (str or bytes): JSON text to parse
+        
+    Returns:
+        Any: Parsed value
+    """
+    if orjson is not None:
+        return orjson.loads(Text)
+    return json.loads(Text)
@@ -6,14 +6,24 @@
 # Description: Manages session lifecycle and state persistence
 
 import os
-import json
-import uuid
+import errno
 import shutil
+import time
 import logging
 import atexit
 import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 
+from Core.JsonUtils import DumpJsonBytes, LoadJson
+from Core.IdGenerator import NewId
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 class SessionManager:
     """
     Manages session lifecycle and state.
@@ -26,14 +36,123 @@ class SessionManager:
     - Recording session messages
     """
     
+    # Seconds between background flushes of dirty session state
+    STATE_FLUSH_INTERVAL = 0.2
+    
+    # Seconds a cached GetSessionHistory result stays valid
+    HISTORY_CACHE_TTL = 5.0
+    
+    # A flock belongs to an open file description, so every SessionManager in the
+    # process shares one descriptor per lock file. Each entry also holds the user
+    # count and the sessions this process is running, which are never crashed.
+    ProcessLocks = {}
+    ProcessLockGuard = threading.RLock()
+    
+    # SQL statements are kept as constants so sqlite3 reuses its prepared statements
+    UPDATE_STATUS_SQL = "UPDATE Sessions SET Status = ? WHERE SessionId = ?"
+    
+    SELECT_ACTIVE_IDS_SQL = "SELECT SessionId FROM Sessions WHERE Status = 'ACTIVE'"
+    
+    INSERT_MESSAGE_SQL = """
+        INSERT INTO Conversations (MessageId, SessionId, Timestamp, Source, Content)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    
+    # Column orders for positional inserts
+    SESSION_COLUMNS = ("SessionId", "StartTime", "Status")
+    RELATIONSHIP_COLUMNS = ("ParentSessionId", "ChildSessionId", "RelationType")
+    CONVERSATION_COLUMNS = ("MessageId", "SessionId", "Timestamp", "Source", "Content")
+    SNAPSHOT_COLUMNS = ("SnapshotId", "SessionId", "Timestamp", "StateData")
+    
+    # Session IDs per batched status update, kept under SQLite's 999 parameter limit
+    STATUS_UPDATE_BATCH_SIZE = 900
+    
+    SELECT_MESSAGES_SQL = """
+        SELECT MessageId, Timestamp, Source, Content
+        FROM Conversations
+        WHERE SessionId = ?
+        ORDER BY Timestamp ASC
+        LIMIT ?
+    """
+    
+    # Session row, message count and resume parent in one statement
+    SELECT_SESSION_INFO_SQL = """
+        SELECT s.SessionId, s.StartTime, s.EndTime, s.Status, s.Summary,
+               (SELECT COUNT(*) FROM Conversations c WHERE c.SessionId = s.SessionId) AS MessageCount,
+               r.ParentSessionId AS ResumedFrom
+        FROM Sessions s
+        LEFT JOIN SessionRelationships r
+               ON r.ChildSessionId = s.SessionId AND r.RelationType = 'RESUME'
+        WHERE s.SessionId = ?
+        LIMIT 1
+    """
+    
+    SELECT_HISTORY_SQL = """
+        SELECT SessionId, StartTime, EndTime, Status, Summary
+        FROM Sessions
+        ORDER BY StartTime DESC
+        LIMIT ?
+    """
+    
+    SELECT_CRASHED_SQL = """
+        SELECT SessionId, StartTime, EndTime, Status, Summary
+        FROM Sessions
+        WHERE Status = 'CRASHED'
+        ORDER BY StartTime DESC
+    """
+    
+    SELECT_SNAPSHOTS_SQL = """
+        SELECT SnapshotId, SessionId, Timestamp
+        FROM StateSnapshots
+        WHERE SessionId = ?
+        ORDER BY Timestamp DESC
+        LIMIT ?
+    """
+    
+    SELECT_SNAPSHOT_SQL = """
+        SELECT SnapshotId, SessionId, Timestamp, StateData
+        FROM StateSnapshots
+        WHERE SnapshotId = ?
+    """
+    
     def __init__(self, DatabaseManager, ConfigManager):
         """Initialize the session manager."""
         self.DatabaseManager = DatabaseManager
         self.ConfigManager = ConfigManager
         self.SessionId = None
         self.LockFile = "State/session.lock"
+        self.LockPath = None
+        self.LockFd = None
+        self.LockHeld = False
         self.SessionLock = threading.RLock()
         
+        # In-memory session state, published as one (SessionId, State) tuple so
+        # lock-free readers always see a matching pair. Writers hold SessionLock.
+        self.StateRef = (None, None)
+        
+        # Precomputed (SessionId, SessionDir, StateFile) paths, published the same way
+        self.SessionPaths = (None, None, None)
+        
+        # Background flusher that writes dirty state to disk and the database
+        self.StateDirty = threading.Event()
+        self.FlusherStop = threading.Event()
+        self.FlusherThread = None
+        self.FlusherLock = threading.Lock()
+        
+        # Single worker for RecordMessageAsync, so queued messages keep their order
+        self.IOExecutor = None
+        self.IOExecutorLock = threading.Lock()
+        
+        # Messages waiting for the worker, as (Future, Source, Content); drained as one batch
+        self.PendingMessages = deque()
+        self.DrainScheduled = False
+        
+        # Read caches; info and messages are only cached for sessions that are no longer ACTIVE
+        self.InfoCache = {}
+        self.MessageCache = {}
+        self.HistoryCache = {}
+        self.CacheLock = threading.Lock()
+        
         # Set up logging
         self.Logger = logging.getLogger("SessionManager")
         self.Logger.setLevel(logging.INFO)
@@ -41,6 +160,12 @@ class SessionManager:
         # Create necessary directories
         self.EnsureDirectoriesExist()
         
+        # Snapshots are taken on an interval or after enough new messages, not on every flush
+        self.SnapshotInterval = self.ConfigManager.GetConfig("SNAPSHOT_INTERVAL_SECONDS", 30)
+        self.SnapshotMessageDelta = self.ConfigManager.GetConfig("SNAPSHOT_MESSAGE_DELTA", 20)
+        self.LastSnapshotTime = None
+        self.LastSnapshotMessageCount = 0
+        
         # Check for crashed sessions
         self.CheckForCrashedSessions()
         
@@ -62,35 +187,212 @@ class SessionManager:
         os.makedirs(self.CompletedSessionDir, exist_ok=True)
         os.makedirs("Session/Temp", exist_ok=True)
         
+        # Session moves are only a cheap rename when all three folders share a filesystem
+        ActiveDevice = os.stat(self.ActiveSessionDir).st_dev
+        for DirPath in (self.CrashSessionDir, self.CompletedSessionDir):
+            if os.stat(DirPath).st_dev != ActiveDevice:
+                self.Logger.warning(
+                    "%s is on a different filesystem than %s; session moves will copy files",
+                    DirPath, self.ActiveSessionDir
+                )
+        
         self.Logger.info("Session directories created")
     
-    def CheckForCrashedSessions(self):
-        """Check for and recover any crashed sessions."""
-        # Check if a lock file exists
-        if os.path.exists(self.LockFile):
-            self.Logger.warning("Lock file found, checking for crashed sessions")
-            
-            with open(self.LockFile, 'r') as f:
-                CrashedSessionId = f.read().strip()
-            
-            # Check if the session directory exists
-            CrashedSessionDir = f"{self.ActiveSessionDir}/{CrashedSessionId}"
-            if os.path.exists(CrashedSessionDir):
-                self.Logger.warning(f"Found crashed session: {CrashedSessionId}")
+    def AcquireLock(self):
+        """
+        Take the exclusive flock on the lock file for the process lifetime.
+        
+        The kernel drops the flock when the process dies, so a lock file that can
+        be locked but still holds session IDs was left behind by a crash. The first
+        SessionManager in the process opens and locks the file; later ones share
+        its descriptor. Without fcntl the lock is always treated as acquired.
+        
+        Returns:
+            bool: True if this process holds the lock, False if another process does
+        """
+        LockPath = os.path.abspath(self.LockFile)
+        
+        with self.ProcessLockGuard:
+            Entry = self.ProcessLocks.get(LockPath)
+            if Entry is None:
+                os.makedirs(os.path.dirname(LockPath), exist_ok=True)
+                Fd = os.open(LockPath, os.O_RDWR | os.O_CREAT, 0o644)
                 
-                # Move to crashed sessions directory
-                CrashedDir = f"{self.CrashSessionDir}/{CrashedSessionId}"
-                os.makedirs(os.path.dirname(CrashedDir), exist_ok=True)
-                shutil.move(CrashedSessionDir, CrashedDir)
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(Fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        os.close(Fd)
+                        self.LockHeld = False
+                        return False
                 
-                # Update database status
-                self.UpdateSessionStatus(CrashedSessionId, "CRASHED")
+                Entry = self.ProcessLocks[LockPath] = {"Fd": Fd, "Users": 0, "SessionIds": set()}
+            
+            Entry["Users"] += 1
+            self.LockPath = LockPath
+            self.LockFd = Entry["Fd"]
+        
+        self.LockHeld = True
+        return True
+    
+    def GetLiveSessionIds(self):
+        """
+        Get the sessions run by SessionManagers in this process.
+        
+        Returns:
+            set: Session IDs recorded in the shared lock file entry
+        """
+        if not self.LockHeld:
+            return set()
+        
+        with self.ProcessLockGuard:
+            return set(self.ProcessLocks[self.LockPath]["SessionIds"])
+    
+    def WriteLockFile(self):
+        """Replace the contents of the held lock file with this process's live sessions."""
+        if not self.LockHeld:
+            return
+        
+        with self.ProcessLockGuard:
+            Data = "\n".join(sorted(self.ProcessLocks[self.LockPath]["SessionIds"])).encode("utf-8")
+            os.ftruncate(self.LockFd, 0)
+            if Data:
+                if hasattr(os, "pwrite"):
+                    os.pwrite(self.LockFd, Data, 0)
+                else:
+                    os.lseek(self.LockFd, 0, os.SEEK_SET)
+                    os.write(self.LockFd, Data)
+    
+    def ClearLockFile(self):
+        """Remove the current session from the lock file."""
+        if not self.LockHeld or not self.SessionId:
+            return
+        
+        with self.ProcessLockGuard:
+            self.ProcessLocks[self.LockPath]["SessionIds"].discard(self.SessionId)
+            self.WriteLockFile()
+    
+    def ReleaseLock(self):
+        """Clear this manager's session from the lock file and drop its share of the flock."""
+        if self.LockFd is None:
+            return
+        
+        try:
+            self.ClearLockFile()
+        finally:
+            with self.ProcessLockGuard:
+                Entry = self.ProcessLocks[self.LockPath]
+                Entry["Users"] -= 1
                 
-                self.Logger.info(f"Crashed session {CrashedSessionId} recovered")
+                # Closing the descriptor when its last user leaves releases the flock
+                if Entry["Users"] == 0:
+                    del self.ProcessLocks[self.LockPath]
+                    os.close(Entry["Fd"])
             
-            # Remove lock file
-            os.remove(self.LockFile)
-            self.Logger.info("Lock file removed")
+            self.LockFd = None
+            self.LockHeld = False
+    
+    def CheckForCrashedSessions(self):
+        """
+        Check for and recover any crashed sessions.
+        
+        The sessions recorded in the lock file are always checked. When the flock
+        is available, holding it means no other process is running a session,
+        so every ACTIVE session whose directory is still in ActiveSessionDir is
+        recovered as well, in one pass. Sessions run by other SessionManagers in
+        this process are live and never recovered.
+        """
+        if not self.AcquireLock():
+            self.Logger.warning("Session lock is held by another process, skipping crash detection")
+            return
+        
+        # Session IDs left in the lock file mean their owners never cleared them
+        with self.ProcessLockGuard:
+            os.lseek(self.LockFd, 0, os.SEEK_SET)
+            LockSessionIds = set(os.read(self.LockFd, os.fstat(self.LockFd).st_size).decode("utf-8").split())
+        
+        Candidates = set(LockSessionIds)
+        if fcntl is not None:
+            try:
+                ActiveIds = {Row["SessionId"] for Row in self.DatabaseManager.ExecuteQuery(self.SELECT_ACTIVE_IDS_SQL)}
+                with os.scandir(self.ActiveSessionDir) as Entries:
+                    DirIds = {Entry.name for Entry in Entries if Entry.is_dir()}
+                Candidates |= ActiveIds & DirIds
+            except Exception as e:
+                self.Logger.error("Error scanning for abandoned sessions: %s", e)
+        
+        LiveSessionIds = self.GetLiveSessionIds()
+        Candidates -= LiveSessionIds
+        
+        if not Candidates:
+            return
+        
+        self.Logger.warning("Checking %s session(s) for crash recovery", len(Candidates))
+        
+        # Move every crashed session directory, then update their statuses together
+        Recovered = []
+        for CrashedSessionId in sorted(Candidates):
+            try:
+                self.MoveSessionDir(
+                    os.path.join(self.ActiveSessionDir, CrashedSessionId),
+                    os.path.join(self.CrashSessionDir, CrashedSessionId)
+                )
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                self.Logger.error("Error moving crashed session %s: %s", CrashedSessionId, e)
+                continue
+            
+            self.Logger.warning("Found crashed session: %s", CrashedSessionId)
+            Recovered.append(CrashedSessionId)
+        
+        if Recovered:
+            self.UpdateSessionStatuses(Recovered, "CRASHED")
+            self.Logger.info("Recovered %s crashed session(s)", len(Recovered))
+        
+        # Drop the stale session IDs, keeping this process's live sessions
+        if LockSessionIds - LiveSessionIds:
+            self.WriteLockFile()
+            self.Logger.info("Lock file cleared")
+    
+    def InvalidateSessionCache(self, SessionId=None):
+        """
+        Drop cached read results affected by a change to a session.
+        
+        Args:
+            SessionId (str, optional): Session whose info and messages changed
+        """
+        with self.CacheLock:
+            if SessionId:
+                self.InfoCache.pop(SessionId, None)
+                for Key in [Key for Key in self.MessageCache if Key[0] == SessionId]:
+                    del self.MessageCache[Key]
+            
+            # Any session change can alter the history listing
+            self.HistoryCache.clear()
+    
+    def MoveSessionDir(self, Source, Destination):
+        """
+        Move a session directory between the Active, Crashed and Completed folders.
+        
+        The parent folders are created by EnsureDirectoriesExist, so this is a
+        plain rename. Only a move across filesystems falls back to shutil.move,
+        which copies the whole tree.
+        
+        Args:
+            Source (str): Session directory to move
+            Destination (str): New path for the session directory
+            
+        Raises:
+            FileNotFoundError: If the source directory does not exist
+        """
+        try:
+            os.rename(Source, Destination)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            self.Logger.warning("Copying session directory %s across filesystems", Source)
+            shutil.move(Source, Destination)
     
     def UpdateSessionStatus(self, SessionId, Status):
         """
@@ -104,20 +406,97 @@ class SessionManager:
             bool: True if successful, False otherwise
         """
         try:
-            Query = "UPDATE Sessions SET Status = ? WHERE SessionId = ?"
-            RowsAffected = self.DatabaseManager.ExecuteNonQuery(Query, (Status, SessionId))
+            RowsAffected = self.DatabaseManager.ExecuteNonQuery(self.UPDATE_STATUS_SQL, (Status, SessionId))
+            self.InvalidateSessionCache(SessionId)
             
-            self.Logger.info(f"Updated session {SessionId} status to {Status}")
+            self.Logger.info("Updated session %s status to %s", SessionId, Status)
             return RowsAffected > 0
         except Exception as e:
-            self.Logger.error(f"Error updating session status: {e}")
+            self.Logger.error("Error updating session status: %s", e)
             return False
     
+    def UpdateSessionStatuses(self, SessionIds, Status):
+        """
+        Update the status of several sessions with batched UPDATE ... IN statements.
+        
+        Args:
+            SessionIds (list): Session IDs to update
+            Status (str): New status (ACTIVE, COMPLETED, CRASHED, etc.)
+            
+        Returns:
+            int: Number of sessions updated, or 0 on error
+        """
+        try:
+            RowsAffected = 0
+            with self.DatabaseManager.Transaction():
+                for Start in range(0, len(SessionIds), self.STATUS_UPDATE_BATCH_SIZE):
+                    Batch = SessionIds[Start:Start + self.STATUS_UPDATE_BATCH_SIZE]
+                    Placeholders = ", ".join("?" for _ in Batch)
+                    Query = f"UPDATE Sessions SET Status = ? WHERE SessionId IN ({Placeholders})"
+                    RowsAffected += self.DatabaseManager.ExecuteNonQuery(Query, (Status, *Batch))
+            
+            for SessionId in SessionIds:
+                self.InvalidateSessionCache(SessionId)
+            
+            self.Logger.info("Updated %s session(s) to status %s", RowsAffected, Status)
+            return RowsAffected
+        except Exception as e:
+            self.Logger.error("Error updating session statuses: %s", e)
+            return 0
+    
+    def SetSessionPaths(self, SessionId):
+        """
+        Precompute the directory and state file paths for a session.
+        
+        Args:
+            SessionId (str): Session ID the paths belong to, or None to clear them
+        """
+        if SessionId:
+            SessionDir = os.path.join(self.ActiveSessionDir, SessionId)
+            self.SessionPaths = (SessionId, SessionDir, os.path.join(SessionDir, "state.json"))
+        else:
+            self.SessionPaths = (None, None, None)
+    
+    def GetSessionDir(self, SessionId):
+        """
+        Get the active directory path for a session.
+        
+        Args:
+            SessionId (str): Session ID
+            
+        Returns:
+            str: Path to the session's directory under ActiveSessionDir
+        """
+        PathSessionId, SessionDir, _ = self.SessionPaths
+        if SessionId == PathSessionId:
+            return SessionDir
+        return os.path.join(self.ActiveSessionDir, SessionId)
+    
+    def GetStateFile(self, SessionId):
+        """
+        Get the state file path for a session.
+        
+        Args:
+            SessionId (str): Session ID
+            
+        Returns:
+            str: Path to the session's state.json
+        """
+        PathSessionId, _, StateFile = self.SessionPaths
+        if SessionId == PathSessionId:
+            return StateFile
+        return os.path.join(self.ActiveSessionDir, SessionId, "state.json")
+    
     def CreateLockFile(self):
-        """Create a lock file for crash detection."""
-        with open(self.LockFile, 'w') as f:
-            f.write(self.SessionId)
-        self.Logger.info(f"Lock file created for session {self.SessionId}")
+        """Record the current session in the lock file for crash detection."""
+        if not self.LockHeld:
+            self.Logger.warning("Session lock not held, crash detection disabled for session %s", self.SessionId)
+            return
+        
+        with self.ProcessLockGuard:
+            self.ProcessLocks[self.LockPath]["SessionIds"].add(self.SessionId)
+            self.WriteLockFile()
+        self.Logger.info("Lock file created for session %s", self.SessionId)
     
     def StartSession(self):
         """
@@ -126,41 +505,46 @@ class SessionManager:
         Returns:
             str: Session ID
         """
+        # Queued messages take SessionLock, so let them land before we hold it
+        self.WaitForPendingMessages()
+        
         with self.SessionLock:
             # End current session if active
             if self.SessionId:
-                self.EndSession("Ended to start new session")
+                self.EndCurrentSession("Ended to start new session")
             
             # Generate new session ID
-            self.SessionId = datetime.now().strftime("%Y%m%d%H%M%S")
-            StartTime = datetime.now().isoformat()
+            # One clock reading for both the session ID and its start time
+            Now = datetime.now()
+            self.SessionId = Now.strftime("%Y%m%d%H%M%S")
+            StartTime = Now.isoformat()
             
             # Create session in database
-            ColumnDict = {
-                "SessionId": self.SessionId,
-                "StartTime": StartTime,
-                "Status": "ACTIVE"
-            }
-            
-            self.DatabaseManager.InsertWithId("Sessions", ColumnDict)
+            self.DatabaseManager.InsertWithIdPositional(
+                "Sessions", self.SESSION_COLUMNS, (self.SessionId, StartTime, "ACTIVE")
+            )
+            self.InvalidateSessionCache(self.SessionId)
             
             # Create session directory
-            SessionDir = f"{self.ActiveSessionDir}/{self.SessionId}"
-            os.makedirs(SessionDir, exist_ok=True)
+            self.SetSessionPaths(self.SessionId)
+            os.makedirs(self.GetSessionDir(self.SessionId), exist_ok=True)
+            self.SyncDirectory(self.ActiveSessionDir)
             
             # Create lock file
             self.CreateLockFile()
             
             # Initialize state file
+            self.LastSnapshotTime = None
             self.SaveSessionState({
                 "SessionId": self.SessionId,
                 "StartTime": StartTime,
                 "Messages": [],
                 "Context": {},
                 "LastModified": StartTime
-            })
+            }, StartTime)
+            self.FlushState()
             
-            self.Logger.info(f"Session {self.SessionId} started")
+            self.Logger.info("Session %s started", self.SessionId)
             
             # Log to database
             self.DatabaseManager.LogToDatabase(
@@ -182,87 +566,78 @@ class SessionManager:
         Returns:
             str: New session ID
         """
+        # Queued messages take SessionLock, so let them land before we hold it
+        self.WaitForPendingMessages()
+        
         with self.SessionLock:
             # Check if the crashed session exists
             CrashedDir = f"{self.CrashSessionDir}/{SessionId}"
             if not os.path.exists(CrashedDir):
-                self.Logger.error(f"Crashed session {SessionId} not found")
+                self.Logger.error("Crashed session %s not found", SessionId)
                 return None
             
             # End current session if active
             if self.SessionId:
-                self.EndSession("Ended to resume crashed session")
+                self.EndCurrentSession("Ended to resume crashed session")
             
             # Create new session with reference to crashed one
-            self.SessionId = SessionId + "_resumed_" + datetime.now().strftime("%Y%m%d%H%M%S")
-            StartTime = datetime.now().isoformat()
-            
-            # Create session in database
-            ColumnDict = {
-                "SessionId": self.SessionId,
-                "StartTime": StartTime,
-                "Status": "ACTIVE"
-            }
-            
-            self.DatabaseManager.InsertWithId("Sessions", ColumnDict)
-            
-            # Record relationship to crashed session
-            RelationDict = {
-                "ParentSessionId": SessionId,
-                "ChildSessionId": self.SessionId,
-                "RelationType": "RESUME"
-            }
-            
-            self.DatabaseManager.InsertWithId("SessionRelationships", RelationDict)
+            Now = datetime.now()
+            self.SessionId = SessionId + "_resumed_" + Now.strftime("%Y%m%d%H%M%S")
+            StartTime = Now.isoformat()
+            
+            # Create session in database and record its relationship to the crashed one
+            with self.DatabaseManager.Transaction():
+                self.DatabaseManager.InsertWithIdPositional(
+                    "Sessions", self.SESSION_COLUMNS, (self.SessionId, StartTime, "ACTIVE")
+                )
+                self.DatabaseManager.InsertWithIdPositional(
+                    "SessionRelationships", self.RELATIONSHIP_COLUMNS, (SessionId, self.SessionId, "RESUME")
+                )
+            self.InvalidateSessionCache(self.SessionId)
             
             # Create session directory
-            SessionDir = f"{self.ActiveSessionDir}/{self.SessionId}"
-            os.makedirs(SessionDir, exist_ok=True)
+            self.SetSessionPaths(self.SessionId)
+            os.makedirs(self.GetSessionDir(self.SessionId), exist_ok=True)
+            self.SyncDirectory(self.ActiveSessionDir)
             
             # Create lock file
             self.CreateLockFile()
             
             # Load state from crashed session
-            StateFile = f"{CrashedDir}/state.json"
-            if os.path.exists(StateFile):
-                try:
-                    with open(StateFile, 'r') as f:
-                        CrashedState = json.load(f)
-                    
-                    # Initialize new state based on crashed session
-                    NewState = dict(CrashedState)
-                    NewState["OriginalSessionId"] = CrashedState["SessionId"]
-                    NewState["SessionId"] = self.SessionId
-                    NewState["StartTime"] = StartTime
-                    NewState["ResumedFrom"] = SessionId
-                    NewState["LastModified"] = StartTime
-                    
-                    # Save the new state
-                    self.SaveSessionState(NewState)
-                except Exception as e:
-                    self.Logger.error(f"Error loading state from crashed session: {e}")
-                    
-                    # Create minimal state
-                    self.SaveSessionState({
-                        "SessionId": self.SessionId,
-                        "StartTime": StartTime,
-                        "Messages": [],
-                        "Context": {},
-                        "ResumedFrom": SessionId,
-                        "LastModified": StartTime
-                    })
-            else:
+            self.LastSnapshotTime = None
+            NewState = None
+            try:
+                with open(os.path.join(CrashedDir, "state.json"), 'rb') as f:
+                    CrashedState = LoadJson(f.read())
+                
+                # Initialize new state based on crashed session
+                NewState = dict(CrashedState)
+                NewState["OriginalSessionId"] = CrashedState["SessionId"]
+                NewState["SessionId"] = self.SessionId
+                NewState["StartTime"] = StartTime
+                NewState["ResumedFrom"] = SessionId
+                NewState["LastModified"] = StartTime
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                self.Logger.error("Error loading state from crashed session: %s", e)
+            
+            if NewState is None:
                 # Create minimal state
-                self.SaveSessionState({
+                NewState = {
                     "SessionId": self.SessionId,
                     "StartTime": StartTime,
                     "Messages": [],
                     "Context": {},
                     "ResumedFrom": SessionId,
                     "LastModified": StartTime
-                })
+                }
             
-            self.Logger.info(f"Resumed session {SessionId} as new session {self.SessionId}")
+            # Save the new state
+            self.SaveSessionState(NewState, StartTime)
+            self.FlushState()
+            
+            self.Logger.info("Resumed session %s as new session %s", SessionId, self.SessionId)
             
             # Log to database
             self.DatabaseManager.LogToDatabase(
@@ -279,6 +654,25 @@ class SessionManager:
         """
         End the current session normally.
         
+        Args:
+            Summary (str, optional): Summary of session
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        # Let queued messages land in this session before it closes
+        self.WaitForPendingMessages()
+        
+        return self.EndCurrentSession(Summary)
+    
+    def EndCurrentSession(self, Summary=None):
+        """
+        End the current session without waiting for queued messages.
+        
+        Callers that hold SessionLock use this, since the message worker needs
+        that lock and waiting for it here would deadlock. They must call
+        WaitForPendingMessages before taking the lock.
+        
         Args:
             Summary (str, optional): Summary of session
             
@@ -305,16 +699,13 @@ class SessionManager:
                 WhereClause = "SessionId = ?"
                 WhereParams = (self.SessionId,)
                 
-                self.DatabaseManager.Update("Sessions", UpdateDict, WhereClause, WhereParams)
-                
-                # Update state file
-                StateFile = f"{self.ActiveSessionDir}/{self.SessionId}/state.json"
-                if os.path.exists(StateFile):
-                    try:
-                        with open(StateFile, 'r') as f:
-                            State = json.load(f)
-                        
-                        # Update state
+                # The status update and the final snapshot commit together
+                with self.DatabaseManager.Transaction():
+                    self.DatabaseManager.Update("Sessions", UpdateDict, WhereClause, WhereParams)
+                    
+                    # Finalize the in-memory state and flush it
+                    State = self.LoadSessionState()
+                    if State is not None:
                         State["EndTime"] = EndTime
                         State["Status"] = "COMPLETED"
                         State["LastModified"] = EndTime
@@ -322,23 +713,23 @@ class SessionManager:
                         if Summary:
                             State["Summary"] = Summary
                         
-                        # Save updated state
-                        with open(StateFile, 'w') as f:
-                            json.dump(State, f, indent=2)
-                    except Exception as e:
-                        self.Logger.error(f"Error updating state file: {e}")
+                        self.StateDirty.set()
+                        if not self.FlushState(Force=True):
+                            self.Logger.error("Error updating state file")
+                self.InvalidateSessionCache(self.SessionId)
                 
-                # Move session directory to completed
-                ActiveDir = f"{self.ActiveSessionDir}/{self.SessionId}"
-                CompletedDir = f"{self.CompletedSessionDir}/{self.SessionId}"
+                self.StateRef = (None, None)
                 
-                if os.path.exists(ActiveDir):
-                    os.makedirs(os.path.dirname(CompletedDir), exist_ok=True)
-                    shutil.move(ActiveDir, CompletedDir)
+                # Move session directory to completed
+                CompletedDir = os.path.join(self.CompletedSessionDir, self.SessionId)
+                try:
+                    self.MoveSessionDir(self.GetSessionDir(self.SessionId), CompletedDir)
+                except FileNotFoundError:
+                    pass
+                self.SetSessionPaths(None)
                 
-                # Remove lock file if it exists
-                if os.path.exists(self.LockFile):
-                    os.remove(self.LockFile)
+                # Clear the session from the lock file
+                self.ClearLockFile()
                 
                 # Log to database
                 self.DatabaseManager.LogToDatabase(
@@ -352,18 +743,23 @@ class SessionManager:
                 SessionId = self.SessionId
                 self.SessionId = None
                 
-                self.Logger.info(f"Session {SessionId} ended")
+                self.Logger.info("Session %s ended", SessionId)
                 return True
             except Exception as e:
-                self.Logger.error(f"Error ending session: {e}")
+                self.Logger.error("Error ending session: %s", e)
                 return False
     
-    def SaveSessionState(self, State):
+    def SaveSessionState(self, State, Timestamp=None):
         """
-        Save session state to a file.
+        Save session state.
+        
+        State for the current session is kept in memory and marked dirty; the
+        background flusher writes it to disk and the database. State for any
+        other session is written immediately.
         
         Args:
             State (dict): State data to save
+            Timestamp (str, optional): ISO time of the change; defaults to now
             
         Returns:
             bool: True if successful, False otherwise
@@ -374,52 +770,245 @@ class SessionManager:
                 return False
             
             # Update last modified timestamp
-            State["LastModified"] = datetime.now().isoformat()
-            
-            # Save to file
-            StateFile = f"{self.ActiveSessionDir}/{self.SessionId}/state.json"
-            with open(StateFile, 'w') as f:
-                json.dump(State, f, indent=2)
-            
-            # Create snapshot in database
-            SnapshotId = str(uuid.uuid4())
-            
-            ColumnDict = {
-                "SnapshotId": SnapshotId,
-                "SessionId": self.SessionId,
-                "Timestamp": State["LastModified"],
-                "StateData": json.dumps(State)
-            }
-            
-            self.DatabaseManager.InsertWithId("StateSnapshots", ColumnDict)
+            State["LastModified"] = Timestamp or datetime.now().isoformat()
+            
+            with self.SessionLock:
+                StateSessionId, CurrentState = self.StateRef
+                if CurrentState is not None and StateSessionId != self.SessionId:
+                    # Not the state we own, so write it straight away
+                    self.WriteSessionState(self.SessionId, State)
+                    if self.Logger.isEnabledFor(logging.DEBUG):
+                        self.Logger.debug("State saved for session %s", self.SessionId)
+                    return True
+                
+                self.StateRef = (self.SessionId, State)
+                self.StateDirty.set()
             
-            self.Logger.debug(f"State saved for session {self.SessionId}")
+            self.StartStateFlusher()
             return True
         except Exception as e:
-            self.Logger.error(f"Error saving session state: {e}")
+            self.Logger.error("Error saving session state: %s", e)
             return False
     
+    def CopyCurrentState(self):
+        """
+        Copy the in-memory session state so it can be put back after a rollback.
+        
+        Lists and dictionaries such as Messages and Context are copied one level
+        deep; recording a message or setting context adds or replaces entries
+        rather than changing them in place.
+        
+        Returns:
+            tuple: (SessionId, State) to pass to RestoreCurrentState
+        """
+        with self.SessionLock:
+            SessionId, State = self.StateRef
+            if State is not None:
+                State = {Key: Value.copy() if isinstance(Value, (dict, list)) else Value for Key, Value in State.items()}
+            return (SessionId, State)
+    
+    def RestoreCurrentState(self, Copy):
+        """
+        Put back in-memory session state taken by CopyCurrentState.
+        
+        The state is marked dirty, so the flusher rewrites the state file even
+        if it saw the discarded changes.
+        
+        Args:
+            Copy (tuple): (SessionId, State) returned by CopyCurrentState
+        """
+        with self.SessionLock:
+            self.StateRef = Copy
+            if Copy[1] is not None:
+                self.StateDirty.set()
+        
+        self.InvalidateSessionCache(Copy[0])
+    
+    def WriteSessionState(self, SessionId, State, Snapshot=True):
+        """
+        Write session state to its state file and optionally record a snapshot.
+        
+        Args:
+            SessionId (str): Session the state belongs to
+            State (dict): State data to write
+            Snapshot (bool, optional): Whether to insert a StateSnapshots row
+        """
+        # Serialize once; the file takes the bytes and a snapshot decodes the same payload
+        Payload = DumpJsonBytes(State)
+        
+        # Write to a temporary file and swap it in so readers never see a partial file.
+        # Only snapshot flushes are fsynced; the others can be rebuilt from the last snapshot.
+        StateFile = self.GetStateFile(SessionId)
+        TempFile = StateFile + ".tmp"
+        self.WriteStateFile(TempFile, Payload, Sync=Snapshot)
+        os.replace(TempFile, StateFile)
+        if Snapshot:
+            self.SyncDirectory(os.path.dirname(StateFile))
+        
+        if not Snapshot:
+            return
+        
+        # Create snapshot in database
+        self.DatabaseManager.InsertWithIdPositional(
+            "StateSnapshots",
+            self.SNAPSHOT_COLUMNS,
+            (NewId(), SessionId, State["LastModified"], Payload.decode("utf-8"))
+        )
+    
+    def WriteStateFile(self, FilePath, Data, Sync=False):
+        """
+        Write bytes to a file with raw os-level calls.
+        
+        This skips the buffered file object, so a flush costs one open, one
+        write for the whole payload, and one close.
+        
+        Args:
+            FilePath (str): File to create or truncate
+            Data (bytes): Contents to write
+            Sync (bool, optional): fsync the file before closing it
+        """
+        Fd = os.open(FilePath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            View = memoryview(Data)
+            while View:
+                Written = os.write(Fd, View)
+                View = View[Written:]
+            if Sync:
+                os.fsync(Fd)
+        finally:
+            os.close(Fd)
+    
+    def SyncDirectory(self, DirPath):
+        """
+        fsync a directory so entries created or renamed in it survive a power loss.
+        
+        Platforms that cannot open directories (such as Windows) are skipped.
+        
+        Args:
+            DirPath (str): Directory to sync
+        """
+        try:
+            Fd = os.open(DirPath, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(Fd)
+        except OSError:
+            pass
+        finally:
+            os.close(Fd)
+    
+    def FlushState(self, Force=False):
+        """
+        Write the in-memory session state now if it has unsaved changes.
+        
+        A snapshot is recorded on the first flush of a session, when Force is
+        set, or once SNAPSHOT_INTERVAL_SECONDS or SNAPSHOT_MESSAGE_DELTA new
+        messages have passed since the last snapshot.
+        
+        Args:
+            Force (bool, optional): Always record a snapshot
+            
+        Returns:
+            bool: True if the state is clean afterwards, False otherwise
+        """
+        with self.SessionLock:
+            StateSessionId, CurrentState = self.StateRef
+            if not self.StateDirty.is_set() or CurrentState is None:
+                return True
+            
+            self.StateDirty.clear()
+            try:
+                Now = time.monotonic()
+                MessageCount = len(CurrentState.get("Messages", []))
+                Snapshot = (
+                    Force
+                    or self.LastSnapshotTime is None
+                    or Now - self.LastSnapshotTime >= self.SnapshotInterval
+                    or MessageCount - self.LastSnapshotMessageCount >= self.SnapshotMessageDelta
+                )
+                
+                self.WriteSessionState(StateSessionId, CurrentState, Snapshot)
+                
+                if Snapshot:
+                    self.LastSnapshotTime = Now
+                    self.LastSnapshotMessageCount = MessageCount
+                
+                if self.Logger.isEnabledFor(logging.DEBUG):
+                    self.Logger.debug("State flushed for session %s", StateSessionId)
+                return True
+            except Exception as e:
+                # Leave the state dirty so the next flush retries
+                self.StateDirty.set()
+                self.Logger.error("Error flushing session state: %s", e)
+                return False
+    
+    def StartStateFlusher(self):
+        """Start the background state flusher thread if it is not running."""
+        with self.FlusherLock:
+            if self.FlusherThread is None or not self.FlusherThread.is_alive():
+                self.FlusherStop.clear()
+                self.FlusherThread = threading.Thread(
+                    target=self.StateFlusherLoop,
+                    name="SessionStateFlusher",
+                    daemon=True
+                )
+                self.FlusherThread.start()
+    
+    def StateFlusherLoop(self):
+        """Flush dirty session state on a fixed interval until stopped."""
+        while not self.FlusherStop.wait(self.STATE_FLUSH_INTERVAL):
+            if self.StateDirty.is_set():
+                self.FlushState()
+        
+        self.DatabaseManager.CloseConnections()
+    
+    def StopStateFlusher(self):
+        """Stop the background state flusher thread and write any pending state."""
+        with self.FlusherLock:
+            if self.FlusherThread is not None:
+                self.FlusherStop.set()
+                self.FlusherThread.join()
+                self.FlusherThread = None
+        
+        self.FlushState(Force=True)
+    
     def LoadSessionState(self):
         """
-        Load current session state from file.
+        Load current session state.
+        
+        The in-memory state is returned when it belongs to the current session;
+        otherwise the state file is read and kept in memory. Callers that modify
+        the returned state must pass it to SaveSessionState.
         
         Returns:
             dict: Session state or None if not found
         """
         try:
-            if not self.SessionId:
+            SessionId = self.SessionId
+            if not SessionId:
                 self.Logger.warning("No active session to load state for")
                 return None
             
-            StateFile = f"{self.ActiveSessionDir}/{self.SessionId}/state.json"
-            if os.path.exists(StateFile):
-                with open(StateFile, 'r') as f:
-                    return json.load(f)
-            else:
-                self.Logger.warning(f"State file not found for session {self.SessionId}")
+            # Lock-free fast path: one read of the published reference
+            StateSessionId, CurrentState = self.StateRef
+            if CurrentState is not None and StateSessionId == SessionId:
+                return CurrentState
+            
+            try:
+                with open(self.GetStateFile(SessionId), 'rb') as f:
+                    State = LoadJson(f.read())
+            except FileNotFoundError:
+                self.Logger.warning("State file not found for session %s", SessionId)
                 return None
+            
+            # Keep it in memory unless we already hold another session's state
+            with self.SessionLock:
+                if self.StateRef[1] is None:
+                    self.StateRef = (SessionId, State)
+            return State
         except Exception as e:
-            self.Logger.error(f"Error loading session state: {e}")
+            self.Logger.error("Error loading session state: %s", e)
             return None
     
     def RecordMessage(self, Source, Content):
@@ -438,42 +1027,137 @@ class SessionManager:
                 self.Logger.warning("No active session to record message for")
                 return None
             
-            MessageId = str(uuid.uuid4())
+            MessageId = NewId()
             Timestamp = datetime.now().isoformat()
             
-            # Add to database
-            ColumnDict = {
+            # Append to the in-memory state instead of re-reading the state file
+            Message = {
                 "MessageId": MessageId,
-                "SessionId": self.SessionId,
                 "Timestamp": Timestamp,
                 "Source": Source,
                 "Content": Content
             }
             
-            self.DatabaseManager.InsertWithId("Conversations", ColumnDict)
-            
-            # Add to current state
-            State = self.LoadSessionState()
-            if State:
-                if "Messages" not in State:
-                    State["Messages"] = []
+            # Take the session lock before the database lock, as the flusher does
+            with self.SessionLock, self.DatabaseManager.Transaction():
+                self.DatabaseManager.InsertWithIdPositional(
+                    "Conversations",
+                    self.CONVERSATION_COLUMNS,
+                    (MessageId, self.SessionId, Timestamp, Source, Content)
+                )
                 
-                Message = {
+                State = self.LoadSessionState()
+                if State:
+                    State.setdefault("Messages", []).append(Message)
+                    self.SaveSessionState(State, Timestamp)
+            
+            self.Logger.info("Message recorded from %s with ID %s", Source, MessageId)
+            return MessageId
+        except Exception as e:
+            self.Logger.error("Error recording message: %s", e)
+            return None
+    
+    def RecordMessagesBatch(self, Messages):
+        """
+        Record several messages with one INSERT batch and one commit.
+        
+        Args:
+            Messages (list): (Source, Content) tuples, in conversation order
+            
+        Returns:
+            list: Message IDs in the same order, or None on failure
+        """
+        try:
+            if not self.SessionId:
+                self.Logger.warning("No active session to record messages for")
+                return None
+            
+            Rows = []
+            NewMessages = []
+            for Source, Content in Messages:
+                MessageId = NewId()
+                Timestamp = datetime.now().isoformat()
+                Rows.append((MessageId, self.SessionId, Timestamp, Source, Content))
+                NewMessages.append({
                     "MessageId": MessageId,
                     "Timestamp": Timestamp,
                     "Source": Source,
                     "Content": Content
-                }
+                })
+            
+            if not Rows:
+                return []
+            
+            # Take the session lock before the database lock, as the flusher does
+            with self.SessionLock, self.DatabaseManager.Transaction():
+                self.DatabaseManager.ExecuteNonQueryMany(self.INSERT_MESSAGE_SQL, Rows)
                 
-                State["Messages"].append(Message)
-                self.SaveSessionState(State)
+                State = self.LoadSessionState()
+                if State:
+                    State.setdefault("Messages", []).extend(NewMessages)
+                    self.SaveSessionState(State, Rows[-1][2])
             
-            self.Logger.info(f"Message recorded from {Source} with ID {MessageId}")
-            return MessageId
+            self.Logger.info("Recorded %s messages", len(Rows))
+            return [Row[0] for Row in Rows]
         except Exception as e:
-            self.Logger.error(f"Error recording message: {e}")
+            self.Logger.error("Error recording messages: %s", e)
             return None
     
+    def RecordMessageAsync(self, Source, Content):
+        """
+        Record a message on a background thread.
+        
+        Messages queued this way are recorded in order, and messages that
+        arrive while the worker is busy are written together as one batch.
+        EndSession waits for them, so they land in the session that was
+        active when they were queued.
+        
+        Args:
+            Source (str): Source of the message (e.g., "User", "Assistant")
+            Content (str): Message content
+            
+        Returns:
+            concurrent.futures.Future: Resolves to the message ID, or None on failure
+        """
+        Result = Future()
+        with self.IOExecutorLock:
+            if self.IOExecutor is None:
+                self.IOExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SessionIO")
+            self.PendingMessages.append((Result, Source, Content))
+            if not self.DrainScheduled:
+                self.DrainScheduled = True
+                self.IOExecutor.submit(self.DrainPendingMessages)
+        return Result
+    
+    def DrainPendingMessages(self):
+        """Record every message queued by RecordMessageAsync as one batch."""
+        with self.IOExecutorLock:
+            Batch = list(self.PendingMessages)
+            self.PendingMessages.clear()
+            self.DrainScheduled = False
+        
+        MessageIds = self.RecordMessagesBatch([(Source, Content) for _, Source, Content in Batch])
+        for Index, (Result, _, _) in enumerate(Batch):
+            Result.set_result(MessageIds[Index] if MessageIds else None)
+    
+    def WaitForPendingMessages(self):
+        """Block until every message queued by RecordMessageAsync has been recorded."""
+        with self.IOExecutorLock:
+            Executor = self.IOExecutor
+        
+        if Executor is not None:
+            # The single worker runs tasks in order, so this finishes after all earlier ones
+            Executor.submit(lambda: None).result()
+    
+    def StopIOExecutor(self):
+        """Record any queued messages and shut down the background message worker."""
+        with self.IOExecutorLock:
+            Executor = self.IOExecutor
+            self.IOExecutor = None
+        
+        if Executor is not None:
+            Executor.shutdown(wait=True)
+    
     def GetSessionMessages(self, SessionId=None, Limit=50):
         """
         Get messages from a session.
@@ -491,20 +1175,24 @@ class SessionManager:
                 return []
             
             TargetSessionId = SessionId if SessionId else self.SessionId
+            CacheKey = (TargetSessionId, Limit)
             
-            Query = """
-                SELECT MessageId, Timestamp, Source, Content
-                FROM Conversations
-                WHERE SessionId = ?
-                ORDER BY Timestamp ASC
-                LIMIT ?
-            """
+            with self.CacheLock:
+                if CacheKey in self.MessageCache:
+                    return [dict(Message) for Message in self.MessageCache[CacheKey]]
             
-            Messages = self.DatabaseManager.ExecuteQuery(Query, (TargetSessionId, Limit))
+            Messages = self.DatabaseManager.ExecuteQuery(self.SELECT_MESSAGES_SQL, (TargetSessionId, Limit))
+            
+            # Messages of a finished session no longer change
+            if TargetSessionId != self.SessionId:
+                Info = self.GetSessionInfo(TargetSessionId)
+                if Info and Info["Status"] != "ACTIVE":
+                    with self.CacheLock:
+                        self.MessageCache[CacheKey] = [dict(Message) for Message in Messages]
             
             return Messages
         except Exception as e:
-            self.Logger.error(f"Error getting session messages: {e}")
+            self.Logger.error("Error getting session messages: %s", e)
             return []
     
     def GetSessionInfo(self, SessionId=None):
@@ -524,46 +1212,28 @@ class SessionManager:
             
             TargetSessionId = SessionId if SessionId else self.SessionId
             
-            Query = """
-                SELECT SessionId, StartTime, EndTime, Status, Summary
-                FROM Sessions
-                WHERE SessionId = ?
-            """
+            with self.CacheLock:
+                if TargetSessionId in self.InfoCache:
+                    return dict(self.InfoCache[TargetSessionId])
             
-            Sessions = self.DatabaseManager.ExecuteQuery(Query, (TargetSessionId,))
+            Sessions = self.DatabaseManager.ExecuteQuery(self.SELECT_SESSION_INFO_SQL, (TargetSessionId,))
             
             if Sessions:
                 Session = Sessions[0]
                 
-                # Get message count
-                CountQuery = """
-                    SELECT COUNT(*) as MessageCount
-                    FROM Conversations
-                    WHERE SessionId = ?
-                """
-                
-                CountResult = self.DatabaseManager.ExecuteQuery(CountQuery, (TargetSessionId,))
-                MessageCount = CountResult[0]["MessageCount"] if CountResult else 0
+                # Only resumed sessions carry a ResumedFrom key
+                if Session["ResumedFrom"] is None:
+                    del Session["ResumedFrom"]
                 
-                # Add message count to result
-                Session["MessageCount"] = MessageCount
-                
-                # Check if this is a resumed session
-                RelationQuery = """
-                    SELECT ParentSessionId
-                    FROM SessionRelationships
-                    WHERE ChildSessionId = ? AND RelationType = 'RESUME'
-                """
-                
-                RelationResult = self.DatabaseManager.ExecuteQuery(RelationQuery, (TargetSessionId,))
-                if RelationResult:
-                    Session["ResumedFrom"] = RelationResult[0]["ParentSessionId"]
+                if Session["Status"] != "ACTIVE":
+                    with self.CacheLock:
+                        self.InfoCache[TargetSessionId] = dict(Session)
                 
                 return Session
             
             return None
         except Exception as e:
-            self.Logger.error(f"Error getting session info: {e}")
+            self.Logger.error("Error getting session info: %s", e)
             return None
     
     def GetSessionHistory(self, Limit=10):
@@ -577,18 +1247,19 @@ class SessionManager:
             list: List of session dictionaries
         """
         try:
-            Query = """
-                SELECT SessionId, StartTime, EndTime, Status, Summary
-                FROM Sessions
-                ORDER BY StartTime DESC
-                LIMIT ?
-            """
+            with self.CacheLock:
+                Cached = self.HistoryCache.get(Limit)
+                if Cached and time.monotonic() - Cached[0] < self.HISTORY_CACHE_TTL:
+                    return [dict(Session) for Session in Cached[1]]
+            
+            Sessions = self.DatabaseManager.ExecuteQuery(self.SELECT_HISTORY_SQL, (Limit,))
             
-            Sessions = self.DatabaseManager.ExecuteQuery(Query, (Limit,))
+            with self.CacheLock:
+                self.HistoryCache[Limit] = (time.monotonic(), [dict(Session) for Session in Sessions])
             
             return Sessions
         except Exception as e:
-            self.Logger.error(f"Error getting session history: {e}")
+            self.Logger.error("Error getting session history: %s", e)
             return []
     
     def GetCrashedSessions(self):
@@ -599,29 +1270,26 @@ class SessionManager:
             list: List of crashed session dictionaries
         """
         try:
-            Query = """
-                SELECT SessionId, StartTime, EndTime, Status, Summary
-                FROM Sessions
-                WHERE Status = 'CRASHED'
-                ORDER BY StartTime DESC
-            """
-            
-            Sessions = self.DatabaseManager.ExecuteQuery(Query)
+            Sessions = self.DatabaseManager.ExecuteQuery(self.SELECT_CRASHED_SQL)
             
             return Sessions
         except Exception as e:
-            self.Logger.error(f"Error getting crashed sessions: {e}")
+            self.Logger.error("Error getting crashed sessions: %s", e)
             return []
     
     def CleanExit(self):
         """Clean up on normal exit."""
+        # Record queued messages and write any pending state before the process goes away
+        self.StopIOExecutor()
+        self.StopStateFlusher()
+        
         if self.SessionId:
-            self.Logger.info(f"Clean exit for session {self.SessionId}")
-            
-            # Remove lock file if it exists
-            if os.path.exists(self.LockFile):
-                os.remove(self.LockFile)
-                self.Logger.info("Lock file removed during clean exit")
+            self.Logger.info("Clean exit for session %s", self.SessionId)
+        
+        # Clear the lock file and release the flock
+        if self.LockHeld:
+            self.Logger.info("Lock file released during clean exit")
+        self.ReleaseLock()
     
     def GetSessionStateSnapshots(self, SessionId=None, Limit=10):
         """
@@ -641,19 +1309,11 @@ class SessionManager:
             
             TargetSessionId = SessionId if SessionId else self.SessionId
             
-            Query = """
-                SELECT SnapshotId, SessionId, Timestamp
-                FROM StateSnapshots
-                WHERE SessionId = ?
-                ORDER BY Timestamp DESC
-                LIMIT ?
-            """
-            
-            Snapshots = self.DatabaseManager.ExecuteQuery(Query, (TargetSessionId, Limit))
+            Snapshots = self.DatabaseManager.ExecuteQuery(self.SELECT_SNAPSHOTS_SQL, (TargetSessionId, Limit))
             
             return Snapshots
         except Exception as e:
-            self.Logger.error(f"Error getting session state snapshots: {e}")
+            self.Logger.error("Error getting session state snapshots: %s", e)
             return []
     
     def GetSessionStateSnapshot(self, SnapshotId):
@@ -667,13 +1327,7 @@ class SessionManager:
             dict: State snapshot
         """
         try:
-            Query = """
-                SELECT SnapshotId, SessionId, Timestamp, StateData
-                FROM StateSnapshots
-                WHERE SnapshotId = ?
-            """
-            
-            Snapshots = self.DatabaseManager.ExecuteQuery(Query, (SnapshotId,))
+            Snapshots = self.DatabaseManager.ExecuteQuery(self.SELECT_SNAPSHOT_SQL, (SnapshotId,))
             
             if Snapshots:
                 Snapshot = Snapshots[0]
@@ -681,7 +1335,7 @@ class SessionManager:
                 # Parse state data
                 if "StateData" in Snapshot:
                     try:
-                        Snapshot["State"] = json.loads(Snapshot["StateData"])
+                        Snapshot["State"] = LoadJson(Snapshot["StateData"])
                         # Remove the raw data to avoid duplication
                         del Snapshot["StateData"]
                     except:
@@ -691,7 +1345,7 @@ class SessionManager:
             
             return None
         except Exception as e:
-            self.Logger.error(f"Error getting state snapshot: {e}")
+            self.Logger.error("Error getting state snapshot: %s", e)
             return None
     
     def GetCurrentSessionState(self):
@@ -24,6 +24,16 @@ def CreateSessionRelationshipsTable(db_path):
     )
     ''')
     
+    # Index the parent and child lookups
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS IX_SessionRelationships_Child
+    ON SessionRelationships (ChildSessionId, RelationType)
+    ''')
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS IX_SessionRelationships_Parent
+    ON SessionRelationships (ParentSessionId)
+    ''')
+    
     conn.commit()
     conn.close()
     
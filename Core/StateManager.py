@@ -6,18 +6,87 @@
 # Description: Coordinates state management components for session continuity
 
 import os
+import time
 import logging
-import uuid
-from datetime import datetime
+import logging.handlers
 import atexit
+import threading
+import weakref
 
 from Core.DatabaseManager import DatabaseManager
 from Core.ConfigManager import ConfigManager
 from Core.SessionManager import SessionManager
-from Core.ActionTracker import ActionTracker
-from Core.ContextManager import ContextManager
-from Core.ContinuityDocGenerator import ContinuityDocGenerator
-from Core.ValidationManager import ValidationManager
+
+class BufferedLogHandler(logging.StreamHandler):
+    """
+    Stream handler that leaves flushing to its buffered stream.
+    
+    Records are written without a per-record flush, so the stream's buffer
+    batches them into large writes. Errors and above are flushed immediately.
+    """
+    
+    def emit(self, Record):
+        """Write a formatted record, flushing only for errors."""
+        try:
+            self.stream.write(self.format(Record) + self.terminator)
+            if Record.levelno >= logging.ERROR:
+                self.flush()
+        except Exception:
+            self.handleError(Record)
+
+# StateManager instances that have not exited yet
+LIVE_MANAGERS = weakref.WeakSet()
+
+def CleanExitAll():
+    """Run CleanExit for every StateManager that is still alive."""
+    for Manager in list(LIVE_MANAGERS):
+        Manager.CleanExit()
+
+# One exit hook for all instances; the weak set does not keep managers alive
+atexit.register(CleanExitAll)
+
+# Directories already created or confirmed by EnsureDirectory
+ENSURED_DIRS = set()
+
+def EnsureDirectory(DirPath):
+    """
+    Create a directory once per process, skipping the filesystem call afterwards.
+    
+    Args:
+        DirPath (str): Directory to create if it does not exist
+    """
+    # Key on the absolute path so a change of working directory is noticed
+    FullPath = os.path.abspath(DirPath)
+    if FullPath in ENSURED_DIRS:
+        return
+    os.makedirs(FullPath, exist_ok=True)
+    ENSURED_DIRS.add(FullPath)
+
+class CachedFormatter(logging.Formatter):
+    """
+    Formatter that reuses the date and time text for records in the same second.
+    
+    Only the millisecond suffix is formatted per record; strftime runs once
+    per second of log activity.
+    """
+    
+    def __init__(self, *Args, **Kwargs):
+        """Initialize the formatter with an empty time cache."""
+        super().__init__(*Args, **Kwargs)
+        # (second, formatted text), replaced as a single reference
+        self.SecondCache = (None, "")
+    
+    def formatTime(self, Record, DateFormat=None):
+        """Format the record time as 'YYYY-MM-DD HH:MM:SS,mmm'."""
+        if DateFormat:
+            return super().formatTime(Record, DateFormat)
+        
+        Second = int(Record.created)
+        CachedSecond, SecondText = self.SecondCache
+        if Second != CachedSecond:
+            SecondText = time.strftime("%Y-%m-%d %H:%M:%S", self.converter(Second))
+            self.SecondCache = (Second, SecondText)
+        return f"{SecondText},{int(Record.msecs):03d}"
 
 class StateManager:
     """
@@ -30,55 +99,125 @@ class StateManager:
     - Managing the lifecycle of sessions and their data
     """
     
+    # Log file write buffer size in bytes
+    LOG_BUFFER_BYTES = 64 * 1024
+    
+    # Records held in memory before they are handed to the log file
+    LOG_BUFFER_CAPACITY = 512
+    
     def __init__(self, DbPath="State/AIDevHub.db"):
         """Initialize the state manager and its components."""
         # Set up logging
         self.SetupLogging()
         
-        # Initialize components
+        # Initialize core components; the session manager runs crash recovery
         self.DatabaseManager = DatabaseManager(DbPath)
         self.ConfigManager = ConfigManager(self.DatabaseManager)
         self.SessionManager = SessionManager(self.DatabaseManager, self.ConfigManager)
-        self.ActionTracker = ActionTracker(self.DatabaseManager, self.SessionManager)
-        self.ContextManager = ContextManager(self.DatabaseManager, self.SessionManager)
-        self.ContinuityDocGenerator = ContinuityDocGenerator(
-            self.DatabaseManager, 
-            self.SessionManager,
-            self.ConfigManager
-        )
-        self.ValidationManager = ValidationManager(self.DatabaseManager)
+        
+        # Remaining components are created on first use
+        self.Components = {}
+        self.ComponentLock = threading.Lock()
         
         # Get session ID from session manager
         self.SessionId = self.SessionManager.SessionId
         
-        # Register exit handler
-        atexit.register(self.CleanExit)
+        # Register for the shared exit handler
+        self.ExitComplete = False
+        LIVE_MANAGERS.add(self)
         
-        self.Logger.info("StateManager initialized with all components")
+        self.Logger.info("StateManager initialized")
+    
+    def GetComponent(self, Name, Factory):
+        """
+        Get a lazily created component, creating it on first use.
+        
+        Args:
+            Name (str): Component name
+            Factory (callable): Creates the component
+            
+        Returns:
+            Any: The component instance
+        """
+        Component = self.Components.get(Name)
+        if Component is None:
+            with self.ComponentLock:
+                Component = self.Components.get(Name)
+                if Component is None:
+                    Component = Factory()
+                    self.Components[Name] = Component
+        return Component
+    
+    @property
+    def ActionTracker(self):
+        """ActionTracker: Tracks actions for the current session."""
+        def Create():
+            from Core.ActionTracker import ActionTracker
+            return ActionTracker(self.DatabaseManager, self.SessionManager)
+        return self.GetComponent("ActionTracker", Create)
+    
+    @property
+    def ContextManager(self):
+        """ContextManager: Session context storage."""
+        def Create():
+            from Core.ContextManager import ContextManager
+            return ContextManager(self.DatabaseManager, self.SessionManager)
+        return self.GetComponent("ContextManager", Create)
+    
+    @property
+    def ContinuityDocGenerator(self):
+        """ContinuityDocGenerator: Builds continuity documents."""
+        def Create():
+            from Core.ContinuityDocGenerator import ContinuityDocGenerator
+            return ContinuityDocGenerator(self.DatabaseManager, self.SessionManager, self.ConfigManager)
+        return self.GetComponent("ContinuityDocGenerator", Create)
+    
+    @property
+    def ValidationManager(self):
+        """ValidationManager: Input and field validation."""
+        def Create():
+            from Core.ValidationManager import ValidationManager
+            return ValidationManager(self.DatabaseManager)
+        return self.GetComponent("ValidationManager", Create)
     
     def SetupLogging(self):
         """Set up logging for the state manager."""
         # Create logs directory if it doesn't exist
-        os.makedirs("Logs", exist_ok=True)
+        EnsureDirectory("Logs")
         
         # Configure logger
         self.Logger = logging.getLogger("StateManager")
         self.Logger.setLevel(logging.INFO)
         
-        # File handler
-        LogFile = f"Logs/state_manager_{datetime.now().strftime('%Y%m%d')}.log"
-        FileHandler = logging.FileHandler(LogFile)
+        # The logger is shared, so reuse the handlers an earlier instance attached
+        for Handler in self.Logger.handlers:
+            if isinstance(Handler, logging.handlers.MemoryHandler) and isinstance(Handler.target, BufferedLogHandler):
+                self.LogBuffer = Handler
+                self.LogFileHandler = Handler.target
+                self.LogStream = Handler.target.stream
+                return
+        
+        # File handler, buffered so many records share one write
+        LogFile = f"Logs/state_manager_{time.strftime('%Y%m%d')}.log"
+        self.LogStream = open(LogFile, "a", buffering=self.LOG_BUFFER_BYTES, encoding="utf-8")
+        FileHandler = BufferedLogHandler(self.LogStream)
+        self.LogFileHandler = FileHandler
+        self.LogBuffer = logging.handlers.MemoryHandler(
+            capacity=self.LOG_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=FileHandler
+        )
         
         # Console handler
         ConsoleHandler = logging.StreamHandler()
         
         # Format
-        Formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        Formatter = CachedFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
         FileHandler.setFormatter(Formatter)
         ConsoleHandler.setFormatter(Formatter)
         
-        # Add handlers
-        self.Logger.addHandler(FileHandler)
+        # Add handlers (console stays unbuffered)
+        self.Logger.addHandler(self.LogBuffer)
         self.Logger.addHandler(ConsoleHandler)
     
     def StartSession(self):
@@ -132,7 +271,20 @@ class StateManager:
         """
         return self.SessionManager.RecordMessage(Source, Content)
     
-    def ExecuteActionWithTracking(self, ActionType, ActionFunction, Params=None):
+    def RecordMessageAsync(self, Source, Content):
+        """
+        Record a message in the conversation without waiting for it to be stored.
+        
+        Args:
+            Source (str): Source of the message (e.g., "User", "Assistant")
+            Content (str): Message content
+            
+        Returns:
+            concurrent.futures.Future: Resolves to the message ID, or None on failure
+        """
+        return self.SessionManager.RecordMessageAsync(Source, Content)
+    
+    def ExecuteActionWithTracking(self, ActionType, ActionFunction, Params=None, Durable=True):
         """
         Execute an action with tracking.
         
@@ -140,11 +292,12 @@ class StateManager:
             ActionType (str): Type of action being performed
             ActionFunction (callable): Function to execute
             Params (dict, optional): Parameters for the function
+            Durable (bool, optional): Record the start before running (see ActionTracker.ExecuteAction)
             
         Returns:
             tuple: (success, result, action_id)
         """
-        return self.ActionTracker.ExecuteAction(ActionType, ActionFunction, Params)
+        return self.ActionTracker.ExecuteAction(ActionType, ActionFunction, Params, Durable)
     
     def GetContext(self, Key=None):
         """
@@ -338,11 +491,11 @@ class StateManager:
         """
         # Backup the database
         if not BackupPath:
-            Timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+            Timestamp = time.strftime("%Y%m%d%H%M%S")
             BackupPath = f"State/Backup/state_backup_{Timestamp}"
         
         # Ensure directory exists
-        os.makedirs(os.path.dirname(BackupPath), exist_ok=True)
+        EnsureDirectory(os.path.dirname(BackupPath))
         
         # Backup database
         DbBackupPath = f"{BackupPath}.db"
@@ -350,13 +503,18 @@ class StateManager:
         
         # Generate a continuity document
         DocPath = f"{BackupPath}_continuity.md"
-        self.ContinuityDocGenerator.GenerateContinuityDocument(Final=False)
+        self.ContinuityDocGenerator.GenerateContinuityDocument(Final=False, OutputPath=DocPath)
         
         self.Logger.info(f"State backup created at {BackupPath}")
         return BackupPath
     
     def CleanExit(self):
         """Clean up on normal exit."""
+        if self.ExitComplete:
+            return
+        self.ExitComplete = True
+        LIVE_MANAGERS.discard(self)
+        
         # Let the session manager handle its exit logic
         if hasattr(self, 'SessionManager'):
             self.SessionManager.CleanExit()
@@ -366,3 +524,12 @@ class StateManager:
             self.DatabaseManager.CloseConnections()
             
         self.Logger.info("StateManager clean exit complete")
+        
+        # Persist buffered log records
+        self.FlushLogs()
+    
+    def FlushLogs(self):
+        """Write buffered log records through to the log file."""
+        if hasattr(self, 'LogBuffer'):
+            self.LogBuffer.flush()
+            self.LogFileHandler.flush()
@@ -6,12 +6,186 @@
 # Description: Manages validation rules and validates input against them
 
 import re
+import string
 import logging
-import uuid
-import json
 import threading
 from datetime import datetime
 
+from Core.IdGenerator import NewId
+from Core.JsonUtils import DumpJsonBytes, LoadJson
+
+# PCRE2 compiles patterns with its JIT; fall back to the standard library when it is missing
+try:
+    import pcre2
+except ImportError:
+    pcre2 = None
+
+# A group ending in an unbounded quantifier that is itself repeated, e.g. (a+)+ or (\w*)*
+NESTED_QUANTIFIER_RE = re.compile(r"\((?:[^()\\]|\\.)*[+*]\)[+*{]")
+
+# A group that starts with a literal its negated class excludes, e.g. (/[^/ ]*); each
+# repetition must begin at that literal, so repeating the group cannot backtrack
+DELIMITED_GROUP_RE = re.compile(r"\((\\[^A-Za-z0-9]|[^\\()\[\]{}.*+?|^$])\[\^([^\]\\]*)\][+*]\)")
+
+def HasNestedQuantifier(Pattern):
+    """
+    Check whether a pattern repeats a group ending in an unbounded quantifier.
+    
+    Args:
+        Pattern (str): Regular expression pattern
+        
+    Returns:
+        bool: True if a repeated group can backtrack exponentially
+    """
+    for Match in NESTED_QUANTIFIER_RE.finditer(Pattern):
+        Delimited = DELIMITED_GROUP_RE.fullmatch(Match.group()[:-1])
+        if not Delimited or Delimited.group(1)[-1] not in Delimited.group(2):
+            return True
+    return False
+
+def RefuseUnsafePattern(Value):
+    """Check used for stored rules whose pattern nests unbounded quantifiers; the regex never runs."""
+    raise ValueError("Pattern nests unbounded quantifiers and is refused")
+
+def CompilePattern(Pattern):
+    """
+    Compile a validation pattern with the fastest available regex engine.
+    
+    Args:
+        Pattern (str): Regular expression pattern
+        
+    Returns:
+        Any: Compiled pattern with a re-compatible match() method
+        
+    Raises:
+        re.error: If the pattern is invalid
+    """
+    if pcre2 is not None:
+        try:
+            return pcre2.compile(Pattern)
+        except Exception:
+            # Syntax PCRE2 does not accept is left to the standard library
+            pass
+    return re.compile(Pattern)
+
+# Character sets used by the built-in rule patterns
+ASCII_LETTERS = frozenset(string.ascii_letters)
+ASCII_DIGITS = frozenset(string.digits)
+DOMAIN_CHARS = ASCII_LETTERS | ASCII_DIGITS | frozenset(".-")
+EMAIL_LOCAL_CHARS = DOMAIN_CHARS | frozenset("_%+")
+
+def CheckDomain(Text):
+    """Match [a-zA-Z0-9.-]+\\.[a-zA-Z]{2,} without a regex."""
+    Head, Dot, Tld = Text.rpartition(".")
+    return (
+        bool(Dot) and bool(Head) and len(Tld) >= 2
+        and ASCII_LETTERS.issuperset(Tld) and DOMAIN_CHARS.issuperset(Head)
+    )
+
+def CheckEmail(Value):
+    """Match the built-in EMAIL pattern without a regex."""
+    Local, At, Domain = Value.partition("@")
+    return bool(At) and bool(Local) and EMAIL_LOCAL_CHARS.issuperset(Local) and CheckDomain(Domain)
+
+def CheckIpAddress(Value):
+    """Match the built-in IPADDRESS pattern (four dot-separated groups of 1-3 digits) without a regex."""
+    Parts = Value.split(".")
+    return len(Parts) == 4 and all(0 < len(Part) <= 3 and ASCII_DIGITS.issuperset(Part) for Part in Parts)
+
+def CheckUrl(Value):
+    """Match the built-in URL pattern without a regex."""
+    Scheme, Separator, Rest = Value.partition("://")
+    if not Separator or Scheme not in ("http", "https"):
+        return False
+    Host, Slash, Path = Rest.partition("/")
+    return CheckDomain(Host) and "\n" not in Path
+
+# A whole pattern that is one character class with a quantifier, e.g. ^[a-zA-Z0-9_-]{3,16}$
+CHAR_CLASS_PATTERN_RE = re.compile(r"\^\[([^\]^][^\]]*)\](?:([+*])|\{(\d+)(?:(,)(\d*))?\})\$")
+
+def ParseCharClass(Body):
+    """
+    Expand the body of a character class made of literals, escaped punctuation and ranges.
+    
+    Args:
+        Body (str): Text between the brackets
+        
+    Returns:
+        str: Characters in the class, or None if the body uses anything else (\\d, \\w, ...)
+    """
+    Chars = []
+    Index = 0
+    while Index < len(Body):
+        Char = Body[Index]
+        if Char == "\\":
+            Index += 1
+            if Index == len(Body) or Body[Index].isalnum():
+                return None
+            Char = Body[Index]
+        elif Char == "[":
+            return None
+        
+        if Body.startswith("-", Index + 1) and Index + 2 < len(Body):
+            End = Body[Index + 2]
+            if End == "\\" or End < Char:
+                return None
+            Chars.extend(chr(Code) for Code in range(ord(Char), ord(End) + 1))
+            Index += 3
+        else:
+            Chars.append(Char)
+            Index += 1
+    
+    if not all(" " <= Char <= "~" for Char in Chars):
+        return None
+    return "".join(sorted(set(Chars)))
+
+def BuildCharClassCheck(Pattern):
+    """
+    Build a plain-Python check for a pattern that is a single quantified character class.
+    
+    Args:
+        Pattern (str): Regular expression pattern
+        
+    Returns:
+        Callable: Function taking a string and returning whether it matches, or None if
+        the pattern has any other shape
+    """
+    Match = CHAR_CLASS_PATTERN_RE.fullmatch(Pattern)
+    if not Match:
+        return None
+    Body, Repeat, Minimum, Comma, Maximum = Match.groups()
+    Chars = ParseCharClass(Body)
+    if Chars is None:
+        return None
+    
+    if Repeat:
+        MinLength, MaxLength = (1 if Repeat == "+" else 0), None
+    else:
+        MinLength = int(Minimum)
+        MaxLength = None if Comma and not Maximum else int(Maximum or Minimum)
+        if MaxLength is not None and MaxLength < MinLength:
+            return None
+    
+    def Check(Value):
+        # str.strip removes every leading character in the class, so nothing is
+        # left exactly when the whole value is made of them
+        return (
+            len(Value) >= MinLength and (MaxLength is None or len(Value) <= MaxLength)
+            and not Value.strip(Chars)
+        )
+    return Check
+
+# Plain-Python checks for the seeded default patterns, keyed by exact pattern text.
+# A rule whose pattern has been changed falls back to its regex.
+PATTERN_CHECKS = {
+    '^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}$': CheckEmail,
+    '^(?:[0-9]{1,3}\\.){3}[0-9]{1,3}$': CheckIpAddress,
+    '^(http|https)://[a-zA-Z0-9.-]+\\.[a-zA-Z]{2,}(/.*)?$': CheckUrl
+}
+
+# Maximum number of remembered ValidateInput/ValidateField results before the memo is reset
+RESULT_CACHE_SIZE = 4096
+
 class ValidationManager:
     """
     Manages validation rules and validates input.
@@ -23,11 +197,70 @@ class ValidationManager:
     - Providing validation errors
     """
     
+    # Statement text is shared so each connection's sqlite3 statement cache reuses the
+    # prepared statement instead of parsing the SQL again
+    SELECT_RULES_SQL = "SELECT RuleId, RuleType, Pattern, ErrorMessage FROM ValidationRules"
+    SELECT_RULE_BY_TYPE_SQL = SELECT_RULES_SQL + " WHERE RuleType = ?"
+    SELECT_RULE_BY_ID_SQL = SELECT_RULES_SQL + " WHERE RuleId = ?"
+    SELECT_FIELDS_SQL = "SELECT FieldId, FieldName, ValidationRuleId, Required, Description FROM InputFields"
+    SELECT_FIELD_SQL = SELECT_FIELDS_SQL + " WHERE FieldName = ?"
+    CLEAR_FIELD_RULE_SQL = "UPDATE InputFields SET ValidationRuleId = NULL WHERE ValidationRuleId = ?"
+    DELETE_RULE_SQL = "DELETE FROM ValidationRules WHERE RuleId = ?"
+    DELETE_FIELD_SQL = "DELETE FROM InputFields WHERE FieldId = ?"
+    
+    # Upserts keyed on the unique RuleType and FieldName; a missing Description keeps the stored one
+    UPSERT_RULE_SQL = """
+        INSERT INTO ValidationRules (RuleId, RuleType, Pattern, ErrorMessage, Description)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (RuleType) DO UPDATE SET
+            Pattern = excluded.Pattern,
+            ErrorMessage = excluded.ErrorMessage,
+            Description = COALESCE(excluded.Description, Description)
+        RETURNING RuleId
+    """
+    
+    UPSERT_FIELD_SQL = """
+        INSERT INTO InputFields (FieldId, FieldName, ValidationRuleId, Required, Description)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (FieldName) DO UPDATE SET
+            ValidationRuleId = excluded.ValidationRuleId,
+            Required = excluded.Required,
+            Description = COALESCE(excluded.Description, Description)
+        RETURNING FieldId
+    """
+    
+    # Batch forms for ImportRules; field rows look up their rule by type and are skipped if it is missing
+    IMPORT_RULE_SQL = """
+        INSERT INTO ValidationRules (RuleId, RuleType, Pattern, ErrorMessage, Description)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (RuleType) DO UPDATE SET
+            Pattern = excluded.Pattern,
+            ErrorMessage = excluded.ErrorMessage,
+            Description = COALESCE(excluded.Description, Description)
+    """
+    
+    IMPORT_FIELD_SQL = """
+        INSERT INTO InputFields (FieldId, FieldName, ValidationRuleId, Required, Description)
+        SELECT ?, ?, RuleId, ?, ? FROM ValidationRules WHERE RuleType = ?
+        ON CONFLICT (FieldName) DO UPDATE SET
+            ValidationRuleId = excluded.ValidationRuleId,
+            Required = excluded.Required,
+            Description = COALESCE(excluded.Description, Description)
+    """
+    
     def __init__(self, DatabaseManager):
         """Initialize the validation manager."""
         self.DatabaseManager = DatabaseManager
+        # Caches are copy-on-write: readers use the current dict without locking,
+        # writers build a new dict under CacheLock and swap it in
         self.RulesCache = {}
         self.FieldRulesCache = {}
+        # Names of required fields, rebuilt whenever FieldRulesCache changes
+        self.RequiredFields = frozenset()
+        # Memoized results keyed by (RuleType, Input) and (FieldName, Value);
+        # replaced with empty dicts whenever a rule or field rule changes
+        self.InputResults = {}
+        self.FieldResults = {}
         self.CacheLock = threading.RLock()
         
         # Set up logging
@@ -43,51 +276,205 @@ class ValidationManager:
         """Load validation rules from the database."""
         try:
             # Load rules
-            Query = "SELECT RuleId, RuleType, Pattern, ErrorMessage FROM ValidationRules"
-            Rules = self.DatabaseManager.ExecuteQuery(Query)
+            Rules = self.DatabaseManager.ExecuteQuery(self.SELECT_RULES_SQL)
             
             # Load field rules
-            FieldQuery = """
-                SELECT FieldId, FieldName, ValidationRuleId, Required, Description 
-                FROM InputFields
-            """
-            Fields = self.DatabaseManager.ExecuteQuery(FieldQuery)
+            Fields = self.DatabaseManager.ExecuteQuery(self.SELECT_FIELDS_SQL)
             
-            with self.CacheLock:
-                # Clear existing cache
-                self.RulesCache.clear()
-                self.FieldRulesCache.clear()
+            # Build fresh caches
+            RulesCache = {}
+            for Rule in Rules:
+                # Rows are already dictionaries; cache them as they are
+                self.PrepareRule(Rule)
                 
-                # Populate rules cache
-                for Rule in Rules:
-                    RuleDict = {
-                        "RuleId": Rule["RuleId"],
-                        "RuleType": Rule["RuleType"],
-                        "Pattern": Rule["Pattern"],
-                        "ErrorMessage": Rule["ErrorMessage"]
-                    }
-                    
-                    # Cache by both ID and type for efficient lookup
-                    self.RulesCache[Rule["RuleId"]] = RuleDict
-                    
-                    # Also store by rule type, assuming rule types are unique
-                    # If multiple rules share the same type, this will keep the last one
-                    self.RulesCache[Rule["RuleType"]] = RuleDict
+                # Cache by both ID and type for efficient lookup
+                RulesCache[Rule["RuleId"]] = Rule
                 
-                # Populate field rules cache
-                for Field in Fields:
-                    self.FieldRulesCache[Field["FieldName"]] = {
-                        "FieldId": Field["FieldId"],
-                        "ValidationRuleId": Field["ValidationRuleId"],
-                        "Required": bool(Field["Required"]),
-                        "Description": Field["Description"]
-                    }
+                # Also store by rule type, assuming rule types are unique
+                # If multiple rules share the same type, this will keep the last one
+                RulesCache[Rule["RuleType"]] = Rule
+            
+            FieldRulesCache = {}
+            for Field in Fields:
+                Field["Required"] = bool(Field["Required"])
+                # Link the field straight to its rule (None if the rule is missing)
+                Field["Rule"] = RulesCache.get(Field["ValidationRuleId"])
+                FieldRulesCache[Field["FieldName"]] = Field
+            
+            # Swap them in
+            with self.CacheLock:
+                self.RulesCache = RulesCache
+                self.FieldRulesCache = FieldRulesCache
+                self.RefreshRequiredFields()
+                self.ClearResults()
             
             self.Logger.info(f"Loaded {len(Rules)} validation rules and {len(Fields)} field rules")
         except Exception as e:
             self.Logger.error(f"Error loading validation rules: {e}")
             raise
     
+    def UpdateRulesCache(self, Rules=(), RemoveKeys=()):
+        """
+        Replace the rules cache with a copy that includes the given changes.
+        
+        Args:
+            Rules (iterable, optional): Rule dictionaries to cache by ID and type
+            RemoveKeys (iterable, optional): Rule IDs or types to drop
+        """
+        with self.CacheLock:
+            RulesCache = dict(self.RulesCache)
+            for Key in RemoveKeys:
+                RulesCache.pop(Key, None)
+            for Rule in Rules:
+                RulesCache[Rule["RuleId"]] = Rule
+                RulesCache[Rule["RuleType"]] = Rule
+            self.RulesCache = RulesCache
+            self.LinkFieldRules()
+            self.ClearResults()
+    
+    def UpdateFieldRulesCache(self, FieldName, FieldRule=None):
+        """
+        Replace the field rules cache with a copy that sets or drops one field.
+        
+        Args:
+            FieldName (str): Name of the field
+            FieldRule (dict, optional): Field rule to cache, or None to drop the field
+        """
+        with self.CacheLock:
+            FieldRulesCache = dict(self.FieldRulesCache)
+            if FieldRule is None:
+                FieldRulesCache.pop(FieldName, None)
+            else:
+                FieldRule["Rule"] = self.RulesCache.get(FieldRule["ValidationRuleId"])
+                FieldRulesCache[FieldName] = FieldRule
+            self.FieldRulesCache = FieldRulesCache
+            self.RefreshRequiredFields()
+            self.ClearResults()
+    
+    def ClearResults(self):
+        """Forget memoized validation results; call whenever a rule changes."""
+        self.InputResults = {}
+        self.FieldResults = {}
+    
+    def RememberResult(self, Results, Key, Result):
+        """
+        Memoize a validation result, resetting the memo once it is full.
+        
+        Args:
+            Results (dict): InputResults or FieldResults snapshot taken before the rule lookup
+            Key (tuple): Cache key
+            Result (tuple): (is_valid, error_message)
+            
+        Returns:
+            tuple: The result, unchanged
+        """
+        if len(Results) >= RESULT_CACHE_SIZE:
+            Results.clear()
+        Results[Key] = Result
+        return Result
+    
+    def LinkFieldRules(self):
+        """Rebuild the field rules cache with each field linked to its current rule; call with CacheLock held."""
+        RulesCache = self.RulesCache
+        self.FieldRulesCache = {
+            FieldName: dict(FieldRule, Rule=RulesCache.get(FieldRule["ValidationRuleId"]))
+            for FieldName, FieldRule in self.FieldRulesCache.items()
+        }
+    
+    def RefreshRequiredFields(self):
+        """Rebuild the set of required field names; call with CacheLock held."""
+        self.RequiredFields = frozenset(
+            FieldName for FieldName, FieldRule in self.FieldRulesCache.items() if FieldRule["Required"]
+        )
+    
+    def BuildRule(self, RuleId, RuleType, Pattern, ErrorMessage):
+        """
+        Build a cached rule dictionary with its pattern compiled once.
+        
+        Args:
+            RuleId (str): Rule ID
+            RuleType (str): Type of rule
+            Pattern (str): Regular expression pattern
+            ErrorMessage (str): Error message on validation failure
+            
+        Returns:
+            dict: Rule dictionary; "Compiled" is None if the pattern is invalid
+        """
+        return self.PrepareRule({
+            "RuleId": RuleId,
+            "RuleType": RuleType,
+            "Pattern": Pattern,
+            "ErrorMessage": ErrorMessage
+        })
+    
+    def PrepareRule(self, Rule):
+        """
+        Add the compiled pattern and plain-Python check to a rule dictionary in place.
+        
+        Args:
+            Rule (dict): Rule dictionary or query row with RuleType and Pattern
+            
+        Returns:
+            dict: The same dictionary; "Compiled" is None if the pattern is invalid
+        """
+        # Patterns stored before the check existed are flagged and never matched
+        if self.IsUnsafePattern(Rule["RuleType"], Rule["Pattern"]):
+            Rule["Compiled"] = None
+            Rule["Check"] = RefuseUnsafePattern
+            return Rule
+        
+        try:
+            Rule["Compiled"] = CompilePattern(Rule["Pattern"])
+        except re.error as e:
+            self.Logger.warning(f"Invalid pattern for rule '{Rule['RuleType']}': {e}")
+            Rule["Compiled"] = None
+        
+        Rule["Check"] = PATTERN_CHECKS.get(Rule["Pattern"]) or BuildCharClassCheck(Rule["Pattern"])
+        return Rule
+    
+    def IsUnsafePattern(self, RuleType, Pattern):
+        """
+        Check a pattern for a repeated group ending in an unbounded quantifier, e.g. (a+)+.
+        
+        Such patterns backtrack exponentially on near-matching input, so every
+        path that stores or loads a rule refuses them.
+        
+        Args:
+            RuleType (str): Type of rule, for the log message
+            Pattern (str): Regular expression pattern
+            
+        Returns:
+            bool: True if the pattern must be refused
+        """
+        if isinstance(Pattern, str) and HasNestedQuantifier(Pattern):
+            self.Logger.error(f"Pattern for rule '{RuleType}' nests unbounded quantifiers: {Pattern}")
+            return True
+        return False
+    
+    def MatchRule(self, Rule, Value):
+        """
+        Check that a whole value matches a rule's compiled pattern.
+        
+        The match is anchored at both ends, so a trailing newline or other
+        suffix is never accepted by a pattern ending in $.
+        
+        Args:
+            Rule (dict): Rule dictionary
+            Value (str): Value to check
+            
+        Returns:
+            bool: True if the value matches the pattern
+        """
+        Check = Rule.get("Check")
+        if Check is not None and isinstance(Value, str):
+            return Check(Value)
+        
+        Compiled = Rule.get("Compiled")
+        if Compiled is None:
+            # Invalid or uncompiled patterns raise re.error here, as before
+            Compiled = re.compile(Rule["Pattern"])
+        return Compiled.fullmatch(Value) is not None
+    
     def RegisterRule(self, RuleType, Pattern, ErrorMessage, Description=None):
         """
         Register a validation rule.
@@ -101,61 +488,19 @@ class ValidationManager:
         Returns:
             str: Rule ID if successful, None otherwise
         """
+        if self.IsUnsafePattern(RuleType, Pattern):
+            return None
+        
         try:
-            # Check if rule type already exists
-            Query = "SELECT COUNT(*) FROM ValidationRules WHERE RuleType = ?"
-            Count = self.DatabaseManager.ExecuteScalar(Query, (RuleType,))
-            
-            if Count > 0:
-                # Update existing rule
-                UpdateQuery = """
-                    UPDATE ValidationRules 
-                    SET Pattern = ?, ErrorMessage = ?
-                    WHERE RuleType = ?
-                """
-                Params = (Pattern, ErrorMessage, RuleType)
-                
-                if Description:
-                    UpdateQuery = """
-                        UPDATE ValidationRules 
-                        SET Pattern = ?, ErrorMessage = ?, Description = ?
-                        WHERE RuleType = ?
-                    """
-                    Params = (Pattern, ErrorMessage, Description, RuleType)
-                
-                self.DatabaseManager.ExecuteNonQuery(UpdateQuery, Params)
-                
-                # Get the ID
-                IdQuery = "SELECT RuleId FROM ValidationRules WHERE RuleType = ?"
-                RuleId = self.DatabaseManager.ExecuteScalar(IdQuery, (RuleType,))
-            else:
-                # Generate new rule ID
-                RuleId = str(uuid.uuid4())
-                
-                # Insert new rule
-                ColumnDict = {
-                    "RuleId": RuleId,
-                    "RuleType": RuleType,
-                    "Pattern": Pattern,
-                    "ErrorMessage": ErrorMessage
-                }
-                
-                if Description:
-                    ColumnDict["Description"] = Description
-                
-                self.DatabaseManager.InsertWithId("ValidationRules", ColumnDict)
+            # Insert, or update the existing rule of this type, in one statement
+            with self.DatabaseManager.Transaction():
+                RuleId = self.DatabaseManager.ExecuteScalar(
+                    self.UPSERT_RULE_SQL,
+                    (NewId(), RuleType, Pattern, ErrorMessage, Description or None)
+                )
             
             # Update cache
-            with self.CacheLock:
-                RuleDict = {
-                    "RuleId": RuleId,
-                    "RuleType": RuleType,
-                    "Pattern": Pattern,
-                    "ErrorMessage": ErrorMessage
-                }
-                
-                self.RulesCache[RuleId] = RuleDict
-                self.RulesCache[RuleType] = RuleDict
+            self.UpdateRulesCache([self.BuildRule(RuleId, RuleType, Pattern, ErrorMessage)])
             
             self.Logger.info(f"Registered validation rule '{RuleType}' with ID {RuleId}")
             return RuleId
@@ -163,6 +508,43 @@ class ValidationManager:
             self.Logger.error(f"Error registering validation rule: {e}")
             return None
     
+    def RegisterRules(self, Rules):
+        """
+        Register several validation rules in one transaction.
+        
+        Args:
+            Rules (list): Rule dictionaries with RuleType, Pattern, ErrorMessage and an optional Description
+            
+        Returns:
+            list: Rule IDs in the order given if successful, None otherwise
+        """
+        try:
+            # One unsafe pattern refuses the whole batch, as a malformed rule does
+            if any([self.IsUnsafePattern(Rule["RuleType"], Rule["Pattern"]) for Rule in Rules]):
+                return None
+            
+            # Upsert every rule in one transaction; each statement still returns its rule ID
+            with self.DatabaseManager.Transaction():
+                RuleIds = [
+                    self.DatabaseManager.ExecuteScalar(
+                        self.UPSERT_RULE_SQL,
+                        (NewId(), Rule["RuleType"], Rule["Pattern"], Rule["ErrorMessage"], Rule.get("Description") or None)
+                    )
+                    for Rule in Rules
+                ]
+            
+            # Update cache once for the whole batch
+            self.UpdateRulesCache([
+                self.BuildRule(RuleId, Rule["RuleType"], Rule["Pattern"], Rule["ErrorMessage"])
+                for RuleId, Rule in zip(RuleIds, Rules)
+            ])
+            
+            self.Logger.info(f"Registered {len(RuleIds)} validation rules")
+            return RuleIds
+        except Exception as e:
+            self.Logger.error(f"Error registering validation rules: {e}")
+            return None
+    
     def RegisterFieldRule(self, FieldName, RuleType, Required=False, Description=None):
         """
         Register a validation rule for a field.
@@ -183,57 +565,20 @@ class ValidationManager:
                 self.Logger.error(f"Cannot register field rule: Rule type '{RuleType}' not found")
                 return None
             
-            # Check if field already exists
-            Query = "SELECT COUNT(*) FROM InputFields WHERE FieldName = ?"
-            Count = self.DatabaseManager.ExecuteScalar(Query, (FieldName,))
-            
-            if Count > 0:
-                # Update existing field
-                UpdateQuery = """
-                    UPDATE InputFields 
-                    SET ValidationRuleId = ?, Required = ?
-                    WHERE FieldName = ?
-                """
-                Params = (Rule["RuleId"], 1 if Required else 0, FieldName)
-                
-                if Description:
-                    UpdateQuery = """
-                        UPDATE InputFields 
-                        SET ValidationRuleId = ?, Required = ?, Description = ?
-                        WHERE FieldName = ?
-                    """
-                    Params = (Rule["RuleId"], 1 if Required else 0, Description, FieldName)
-                
-                self.DatabaseManager.ExecuteNonQuery(UpdateQuery, Params)
-                
-                # Get the ID
-                IdQuery = "SELECT FieldId FROM InputFields WHERE FieldName = ?"
-                FieldId = self.DatabaseManager.ExecuteScalar(IdQuery, (FieldName,))
-            else:
-                # Generate new field ID
-                FieldId = str(uuid.uuid4())
-                
-                # Insert new field
-                ColumnDict = {
-                    "FieldId": FieldId,
-                    "FieldName": FieldName,
-                    "ValidationRuleId": Rule["RuleId"],
-                    "Required": 1 if Required else 0
-                }
-                
-                if Description:
-                    ColumnDict["Description"] = Description
-                
-                self.DatabaseManager.InsertWithId("InputFields", ColumnDict)
+            # Insert, or update the existing field, in one statement
+            with self.DatabaseManager.Transaction():
+                FieldId = self.DatabaseManager.ExecuteScalar(
+                    self.UPSERT_FIELD_SQL,
+                    (NewId(), FieldName, Rule["RuleId"], 1 if Required else 0, Description or None)
+                )
             
             # Update cache
-            with self.CacheLock:
-                self.FieldRulesCache[FieldName] = {
-                    "FieldId": FieldId,
-                    "ValidationRuleId": Rule["RuleId"],
-                    "Required": Required,
-                    "Description": Description
-                }
+            self.UpdateFieldRulesCache(FieldName, {
+                "FieldId": FieldId,
+                "ValidationRuleId": Rule["RuleId"],
+                "Required": Required,
+                "Description": Description
+            })
             
             self.Logger.info(f"Registered field rule for '{FieldName}' with rule type '{RuleType}'")
             return FieldId
@@ -251,28 +596,19 @@ class ValidationManager:
         Returns:
             dict: Rule dictionary or None if not found
         """
-        with self.CacheLock:
-            Rule = self.RulesCache.get(RuleType)
-            if Rule:
-                return Rule
+        Rule = self.RulesCache.get(RuleType)
+        if Rule:
+            return Rule
         
         # Not in cache, try database
         try:
-            Query = "SELECT RuleId, RuleType, Pattern, ErrorMessage FROM ValidationRules WHERE RuleType = ?"
-            Rules = self.DatabaseManager.ExecuteQuery(Query, (RuleType,))
+            Rules = self.DatabaseManager.ExecuteQuery(self.SELECT_RULE_BY_TYPE_SQL, (RuleType,))
             
             if Rules:
-                Rule = {
-                    "RuleId": Rules[0]["RuleId"],
-                    "RuleType": Rules[0]["RuleType"],
-                    "Pattern": Rules[0]["Pattern"],
-                    "ErrorMessage": Rules[0]["ErrorMessage"]
-                }
+                Rule = self.PrepareRule(Rules[0])
                 
                 # Update cache
-                with self.CacheLock:
-                    self.RulesCache[RuleType] = Rule
-                    self.RulesCache[Rule["RuleId"]] = Rule
+                self.UpdateRulesCache([Rule])
                 
                 return Rule
             
@@ -291,28 +627,19 @@ class ValidationManager:
         Returns:
             dict: Rule dictionary or None if not found
         """
-        with self.CacheLock:
-            Rule = self.RulesCache.get(RuleId)
-            if Rule:
-                return Rule
+        Rule = self.RulesCache.get(RuleId)
+        if Rule:
+            return Rule
         
         # Not in cache, try database
         try:
-            Query = "SELECT RuleId, RuleType, Pattern, ErrorMessage FROM ValidationRules WHERE RuleId = ?"
-            Rules = self.DatabaseManager.ExecuteQuery(Query, (RuleId,))
+            Rules = self.DatabaseManager.ExecuteQuery(self.SELECT_RULE_BY_ID_SQL, (RuleId,))
             
             if Rules:
-                Rule = {
-                    "RuleId": Rules[0]["RuleId"],
-                    "RuleType": Rules[0]["RuleType"],
-                    "Pattern": Rules[0]["Pattern"],
-                    "ErrorMessage": Rules[0]["ErrorMessage"]
-                }
+                Rule = self.PrepareRule(Rules[0])
                 
                 # Update cache
-                with self.CacheLock:
-                    self.RulesCache[RuleId] = Rule
-                    self.RulesCache[Rule["RuleType"]] = Rule
+                self.UpdateRulesCache([Rule])
                 
                 return Rule
             
@@ -333,22 +660,35 @@ class ValidationManager:
             tuple: (is_valid, error_message)
         """
         try:
+            # Check if input is None or empty before any rule lookup
+            if Input is None or Input == "":
+                return (False, "Input cannot be empty")
+            
+            # Repeated inputs are answered from the memo. The snapshot is taken
+            # before the rule lookup, so a result computed with a rule that has
+            # since changed lands in the discarded dict.
+            Results = self.InputResults
+            Key = (RuleType, Input) if type(Input) is str else None
+            if Key is not None:
+                Result = Results.get(Key)
+                if Result is not None:
+                    return Result
+            
             # Get rule by type
             Rule = self.GetRuleByType(RuleType)
             if not Rule:
                 self.Logger.warning(f"Cannot validate: Rule type '{RuleType}' not found")
                 return (False, f"Unknown validation rule: {RuleType}")
             
-            # Check if input is None or empty
-            if Input is None or Input == "":
-                return (False, "Input cannot be empty")
-            
-            # Validate using regular expression
-            Pattern = Rule["Pattern"]
-            if re.match(Pattern, Input):
-                return (True, None)
+            # Validate using the precompiled regular expression
+            if self.MatchRule(Rule, Input):
+                Result = (True, None)
             else:
-                return (False, Rule["ErrorMessage"])
+                Result = (False, Rule["ErrorMessage"])
+            
+            if Key is not None:
+                self.RememberResult(Results, Key, Result)
+            return Result
         except Exception as e:
             self.Logger.error(f"Error validating input against rule '{RuleType}': {e}")
             return (False, f"Validation error: {str(e)}")
@@ -365,56 +705,72 @@ class ValidationManager:
             tuple: (is_valid, error_message)
         """
         try:
+            # Repeated values are answered from the memo (see ValidateInput)
+            Results = self.FieldResults
+            Key = (FieldName, Value) if Value is None or type(Value) is str else None
+            if Key is not None:
+                Result = Results.get(Key)
+                if Result is not None:
+                    return Result
+            
             # Get field rule
-            FieldRule = None
-            with self.CacheLock:
-                FieldRule = self.FieldRulesCache.get(FieldName)
+            FieldRule = self.FieldRulesCache.get(FieldName)
             
             if not FieldRule:
                 # Try to load from database
-                Query = """
-                    SELECT FieldId, ValidationRuleId, Required, Description 
-                    FROM InputFields 
-                    WHERE FieldName = ?
-                """
-                Fields = self.DatabaseManager.ExecuteQuery(Query, (FieldName,))
+                Fields = self.DatabaseManager.ExecuteQuery(self.SELECT_FIELD_SQL, (FieldName,))
                 
                 if Fields:
-                    FieldRule = {
-                        "FieldId": Fields[0]["FieldId"],
-                        "ValidationRuleId": Fields[0]["ValidationRuleId"],
-                        "Required": bool(Fields[0]["Required"]),
-                        "Description": Fields[0]["Description"]
-                    }
+                    FieldRule = Fields[0]
+                    FieldRule["Required"] = bool(FieldRule["Required"])
                     
                     # Update cache
-                    with self.CacheLock:
-                        self.FieldRulesCache[FieldName] = FieldRule
+                    self.UpdateFieldRulesCache(FieldName, FieldRule)
             
             if not FieldRule:
                 self.Logger.warning(f"Cannot validate: Field '{FieldName}' not registered")
                 return (False, f"Unknown field: {FieldName}")
             
-            # Check if field is required
-            if FieldRule["Required"] and (Value is None or Value == ""):
-                return (False, f"Field '{FieldName}' is required")
-            
-            # If not required and empty, it's valid
-            if not FieldRule["Required"] and (Value is None or Value == ""):
-                return (True, None)
-            
-            # Get the rule and validate
-            Rule = self.GetRuleById(FieldRule["ValidationRuleId"])
-            if not Rule:
-                self.Logger.warning(f"Cannot validate: Rule ID '{FieldRule['ValidationRuleId']}' not found")
-                return (False, f"Unknown validation rule for field: {FieldName}")
+            # Empty values are settled by the Required flag alone
+            Rule = None
+            if Value is not None and Value != "":
+                Rule = FieldRule.get("Rule") or self.GetRuleById(FieldRule["ValidationRuleId"])
+                if not Rule:
+                    self.Logger.warning(f"Cannot validate: Rule ID '{FieldRule['ValidationRuleId']}' not found")
+                    return (False, f"Unknown validation rule for field: {FieldName}")
+            
+            Result = self.CheckFieldValue(FieldName, FieldRule, Rule, Value)
+            if Key is not None:
+                self.RememberResult(Results, Key, Result)
+            return Result
+        except Exception as e:
+            self.Logger.error(f"Error validating field '{FieldName}': {e}")
+            return (False, f"Validation error: {str(e)}")
+    
+    def CheckFieldValue(self, FieldName, FieldRule, Rule, Value):
+        """
+        Validate a field's value once its field rule and validation rule are resolved.
+        
+        Args:
+            FieldName (str): Name of the field
+            FieldRule (dict): Field rule dictionary
+            Rule (dict): Validation rule dictionary (may be None for empty values)
+            Value (str): Value to validate
             
-            # Validate using regular expression
-            Pattern = Rule["Pattern"]
-            if re.match(Pattern, Value):
+        Returns:
+            tuple: (is_valid, error_message)
+        """
+        # Check if field is required, or empty and therefore valid
+        if Value is None or Value == "":
+            if FieldRule["Required"]:
+                return (False, f"Field '{FieldName}' is required")
+            return (True, None)
+        
+        # Validate using the precompiled regular expression
+        try:
+            if self.MatchRule(Rule, Value):
                 return (True, None)
-            else:
-                return (False, Rule["ErrorMessage"])
+            return (False, Rule["ErrorMessage"])
         except Exception as e:
             self.Logger.error(f"Error validating field '{FieldName}': {e}")
             return (False, f"Validation error: {str(e)}")
@@ -430,18 +786,35 @@ class ValidationManager:
             tuple: (is_valid, errors_dict)
         """
         try:
-            Errors = {}
+            # Check for missing required fields
+            Errors = {
+                FieldName: f"Field '{FieldName}' is required"
+                for FieldName in self.RequiredFields.difference(Object)
+            }
             
+            # Every field is resolved from one cache snapshot; methods are bound once
+            FieldRulesCache = self.FieldRulesCache
+            GetFieldRule = FieldRulesCache.get
+            MatchRule = self.MatchRule
+            ValidateField = self.ValidateField
             for FieldName, Value in Object.items():
-                IsValid, ErrorMessage = self.ValidateField(FieldName, Value)
-                if not IsValid:
-                    Errors[FieldName] = ErrorMessage
-            
-            # Check for missing required fields
-            with self.CacheLock:
-                for FieldName, FieldRule in self.FieldRulesCache.items():
-                    if FieldRule["Required"] and FieldName not in Object:
+                FieldRule = GetFieldRule(FieldName)
+                Rule = FieldRule.get("Rule") if FieldRule is not None else None
+                if Rule is None:
+                    # Not cached; ValidateField falls back to the database
+                    IsValid, ErrorMessage = ValidateField(FieldName, Value)
+                    if not IsValid:
+                        Errors[FieldName] = ErrorMessage
+                elif Value is None or Value == "":
+                    if FieldRule["Required"]:
                         Errors[FieldName] = f"Field '{FieldName}' is required"
+                else:
+                    try:
+                        if not MatchRule(Rule, Value):
+                            Errors[FieldName] = Rule["ErrorMessage"]
+                    except Exception as e:
+                        self.Logger.error(f"Error validating field '{FieldName}': {e}")
+                        Errors[FieldName] = f"Validation error: {str(e)}"
             
             return (len(Errors) == 0, Errors)
         except Exception as e:
@@ -472,26 +845,16 @@ class ValidationManager:
             RuleId = Rule["RuleId"]
             
             # First update any fields using this rule to set them to NULL
-            UpdateQuery = """
-                UPDATE InputFields
-                SET ValidationRuleId = NULL
-                WHERE ValidationRuleId = ?
-            """
-            self.DatabaseManager.ExecuteNonQuery(UpdateQuery, (RuleId,))
+            self.DatabaseManager.ExecuteNonQuery(self.CLEAR_FIELD_RULE_SQL, (RuleId,))
             
             # Then delete the rule
-            DeleteQuery = "DELETE FROM ValidationRules WHERE RuleId = ?"
-            RowsAffected = self.DatabaseManager.ExecuteNonQuery(DeleteQuery, (RuleId,))
+            RowsAffected = self.DatabaseManager.ExecuteNonQuery(self.DELETE_RULE_SQL, (RuleId,))
             
             # Commit transaction
             self.DatabaseManager.CommitTransaction()
             
             # Update cache
-            with self.CacheLock:
-                if RuleId in self.RulesCache:
-                    del self.RulesCache[RuleId]
-                if RuleType in self.RulesCache:
-                    del self.RulesCache[RuleType]
+            self.UpdateRulesCache(RemoveKeys=(RuleId, RuleType))
             
             self.Logger.info(f"Deleted validation rule '{RuleType}' with ID {RuleId}")
             return RowsAffected > 0
@@ -512,9 +875,7 @@ class ValidationManager:
         """
         try:
             # Get field ID
-            FieldRule = None
-            with self.CacheLock:
-                FieldRule = self.FieldRulesCache.get(FieldName)
+            FieldRule = self.FieldRulesCache.get(FieldName)
             
             if not FieldRule:
                 self.Logger.warning(f"Cannot delete: Field rule '{FieldName}' not found")
@@ -523,13 +884,10 @@ class ValidationManager:
             FieldId = FieldRule["FieldId"]
             
             # Delete the field rule
-            DeleteQuery = "DELETE FROM InputFields WHERE FieldId = ?"
-            RowsAffected = self.DatabaseManager.ExecuteNonQuery(DeleteQuery, (FieldId,))
+            RowsAffected = self.DatabaseManager.ExecuteNonQuery(self.DELETE_FIELD_SQL, (FieldId,))
             
             # Update cache
-            with self.CacheLock:
-                if FieldName in self.FieldRulesCache:
-                    del self.FieldRulesCache[FieldName]
+            self.UpdateFieldRulesCache(FieldName)
             
             self.Logger.info(f"Deleted field rule for '{FieldName}'")
             return RowsAffected > 0
@@ -659,6 +1017,7 @@ class ValidationManager:
             self.Logger.error(f"Invalid regular expression pattern: {e}")
             return None
         
+        # RegisterRule refuses repeated groups of unbounded quantifiers
         return self.RegisterRule(RuleType, Pattern, ErrorMessage, Description)
     
     def ExportRules(self, FilePath=None):
@@ -690,8 +1049,9 @@ class ValidationManager:
                 "FieldRules": FieldRules
             }
             
-            with open(FilePath, 'w') as f:
-                json.dump(ExportData, f, indent=2)
+            # Serialize straight to bytes, with orjson when it is installed
+            with open(FilePath, 'wb') as f:
+                f.write(DumpJsonBytes(ExportData, Indent=True))
             
             self.Logger.info(f"Validation rules exported to {FilePath}")
             return FilePath
@@ -710,41 +1070,41 @@ class ValidationManager:
             bool: True if successful, False otherwise
         """
         try:
-            with open(FilePath, 'r') as f:
-                ImportData = json.load(f)
-            
-            # Begin transaction for atomic import
-            self.DatabaseManager.BeginTransaction()
-            
-            # Import rules
-            RuleCount = 0
-            if "Rules" in ImportData:
-                for Rule in ImportData["Rules"]:
-                    if "RuleType" in Rule and "Pattern" in Rule and "ErrorMessage" in Rule:
-                        Description = Rule.get("Description")
-                        self.RegisterRule(Rule["RuleType"], Rule["Pattern"], Rule["ErrorMessage"], Description)
-                        RuleCount += 1
-            
-            # Import field rules
-            FieldCount = 0
-            if "FieldRules" in ImportData:
-                for Field in ImportData["FieldRules"]:
-                    if "FieldName" in Field and "RuleType" in Field:
-                        Required = Field.get("Required", False)
-                        Description = Field.get("Description")
-                        self.RegisterFieldRule(Field["FieldName"], Field["RuleType"], Required, Description)
-                        FieldCount += 1
-            
-            # Commit transaction
-            self.DatabaseManager.CommitTransaction()
-            
-            # Reload rules to ensure cache consistency
+            with open(FilePath, 'rb') as f:
+                ImportData = LoadJson(f.read())
+            
+            # Collect rows for the batched upserts; incomplete rules and unsafe patterns are skipped
+            RuleRows = [
+                (NewId(), Rule["RuleType"], Rule["Pattern"], Rule["ErrorMessage"], Rule.get("Description") or None)
+                for Rule in ImportData.get("Rules", [])
+                if "RuleType" in Rule and "Pattern" in Rule and "ErrorMessage" in Rule
+                and not self.IsUnsafePattern(Rule["RuleType"], Rule["Pattern"])
+            ]
+            
+            FieldRows = [
+                (
+                    NewId(),
+                    Field["FieldName"],
+                    1 if Field.get("Required", False) else 0,
+                    Field.get("Description") or None,
+                    Field["RuleType"]
+                )
+                for Field in ImportData.get("FieldRules", [])
+                if "FieldName" in Field and "RuleType" in Field
+            ]
+            
+            # One transaction for the whole import; rules go first so fields can find them
+            with self.DatabaseManager.Transaction():
+                if RuleRows:
+                    self.DatabaseManager.ExecuteNonQueryMany(self.IMPORT_RULE_SQL, RuleRows)
+                if FieldRows:
+                    self.DatabaseManager.ExecuteNonQueryMany(self.IMPORT_FIELD_SQL, FieldRows)
+            
+            # Reload rules once to pick up the stored IDs
             self.LoadValidationRules()
             
-            self.Logger.info(f"Imported {RuleCount} rules and {FieldCount} field rules from {FilePath}")
+            self.Logger.info(f"Imported {len(RuleRows)} rules and {len(FieldRows)} field rules from {FilePath}")
             return True
         except Exception as e:
-            # Rollback on error
-            self.DatabaseManager.RollbackTransaction()
             self.Logger.error(f"Error importing validation rules: {e}")
             return False
\ No newline at end of file
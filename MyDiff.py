@@ -1,9 +1,234 @@
 import sys
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTextEdit, QFileDialog, QLabel
-from PySide6.QtGui import QColor, QFont, QFontDatabase
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QBrush, QColor, QFont, QFontDatabase, QTextCharFormat, QTextCursor
+from PySide6.QtCore import Qt, QObject, QThread, Signal
 
+import collections
 import difflib
+import itertools
+import operator
+import os
+
+try:
+    import diff_match_patch
+except ImportError:
+    diff_match_patch = None
+
+# Number of rendered file pairs kept by DiffWindow
+DIFF_CACHE_SIZE = 16
+
+# Largest line-count product of the changed regions that the difflib fallback is run on;
+# beyond it diff-match-patch is used when installed
+MAX_DIFF_CELLS = 10_000_000
+
+# Seconds diff-match-patch may search before settling for a coarser diff
+DMP_TIMEOUT = 2.0
+DIFF_SKIPPED_TEXT = "Diff skipped: the files differ too much to compare here (try an external tool)."
+
+# Unchanged lines shown around each change, as in diff -u
+DIFF_CONTEXT = 3
+DIFF_HEADER_COLOR = 'darkgray'
+
+# Colour and line prefix for each diff operation
+DIFF_STYLES = {
+    '=': ('white', '  '),  # Common lines
+    '-': ('red', '1: '),  # File 1 lines
+    '+': ('green', '2: '),  # File 2 lines
+}
+
+# Edit distance beyond which myers_diff gives up and difflib is used instead
+MAX_EDIT_DISTANCE = 2000
+
+def myers_diff(a_lines, b_lines, max_edits=MAX_EDIT_DISTANCE):
+    # Myers' O(ND) greedy diff: for each edit count d, v maps diagonal k = x - y
+    # to the furthest x reached; a snapshot of v is kept per d for the backtrack
+    n, m = len(a_lines), len(b_lines)
+    if abs(n - m) > max_edits:
+        return None  # at least |n - m| lines must be inserted or deleted
+    v = {1: 0}
+    trace = []
+    for d in range(min(n + m, max_edits) + 1):
+        trace.append(v.copy())
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]  # step down: insert from b
+            else:
+                x = v[k - 1] + 1  # step right: delete from a
+            y = x - k
+            while x < n and y < m and a_lines[x] == b_lines[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                break
+        else:
+            continue
+        break
+    else:
+        return None
+
+    # Walk the snapshots back from (n, m), emitting ('=' | '-' | '+', line) in reverse
+    ops = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            ops.append(('=', a_lines[x - 1]))
+            x -= 1
+            y -= 1
+        if d > 0:
+            if x == prev_x:
+                ops.append(('+', b_lines[y - 1]))
+            else:
+                ops.append(('-', a_lines[x - 1]))
+        x, y = prev_x, prev_y
+    ops.reverse()
+    return ops
+
+def difflib_diff(a_lines, b_lines):
+    # Fallback for very different files, using difflib's opcodes without Differ's
+    # intraline matching
+    ops = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a_lines, b_lines, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            ops.extend(('=', line) for line in a_lines[i1:i2])
+        else:
+            ops.extend(('-', line) for line in a_lines[i1:i2])
+            ops.extend(('+', line) for line in b_lines[j1:j2])
+    return ops
+
+def qt_length(text):
+    # Length in QTextDocument positions, which count UTF-16 code units
+    return len(text) if text.isascii() else len(text.encode('utf-16-le')) // 2
+
+def render_diff(file1_path, file2_path):
+    # Returns (original_text, new_text, diff_text, diff_runs): plain text for the three
+    # panes, with diff_runs as (start, length, colour) ranges of diff_text.
+    # diff_text is None when no lines differ.
+    with open(file1_path, 'r') as f1:
+        file1_lines = f1.readlines()
+    with open(file2_path, 'r') as f2:
+        file2_lines = f2.readlines()
+
+    original_text = ''.join(file1_lines)
+    new_text = ''.join(file2_lines)
+
+    # Lines shared at the start and end are common; only the middle is diffed
+    len1, len2 = len(file1_lines), len(file2_lines)
+    head = 0
+    while head < min(len1, len2) and file1_lines[head] == file2_lines[head]:
+        head += 1
+    tail = 0
+    while tail < min(len1, len2) - head and file1_lines[len1 - 1 - tail] == file2_lines[len2 - 1 - tail]:
+        tail += 1
+    middle1 = file1_lines[head:len1 - tail]
+    middle2 = file2_lines[head:len2 - tail]
+
+    # Diff small ints standing for distinct lines, so comparisons and hashing skip the text
+    tokens = {}
+    ids1 = [tokens.setdefault(line, len(tokens)) for line in middle1]
+    ids2 = [tokens.setdefault(line, len(tokens)) for line in middle2]
+    lines_by_id = list(tokens)
+
+    diff = myers_diff(ids1, ids2)
+    if diff is None:
+        # difflib is quadratic in the worst case, so very different large files go to
+        # diff-match-patch, which has a time limit, or are not diffed
+        if len(ids1) * len(ids2) <= MAX_DIFF_CELLS:
+            diff = difflib_diff(ids1, ids2)
+        elif diff_match_patch is not None and len(lines_by_id) <= sys.maxunicode:
+            diff = dmp_diff(ids1, ids2)
+        else:
+            return original_text, new_text, DIFF_SKIPPED_TEXT, []
+    # Only the context lines next to the trimmed head and tail can be shown
+    first = max(0, head - DIFF_CONTEXT)
+    ops = [('=', line) for line in file1_lines[first:head]]
+    ops.extend((op, lines_by_id[line_id]) for op, line_id in diff)
+    ops.extend(('=', line) for line in file1_lines[len1 - tail:len1 - tail + DIFF_CONTEXT])
+
+    # One header and one coloured range per run of lines with the same operation, per hunk
+    parts = []
+    runs = []
+    position = 0
+    for header, hunk in unified_hunks(ops, first, first):
+        blocks = [(header, DIFF_HEADER_COLOR)]
+        for op, run in itertools.groupby(hunk, key=operator.itemgetter(0)):
+            color, prefix = DIFF_STYLES[op]
+            blocks.append(("".join([prefix + line for _, line in run]), color))
+        for block, color in blocks:
+            length = qt_length(block)
+            parts.append(block)
+            runs.append((position, length, color))
+            position += length
+    diff_text = "".join(parts)
+
+    if not diff_text:
+        return original_text, new_text, None, []
+    return original_text, new_text, diff_text, runs
+
+def unified_hunks(ops, start1, start2, context=DIFF_CONTEXT):
+    # Groups changes with up to `context` common lines on each side, merging groups
+    # whose context overlaps; yields (header, ops) with a diff -u style @@ header.
+    # start1 and start2 are the 0-based line numbers of the first op in each file.
+    changes = [k for k, (op, _) in enumerate(ops) if op != '=']
+    spans = []
+    for k in changes:
+        lo, hi = max(0, k - context), min(len(ops), k + 1 + context)
+        if spans and lo <= spans[-1][1]:
+            spans[-1][1] = hi
+        else:
+            spans.append([lo, hi])
+
+    done, line1, line2 = 0, start1, start2
+    for lo, hi in spans:
+        for op, _ in ops[done:lo]:
+            line1 += op != '+'
+            line2 += op != '-'
+        hunk = ops[lo:hi]
+        count1 = sum(op != '+' for op, _ in hunk)
+        count2 = sum(op != '-' for op, _ in hunk)
+        # As in diff -u, an empty range is numbered by the line before it
+        yield f"@@ -{line1 + bool(count1)},{count1} +{line2 + bool(count2)},{count2} @@\n", hunk
+        line1 += count1
+        line2 += count2
+        done = hi
+
+def dmp_diff(a_ids, b_ids):
+    # Line-mode diff-match-patch: each line id becomes one character, as in
+    # diff_linesToChars, and its (op, text) runs are expanded back to ids
+    dmp = diff_match_patch.diff_match_patch()
+    dmp.Diff_Timeout = DMP_TIMEOUT
+    diffs = dmp.diff_main(''.join(map(chr, a_ids)), ''.join(map(chr, b_ids)), False)
+    dmp.diff_cleanupSemantic(diffs)
+    symbols = {dmp.DIFF_EQUAL: '=', dmp.DIFF_DELETE: '-', dmp.DIFF_INSERT: '+'}
+    return [(symbols[op], ord(char)) for op, text in diffs for char in text]
+
+class DiffWorker(QObject):
+    # Emits the cache key and render_diff's result, or an error message and
+    # whether it applies to all three panes
+    finished = Signal(object, object)
+    failed = Signal(str, bool)
+
+    def __init__(self, key, file1_path, file2_path):
+        super().__init__()
+        self.key = key
+        self.file1_path = file1_path
+        self.file2_path = file2_path
+
+    def run(self):
+        try:
+            self.finished.emit(self.key, render_diff(self.file1_path, self.file2_path))
+        except FileNotFoundError:
+            self.failed.emit("Error: One or both files not found.", True)
+        except Exception as e:
+            self.failed.emit(f"Error: {str(e)}", False)
 
 class DiffWindow(QWidget):
     def __init__(self):
@@ -13,6 +238,20 @@ class DiffWindow(QWidget):
         self.file1_path = ""
         self.file2_path = ""
 
+        # render_diff results keyed by both files' path, mtime and size
+        self.diff_cache = collections.OrderedDict()
+
+        # One shared character format per colour, applied to ranges of plain text
+        self.formats = {}
+        for color in {'green', 'red'}.union(color for color, _ in DIFF_STYLES.values()):
+            text_format = QTextCharFormat()
+            text_format.setForeground(QBrush(QColor(color)))
+            self.formats[color] = text_format
+
+        # Background thread and worker for the diff in progress
+        self.diff_thread = None
+        self.diff_worker = None
+
         # Widgets
         self.file1_button = QPushButton("Select Original File")
         self.file1_label = QLabel("Original File: Not selected")
@@ -28,6 +267,10 @@ class DiffWindow(QWidget):
         self.diff_text = QTextEdit()
         self.diff_text.setReadOnly(True)
 
+        fixed_font = QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont)
+        for text_edit in (self.original_text, self.new_text, self.diff_text):
+            text_edit.setFont(fixed_font)
+
         self.original_hide_button = QPushButton("Hide Original")
         self.new_hide_button = QPushButton("Hide New")
         self.diff_hide_button = QPushButton("Hide Diff")
@@ -48,10 +291,14 @@ class DiffWindow(QWidget):
         hide_layout.addWidget(self.new_hide_button)
         hide_layout.addWidget(self.diff_hide_button)
 
+        self.original_header = QLabel("Original File")
+        self.new_header = QLabel("New File")
+        self.diff_header = QLabel("Diff")
+
         self.text_layout = QHBoxLayout()
-        self.text_layout.addWidget(QLabel("Original File"))
-        self.text_layout.addWidget(QLabel("New File"))
-        self.text_layout.addWidget(QLabel("Diff"))
+        self.text_layout.addWidget(self.original_header)
+        self.text_layout.addWidget(self.new_header)
+        self.text_layout.addWidget(self.diff_header)
 
         self.display_layout = QHBoxLayout()
         self.display_layout.addWidget(self.original_text)
@@ -91,77 +338,106 @@ class DiffWindow(QWidget):
             self.check_enable_generate()
 
     def check_enable_generate(self):
-        if self.file1_path and self.file2_path:
+        if self.file1_path and self.file2_path and self.diff_worker is None:
             self.generate_button.setEnabled(True)
         else:
             self.generate_button.setEnabled(False)
 
     def generate_diff(self):
         try:
-            with open(self.file1_path, 'r') as f1:
-                file1_lines = f1.readlines()
-            with open(self.file2_path, 'r') as f2:
-                file2_lines = f2.readlines()
-
-            # Display original and new files with specified colors
-            self.original_text.setHtml(f"<pre><span style='color: green;'>{''.join(file1_lines)}</span></pre>")
-            self.new_text.setHtml(f"<pre><span style='color: red;'>{''.join(file2_lines)}</span></pre>")
-
-            diff = difflib.Differ().compare(file1_lines, file2_lines)
-            diff_text = ""
-            for line in diff:
-                if line.startswith('  '):
-                    diff_text += f"<span style='color: white;'>  {line[2:]}</span>"  # Common lines
-                elif line.startswith('- '):
-                    diff_text += f"<span style='color: red;'>1: {line[2:]}</span>"  # File 1 lines
-                elif line.startswith('+ '):
-                    diff_text += f"<span style='color: green;'>2: {line[2:]}</span>"  # File 2 lines
-                elif line.startswith('? '):
-                    diff_text += f"<span style='color: yellow;'>? {line[2:]}</span>"  # Questionable lines
-                else:
-                    diff_text += f"<span style='color: darkgray;'>{line}</span>" # Other lines (e.g. ---, +++)
-
-            if not diff_text:
-                self.diff_text.setText("No differences found.")
-            else:
-                self.diff_text.setHtml(f"<pre>{diff_text}</pre>")
+            stat1 = os.stat(self.file1_path)
+            stat2 = os.stat(self.file2_path)
+            key = (self.file1_path, stat1.st_mtime_ns, stat1.st_size,
+                   self.file2_path, stat2.st_mtime_ns, stat2.st_size)
+            if key in self.diff_cache:
+                self.diff_cache.move_to_end(key)
+                self.show_diff(*self.diff_cache[key])
+                return
+
+            # Read and diff on a background thread; the results come back as a queued signal
+            self.generate_button.setEnabled(False)
+            self.diff_thread = QThread(self)
+            self.diff_worker = DiffWorker(key, self.file1_path, self.file2_path)
+            self.diff_worker.moveToThread(self.diff_thread)
+            self.diff_thread.started.connect(self.diff_worker.run)
+            self.diff_worker.finished.connect(self.apply_diff)
+            self.diff_worker.failed.connect(self.show_error)
+            self.diff_worker.finished.connect(self.diff_thread.quit)
+            self.diff_worker.failed.connect(self.diff_thread.quit)
+            self.diff_thread.finished.connect(self.diff_worker.deleteLater)
+            self.diff_thread.finished.connect(self.diff_thread.deleteLater)
+            self.diff_thread.start()
 
         except FileNotFoundError:
-            self.original_text.setText("Error: One or both files not found.")
-            self.new_text.setText("Error: One or both files not found.")
-            self.diff_text.setText("Error: One or both files not found.")
+            self.show_error("Error: One or both files not found.", True)
         except Exception as e:
-            self.diff_text.setText(f"Error: {str(e)}")
+            self.show_error(f"Error: {str(e)}", False)
+
+    def apply_diff(self, key, result):
+        self.diff_thread = None
+        self.diff_worker = None
+        self.diff_cache[key] = result
+        if len(self.diff_cache) > DIFF_CACHE_SIZE:
+            self.diff_cache.popitem(last=False)
+        self.show_diff(*result)
+        self.check_enable_generate()
+
+    def show_diff(self, original_text, new_text, diff_text, diff_runs):
+        # Display original and new files with specified colors, repainting once at the end
+        self.setUpdatesEnabled(False)
+        try:
+            self.show_colored_text(self.original_text, original_text, [(0, qt_length(original_text), 'green')])
+            self.show_colored_text(self.new_text, new_text, [(0, qt_length(new_text), 'red')])
+
+            if diff_text is None:
+                self.diff_text.setText("No differences found.")
+            else:
+                self.show_colored_text(self.diff_text, diff_text, diff_runs)
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def show_colored_text(self, text_edit, text, runs):
+        # Plain text skips Qt's HTML parser; colours are applied as shared formats by range
+        text_edit.setPlainText(text)
+        cursor = QTextCursor(text_edit.document())
+        cursor.beginEditBlock()
+        for start, length, color in runs:
+            cursor.setPosition(start)
+            cursor.setPosition(start + length, QTextCursor.MoveMode.KeepAnchor)
+            cursor.setCharFormat(self.formats[color])
+        cursor.endEditBlock()
+
+    def show_error(self, message, all_panes):
+        self.diff_thread = None
+        self.diff_worker = None
+        if all_panes:
+            self.original_text.setText(message)
+            self.new_text.setText(message)
+        self.diff_text.setText(message)
+        self.check_enable_generate()
+
+    def closeEvent(self, event):
+        # Let a running diff finish so its thread is not destroyed while running
+        if self.diff_thread is not None:
+            self.diff_thread.quit()
+            self.diff_thread.wait()
+        super().closeEvent(event)
 
+    # Hidden widgets take no space in their layouts, so toggling visibility is enough
     def toggle_original(self):
         self.original_visible = not self.original_visible
         self.original_text.setVisible(self.original_visible)
-        self.update_layout()
+        self.original_header.setVisible(self.original_visible)
 
     def toggle_new(self):
         self.new_visible = not self.new_visible
         self.new_text.setVisible(self.new_visible)
-        self.update_layout()
+        self.new_header.setVisible(self.new_visible)
 
     def toggle_diff(self):
         self.diff_visible = not self.diff_visible
         self.diff_text.setVisible(self.diff_visible)
-        self.update_layout()
-
-    def update_layout(self):
-        # Remove all widgets from the layout
-        for i in reversed(range(self.display_layout.count())):
-            widget = self.display_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.setParent(None)
-
-        # Add the visible widgets back to the layout
-        if self.original_visible:
-            self.display_layout.addWidget(self.original_text)
-        if self.new_visible:
-            self.display_layout.addWidget(self.new_text)
-        if self.diff_visible:
-            self.display_layout.addWidget(self.diff_text)
+        self.diff_header.setVisible(self.diff_visible)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
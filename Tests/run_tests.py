@@ -5,20 +5,62 @@
 # Last Modified: 2025-03-19  1:00PM
 # Description: Script to run all tests for the AIDEV-Hub project
 
+import io
 import os
 import sys
 import unittest
-import argparse
 import time
 from datetime import datetime
 
-def RunTests(TestPattern=None, Verbose=False):
+def IterTestIds(Suite):
+    """
+    Yield the IDs of all test cases in a suite, in run order.
+    
+    Args:
+        Suite (unittest.TestSuite): Suite to flatten
+    """
+    for Test in Suite:
+        if isinstance(Test, unittest.TestSuite):
+            yield from IterTestIds(Test)
+        else:
+            yield Test.id()
+
+def RunTestShard(TestIds, SearchPaths, Verbose):
+    """
+    Run a shard of tests in a worker process.
+    
+    Args:
+        TestIds (list): IDs of the tests to run
+        SearchPaths (list): Directories to add to sys.path before loading
+        Verbose (bool): Whether to show verbose output
+        
+    Returns:
+        dict: Captured output and result counts, with failures and errors as (test, traceback) strings
+    """
+    for Path in reversed(SearchPaths):
+        if Path not in sys.path:
+            sys.path.insert(0, Path)
+    
+    Stream = io.StringIO()
+    Runner = unittest.TextTestRunner(stream=Stream, verbosity=2 if Verbose else 1)
+    Result = Runner.run(unittest.TestLoader().loadTestsFromNames(TestIds))
+    
+    return {
+        "Output": Stream.getvalue(),
+        "TestsRun": Result.testsRun,
+        "Errors": [(str(TestCase), Trace) for TestCase, Trace in Result.errors],
+        "Failures": [(str(TestCase), Trace) for TestCase, Trace in Result.failures],
+        "Skipped": len(Result.skipped)
+    }
+
+def RunTests(TestPattern=None, Verbose=False, Jobs=1):
     """
     Run tests matching the given pattern.
     
     Args:
         TestPattern (str, optional): Pattern to match test files
         Verbose (bool, optional): Whether to show verbose output
+        Jobs (int, optional): Number of worker processes; 0 uses one per CPU
     """
     # Find the base directory (parent of Tests)
     BaseDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -53,8 +95,33 @@ def RunTests(TestPattern=None, Verbose=False):
     print(f"Starting tests at {StartDateTime}\n")
     print("=" * 70)
     
-    # Run tests
-    Result = Runner.run(Suite)
+    # Run tests, in contiguous shards across worker processes when requested
+    Jobs = Jobs or os.cpu_count() or 1
+    TestIds = list(IterTestIds(Suite)) if Jobs > 1 else []
+    if len(TestIds) > 1:
+        # Imported here so serial runs do not pay for concurrent.futures
+        from concurrent.futures import ProcessPoolExecutor
+        
+        ShardSize = -(-len(TestIds) // Jobs)
+        Shards = [TestIds[i:i + ShardSize] for i in range(0, len(TestIds), ShardSize)]
+        with ProcessPoolExecutor(max_workers=len(Shards)) as Executor:
+            ShardResults = list(Executor.map(
+                RunTestShard, Shards, [[BaseDir, TestDir]] * len(Shards), [Verbose] * len(Shards)
+            ))
+        
+        for ShardResult in ShardResults:
+            print(ShardResult["Output"], end="")
+        
+        TestsRun = sum(ShardResult["TestsRun"] for ShardResult in ShardResults)
+        Errors = [Error for ShardResult in ShardResults for Error in ShardResult["Errors"]]
+        Failures = [Failure for ShardResult in ShardResults for Failure in ShardResult["Failures"]]
+        Skipped = sum(ShardResult["Skipped"] for ShardResult in ShardResults)
+    else:
+        Result = Runner.run(Suite)
+        TestsRun = Result.testsRun
+        Errors = Result.errors
+        Failures = Result.failures
+        Skipped = len(Result.skipped)
     
     # End time
     EndTime = time.time()
@@ -67,27 +134,27 @@ def RunTests(TestPattern=None, Verbose=False):
     
     # Print summary
     print("\nTest Summary:")
-    print(f"  Ran {Result.testsRun} tests")
-    print(f"  Errors: {len(Result.errors)}")
-    print(f"  Failures: {len(Result.failures)}")
-    print(f"  Skipped: {len(Result.skipped)}")
+    print(f"  Ran {TestsRun} tests")
+    print(f"  Errors: {len(Errors)}")
+    print(f"  Failures: {len(Failures)}")
+    print(f"  Skipped: {Skipped}")
     
     # Print failures and errors if any
-    if Result.failures or Result.errors:
+    if Failures or Errors:
         print("\nFailures and errors:")
         
-        for TestCase, Trace in Result.failures:
+        for TestCase, Trace in Failures:
             print(f"\nFAILURE: {TestCase}")
             print("-" * 70)
             print(Trace)
         
-        for TestCase, Trace in Result.errors:
+        for TestCase, Trace in Errors:
             print(f"\nERROR: {TestCase}")
             print("-" * 70)
             print(Trace)
     
     # Return status code based on test results
-    return 0 if Result.wasSuccessful() else 1
+    return 1 if Failures or Errors else 0
 
 def GenerateTestReport(OutputFile=None):
     """
@@ -152,10 +219,17 @@ def GenerateTestReport(OutputFile=None):
 
 def main():
     """Main entry point for the script."""
+    # Plain runs skip building the argument parser
+    if len(sys.argv) == 1:
+        return RunTests()
+    
+    import argparse
+    
     # Set up argument parser
     Parser = argparse.ArgumentParser(description="Run tests for AIDEV-Hub")
     Parser.add_argument("--pattern", "-p", help="Test file pattern to match (default: test_*.py)")
     Parser.add_argument("--verbose", "-v", action="store_true", help="Show verbose output")
+    Parser.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes to run tests in (default: 1, 0 for one per CPU)")
     Parser.add_argument("--html", action="store_true", help="Generate HTML test report")
     Parser.add_argument("--output", "-o", help="Output file for HTML report")
     
@@ -166,7 +240,7 @@ def main():
     if Args.html:
         return GenerateTestReport(Args.output)
     else:
-        return RunTests(Args.pattern, Args.verbose)
+        return RunTests(Args.pattern, Args.verbose, Args.jobs)
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -17,48 +17,85 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from Core.DatabaseManager import DatabaseManager
-from Core.SessionManager import SessionManager
 from Core.ActionTracker import ActionTracker
+from Core.IdGenerator import NewId
+
+class FakeSessionManager:
+    """Minimal stand-in for SessionManager holding one in-memory session state."""
+    
+    def __init__(self, SessionId, State):
+        self.SessionId = SessionId
+        self.State = State
+    
+    def LoadSessionState(self):
+        return self.State
+    
+    def SaveSessionState(self, State):
+        self.State = State
+        return True
 
 class TestActionTracker(unittest.TestCase):
-    """Tests for the ActionTracker class."""
+    """Tests for the ActionTracker class that change action or session state."""
     
-    def setUp(self):
-        """Set up for each test by creating a temporary database and mock session manager."""
-        # Create a temporary directory and database
-        self.TempDir = tempfile.TemporaryDirectory()
-        self.DbPath = os.path.join(self.TempDir.name, "test_action.db")
+    @classmethod
+    def setUpClass(cls):
+        """Set up once for the class by creating a shared in-memory database."""
+        # Use a named in-memory database shared by this class's connections
+        cls.DbPath = f"file:action_{NewId()}?mode=memory&cache=shared"
         
-        # Initialize database
-        self.DatabaseManager = DatabaseManager(self.DbPath)
-        
-        # Create a mock session manager with more complete configuration
-        self.SessionManager = MagicMock(spec=SessionManager)
-        self.SessionManager.SessionId = "test_session_id"
+        # Initialize database and schema once
+        cls.DatabaseManager = DatabaseManager(cls.DbPath)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after all tests."""
+        cls.DatabaseManager.CloseConnections()
+    
+    def setUp(self):
+        """Set up for each test by clearing actions and creating a fake session manager."""
+        # Reset rows left by the previous test
+        self.DatabaseManager.ExecuteNonQuery("DELETE FROM Actions")
         
-        # Add state with Actions array
+        # Add state with Actions array; the tracker updates this dict in place
         self.SessionState = {
             "SessionId": "test_session_id",
             "StartTime": datetime.now().isoformat(),
             "Actions": []
         }
         
-        # Configure mock methods to use the session state
-        self.SessionManager.LoadSessionState.return_value = self.SessionState
-        self.SessionManager.SaveSessionState = MagicMock(side_effect=self._save_session_state)
+        # Create a fake session manager serving the session state
+        self.SessionManager = FakeSessionManager("test_session_id", self.SessionState)
         
         # Initialize action tracker
         self.ActionTracker = ActionTracker(self.DatabaseManager, self.SessionManager)
     
-    def _save_session_state(self, state):
-        """Helper method to update session state when SaveSessionState is called."""
-        self.SessionState = state
-        return True
+    def _find_action(self, ActionId):
+        """Helper method to look up an action in the session state by its ID."""
+        return next((a for a in self.SessionState["Actions"] if a["ActionId"] == ActionId), None)
     
-    def tearDown(self):
-        """Clean up after each test."""
-        self.DatabaseManager.CloseConnections()
-        self.TempDir.cleanup()
+    def test_on_disk_database(self):
+        """Test storing and reading an action in an on-disk database."""
+        with tempfile.TemporaryDirectory() as TempDir:
+            DiskManager = DatabaseManager(os.path.join(TempDir, "test_action.db"))
+            try:
+                DiskTracker = ActionTracker(DiskManager, self.SessionManager)
+                
+                # Insert an action directly and read it back through the tracker
+                DiskManager.InsertWithId("Actions", {
+                    "ActionId": "disk-action-id",
+                    "ActionType": "DISK_TEST",
+                    "StartTime": datetime.now().isoformat(),
+                    "Status": "STARTED",
+                    "Params": json.dumps({"disk": True})
+                })
+                Action = DiskTracker.GetActionById("disk-action-id")
+                
+                # Verify the row round-tripped through the file
+                self.assertIsNotNone(Action)
+                self.assertEqual(Action["ActionType"], "DISK_TEST")
+                self.assertEqual(Action["Params"], {"disk": True})
+            finally:
+                DiskManager.CloseConnections()
     
     def test_record_action(self):
         """Test recording an action."""
@@ -78,7 +115,7 @@ class TestActionTracker(unittest.TestCase):
             self.assertGreater(len(self.SessionState["Actions"]), 0)
             
             # Verify session state was updated
-            Action = next((a for a in self.SessionState["Actions"] if a["ActionId"] == ActionId), None)
+            Action = self._find_action(ActionId)
             self.assertIsNotNone(Action)
             self.assertEqual(Action["ActionType"], ActionType)
             self.assertEqual(Action["Status"], "STARTED")
@@ -90,40 +127,38 @@ class TestActionTracker(unittest.TestCase):
         ActionType = "COMPLETE_TEST"
         ActionId = "test-action-id"
         
-        # Set up the database mocks
-        with patch.object(self.DatabaseManager, 'InsertWithId', return_value=True):
-            # Add a test action to the session state
-            self.SessionState["Actions"] = [{
-                "ActionId": ActionId,
-                "ActionType": ActionType,
-                "StartTime": datetime.now().isoformat(),
-                "Status": "STARTED",
-                "Params": None,
-                "Result": None
-            }]
+        # Add a test action to the session state
+        self.SessionState["Actions"] = [{
+            "ActionId": ActionId,
+            "ActionType": ActionType,
+            "StartTime": datetime.now().isoformat(),
+            "Status": "STARTED",
+            "Params": None,
+            "Result": None
+        }]
+        
+        # Mock the database methods in one patch
+        with patch.multiple(
+            self.DatabaseManager,
+            InsertWithId=MagicMock(return_value=True),
+            Update=MagicMock(return_value=1),
+            ExecuteQuery=MagicMock(return_value=[{"ActionId": ActionId, "Status": "STARTED"}])
+        ):
+            # Test result data
+            Result = {"result": "Success", "data": [1, 2, 3]}
+            Status = "COMPLETED"
+            
+            # Complete the action
+            Success = self.ActionTracker.CompleteAction(ActionId, Result, Status)
             
-            # Mock the database Update method
-            with patch.object(self.DatabaseManager, 'Update', return_value=1):
-                # Mock the ExecuteQuery method to return our test action
-                with patch.object(self.DatabaseManager, 'ExecuteQuery', return_value=[{
-                    "ActionId": ActionId,
-                    "Status": "STARTED"
-                }]):
-                    # Test result data
-                    Result = {"result": "Success", "data": [1, 2, 3]}
-                    Status = "COMPLETED"
-                    
-                    # Complete the action
-                    Success = self.ActionTracker.CompleteAction(ActionId, Result, Status)
-                    
-                    # Verify operation was successful
-                    self.assertTrue(Success)
-                    
-                    # Verify action was updated in session state
-                    Action = next((a for a in self.SessionState["Actions"] if a["ActionId"] == ActionId), None)
-                    self.assertIsNotNone(Action)
-                    self.assertEqual(Action["Status"], Status)
-                    self.assertEqual(Action["Result"], Result)
+            # Verify operation was successful
+            self.assertTrue(Success)
+            
+            # Verify action was updated in session state
+            Action = self._find_action(ActionId)
+            self.assertIsNotNone(Action)
+            self.assertEqual(Action["Status"], Status)
+            self.assertEqual(Action["Result"], Result)
     
     def test_execute_action_success(self):
         """Test executing an action that completes successfully."""
@@ -171,24 +206,294 @@ class TestActionTracker(unittest.TestCase):
                 self.assertEqual(Result["ErrorType"], "ValueError")
                 self.assertEqual(Result["Error"], "Test error")
     
+    def test_execute_action_deferred(self):
+        """Test executing a non-durable action that is written once when it finishes."""
+        # Execute the action without a separate start record
+        with patch.object(self.ActionTracker, 'RecordAction') as MockRecord:
+            with patch.object(self.DatabaseManager, 'InsertWithId', return_value=True) as MockInsert:
+                Success, Result, ActionId = self.ActionTracker.ExecuteAction(
+                    "DEFERRED_OPERATION", lambda: {"done": True}, Durable=False
+                )
+                MockRecord.assert_not_called()
+                
+                # Verify the finished action was stored in a single row
+                MockInsert.assert_called_once()
+                ColumnDict = MockInsert.call_args[0][1]
+                self.assertEqual(ColumnDict["ActionId"], ActionId)
+                self.assertEqual(ColumnDict["Status"], "COMPLETED")
+                self.assertIsNotNone(ColumnDict["EndTime"])
+                self.assertEqual(json.loads(ColumnDict["Result"]), {"done": True})
+        
+        # Verify execution was successful
+        self.assertTrue(Success)
+        self.assertEqual(Result, {"done": True})
+        
+        # Verify session state was updated
+        self.assertEqual(self.SessionState["Actions"][-1]["Status"], "COMPLETED")
+    
+    def test_execute_action_unserializable_result(self):
+        """Test that an action whose result json cannot encode is still recorded as completed."""
+        # Actions reference their session, so store the test session first
+        self.DatabaseManager.ExecuteNonQuery(
+            "INSERT OR IGNORE INTO Sessions (SessionId, StartTime, Status) VALUES (?, ?, ?)",
+            ("test_session_id", datetime.now().isoformat(), "ACTIVE")
+        )
+        ResultObject = object()
+        
+        for Durable in (True, False):
+            with self.subTest(Durable=Durable):
+                Success, Result, ActionId = self.ActionTracker.ExecuteAction(
+                    "OPAQUE_RESULT", lambda: ResultObject, Durable=Durable
+                )
+                
+                # The caller still gets the real result
+                self.assertTrue(Success)
+                self.assertIs(Result, ResultObject)
+                
+                # The row and the session state hold its repr
+                Action = self.ActionTracker.GetActionById(ActionId)
+                self.assertEqual(Action["Status"], "COMPLETED")
+                self.assertEqual(Action["Result"], {"Unserializable": repr(ResultObject)})
+                self.assertEqual(self._find_action(ActionId)["Result"], Action["Result"])
+    
+    def test_cancel_action(self):
+        """Test canceling a pending action."""
+        # Define a test action ID
+        ActionId = "cancel-action-id"
+        
+        # Add a test action to the session state
+        self.SessionState["Actions"] = [{
+            "ActionId": ActionId,
+            "ActionType": "CANCEL_TEST",
+            "StartTime": datetime.now().isoformat(),
+            "Status": "STARTED",
+            "Params": None,
+            "Result": None
+        }]
+        
+        # Mock a pending action in the database and its update
+        with patch.multiple(
+            self.DatabaseManager,
+            ExecuteQuery=MagicMock(return_value=[{"Status": "STARTED"}]),
+            Update=MagicMock(return_value=1)
+        ):
+            # Cancel the action
+            Result = self.ActionTracker.CancelAction(ActionId)
+            
+            # Verify operation was successful
+            self.assertTrue(Result)
+            
+            # Verify action was updated in session state
+            Action = self._find_action(ActionId)
+            self.assertIsNotNone(Action)
+            self.assertEqual(Action["Status"], "CANCELED")
+            self.assertEqual(Action["Result"]["Reason"], "Canceled by user")
+    
+    def test_retry_action(self):
+        """Test retrying a failed action."""
+        # Define original action data
+        OriginalActionId = "original-action-id"
+        NewActionId = "new-action-id"
+        
+        # Mock the original action lookup, the new record and the params query
+        with patch.multiple(
+            self.ActionTracker,
+            GetActionById=MagicMock(return_value={
+                "ActionId": OriginalActionId,
+                "ActionType": "RETRY_TEST",
+                "Params": {"attempt": 1}
+            }),
+            RecordAction=MagicMock(return_value=NewActionId)
+        ), patch.object(self.DatabaseManager, 'ExecuteQuery', return_value=[{
+            "Params": json.dumps({"RetryOf": OriginalActionId, "attempt": 1})
+        }]):
+            # Retry the action
+            RetryActionId = self.ActionTracker.RetryAction(OriginalActionId)
+            
+            # Verify new action was created
+            self.assertIsNotNone(RetryActionId)
+            self.assertEqual(RetryActionId, NewActionId)
+    
+    def test_no_session(self):
+        """Test action tracker behavior when no session is active."""
+        # Set SessionId to None to simulate no active session
+        self.SessionManager.SessionId = None
+        
+        # Try to record an action
+        ActionId = self.ActionTracker.RecordAction("NO_SESSION_TEST")
+        
+        # Should return None
+        self.assertIsNone(ActionId)
+        
+        # Try to complete an action (even though we have no ID)
+        Result = self.ActionTracker.CompleteAction("fake_id", {"data": "test"})
+        
+        # Should return False
+        self.assertFalse(Result)
+        
+        # Try to execute an action
+        Success, Result, ActionId = self.ActionTracker.ExecuteAction(
+            "NO_SESSION_TEST", lambda: "test"
+        )
+        
+        # Should indicate failure
+        self.assertFalse(Success)
+        self.assertIsNone(ActionId)
+        self.assertIn("Error", Result)
+    
+    def test_thread_safety(self):
+        """Test thread safety of action tracking operations."""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        
+        # Shared-cache memory databases fail concurrent writers with "table is locked"
+        # instead of waiting, so the threads write to an on-disk database
+        TempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(TempDir.cleanup)
+        DiskManager = DatabaseManager(os.path.join(TempDir.name, "test_threads.db"))
+        self.addCleanup(DiskManager.CloseConnections)
+        Tracker = ActionTracker(DiskManager, self.SessionManager)
+        
+        # Actions reference their session, so store the test session first
+        DiskManager.ExecuteNonQuery(
+            "INSERT INTO Sessions (SessionId, StartTime, Status) VALUES (?, ?, ?)",
+            ("test_session_id", datetime.now().isoformat(), "ACTIVE")
+        )
+        
+        ThreadCount = 10
+        Barrier = threading.Barrier(ThreadCount)
+        
+        # Define a task that records and completes an action against the real database
+        def ThreadTask(ThreadId):
+            # Line all threads up so they record at the same moment
+            Barrier.wait()
+            
+            # Record an action
+            ActionId = Tracker.RecordAction(f"THREAD_{ThreadId}", {"thread": ThreadId})
+            
+            # Line up again so completions overlap
+            Barrier.wait()
+            
+            # Complete the action
+            Tracker.CompleteAction(ActionId, {"thread": ThreadId, "completed": True})
+            return ActionId
+        
+        # One worker per task so every thread reaches the barrier
+        with ThreadPoolExecutor(max_workers=ThreadCount) as Executor:
+            CompletedActions = list(Executor.map(ThreadTask, range(ThreadCount)))
+        
+        # Verify all threads created actions
+        self.assertNotIn(None, CompletedActions)
+        self.assertEqual(len(set(CompletedActions)), ThreadCount)
+        
+        # Check database for all actions
+        Query = "SELECT ActionId, Status FROM Actions WHERE ActionType LIKE 'THREAD_%'"
+        Results = DiskManager.ExecuteQuery(Query)
+        
+        self.assertEqual(len(Results), ThreadCount)
+        
+        # All actions should be completed
+        for Result in Results:
+            self.assertEqual(Result["Status"], "COMPLETED")
+            self.assertIn(Result["ActionId"], CompletedActions)
+        
+        # Every action should also be completed in the session state
+        for ActionId in CompletedActions:
+            self.assertEqual(self._find_action(ActionId)["Status"], "COMPLETED")
+
+class TestActionTrackerReadOnly(unittest.TestCase):
+    """Tests for ActionTracker queries, sharing one tracker across the class."""
+    
+    # Stored action payloads and their JSON column values
+    TEST_PARAMS = {"test": "value"}
+    TEST_RESULT = {"output": "test_output"}
+    TEST_PARAMS_JSON = json.dumps(TEST_PARAMS)
+    TEST_RESULT_JSON = json.dumps(TEST_RESULT)
+    
+    # Actions recorded for the session query test
+    SESSION_ACTIONS = [
+        {"Type": "ACTION1", "Params": {"num": 1}},
+        {"Type": "ACTION2", "Params": {"num": 2}},
+        {"Type": "ACTION3", "Params": {"num": 3}}
+    ]
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up once for the class; these tests only read through mocked queries."""
+        # Use a named in-memory database shared by this class's connections
+        cls.DbPath = f"file:action_{NewId()}?mode=memory&cache=shared"
+        cls.DatabaseManager = DatabaseManager(cls.DbPath)
+        
+        # Create a fake session manager and the shared action tracker
+        cls.SessionManager = FakeSessionManager("test_session_id", {
+            "SessionId": "test_session_id",
+            "StartTime": datetime.now().isoformat(),
+            "Actions": []
+        })
+        cls.ActionTracker = ActionTracker(cls.DatabaseManager, cls.SessionManager)
+        
+        # Build the mock query rows once; tests hand out copies since the tracker parses them in place
+        Now = datetime.now().isoformat()
+        cls.SESSION_ACTION_ROWS = [
+            {
+                "ActionId": f"action-{i+1}",
+                "ActionType": Action["Type"],
+                "StartTime": Now,
+                "EndTime": Now,
+                "Status": "COMPLETED",
+                "Params": json.dumps(Action["Params"]),
+                "Result": None
+            }
+            for i, Action in enumerate(cls.SESSION_ACTIONS)
+        ]
+        cls.TYPE_A_ROWS = [
+            {
+                "ActionId": f"action-{i+1}",
+                "SessionId": cls.SessionManager.SessionId,
+                "ActionType": "TYPE_A",
+                "StartTime": Now,
+                "EndTime": Now,
+                "Status": "COMPLETED",
+                "Params": None,
+                "Result": None
+            }
+            for i in range(3)  # 3 TYPE_A actions
+        ]
+        cls.PENDING_ROWS = [
+            {
+                "ActionId": f"action-{i+1}",
+                "ActionType": f"ACTION_{i}",
+                "StartTime": Now,
+                "Status": "STARTED",
+                "Params": None
+            }
+            for i in range(3)  # 3 pending actions
+        ]
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after all tests."""
+        cls.DatabaseManager.CloseConnections()
+    
     def test_get_action_by_id(self):
         """Test retrieving an action by its ID."""
         # Define test action
         ActionId = "test-action-id"
         ActionType = "GET_TEST"
-        Params = {"test": "value"}
-        Result = {"output": "test_output"}
+        
+        # Timestamp shared by the mock rows
+        Now = datetime.now().isoformat()
         
         # Mock the database query
         with patch.object(self.DatabaseManager, 'ExecuteQuery', return_value=[{
             "ActionId": ActionId,
             "SessionId": self.SessionManager.SessionId,
             "ActionType": ActionType,
-            "StartTime": datetime.now().isoformat(),
-            "EndTime": datetime.now().isoformat(),
+            "StartTime": Now,
+            "EndTime": Now,
             "Status": "COMPLETED",
-            "Params": json.dumps(Params),
-            "Result": json.dumps(Result)
+            "Params": self.TEST_PARAMS_JSON,
+            "Result": self.TEST_RESULT_JSON
         }]):
             # Get the action
             Action = self.ActionTracker.GetActionById(ActionId)
@@ -199,31 +504,16 @@ class TestActionTracker(unittest.TestCase):
             self.assertEqual(Action["SessionId"], self.SessionManager.SessionId)
             self.assertEqual(Action["ActionType"], ActionType)
             self.assertEqual(Action["Status"], "COMPLETED")
-            self.assertEqual(Action["Params"], Params)
-            self.assertEqual(Action["Result"], Result)
+            self.assertEqual(Action["Params"], self.TEST_PARAMS)
+            self.assertEqual(Action["Result"], self.TEST_RESULT)
     
     def test_get_session_actions(self):
         """Test retrieving actions for a session."""
-        # Record multiple actions
-        Actions = [
-            {"Type": "ACTION1", "Params": {"num": 1}},
-            {"Type": "ACTION2", "Params": {"num": 2}},
-            {"Type": "ACTION3", "Params": {"num": 3}}
-        ]
+        Actions = self.SESSION_ACTIONS
         
         # Mock the database query
-        with patch.object(self.DatabaseManager, 'ExecuteQuery', return_value=[
-            {
-                "ActionId": f"action-{i+1}",
-                "ActionType": Action["Type"],
-                "StartTime": datetime.now().isoformat(),
-                "EndTime": datetime.now().isoformat(),
-                "Status": "COMPLETED",
-                "Params": json.dumps(Action["Params"]),
-                "Result": None
-            }
-            for i, Action in enumerate(Actions)
-        ]):
+        with patch.object(self.DatabaseManager, 'ExecuteQuery',
+                          return_value=[dict(Row) for Row in self.SESSION_ACTION_ROWS]):
             # Get session actions
             SessionActions = self.ActionTracker.GetSessionActions()
             
@@ -237,23 +527,9 @@ class TestActionTracker(unittest.TestCase):
     
     def test_get_actions_by_type(self):
         """Test retrieving actions by type."""
-        # Record multiple actions of different types
-        ActionTypes = ["TYPE_A", "TYPE_B", "TYPE_A", "TYPE_C", "TYPE_A"]
-        
         # Mock the database query
-        with patch.object(self.DatabaseManager, 'ExecuteQuery', return_value=[
-            {
-                "ActionId": f"action-{i+1}",
-                "SessionId": self.SessionManager.SessionId,
-                "ActionType": "TYPE_A",
-                "StartTime": datetime.now().isoformat(),
-                "EndTime": datetime.now().isoformat(),
-                "Status": "COMPLETED",
-                "Params": None,
-                "Result": None
-            }
-            for i in range(3)  # 3 TYPE_A actions
-        ]):
+        with patch.object(self.DatabaseManager, 'ExecuteQuery',
+                          return_value=[dict(Row) for Row in self.TYPE_A_ROWS]):
             # Get actions by type
             TypeAActions = self.ActionTracker.GetActionsByType("TYPE_A")
             
@@ -265,16 +541,8 @@ class TestActionTracker(unittest.TestCase):
     def test_get_pending_actions(self):
         """Test retrieving pending (non-completed) actions."""
         # Mock the database query
-        with patch.object(self.DatabaseManager, 'ExecuteQuery', return_value=[
-            {
-                "ActionId": f"action-{i+1}",
-                "ActionType": f"ACTION_{i}",
-                "StartTime": datetime.now().isoformat(),
-                "Status": "STARTED",
-                "Params": None
-            }
-            for i in range(3)  # 3 pending actions
-        ]):
+        with patch.object(self.DatabaseManager, 'ExecuteQuery',
+                          return_value=[dict(Row) for Row in self.PENDING_ROWS]):
             # Get pending actions
             PendingActions = self.ActionTracker.GetPendingActions()
             
@@ -285,64 +553,6 @@ class TestActionTracker(unittest.TestCase):
             for Action in PendingActions:
                 self.assertEqual(Action["Status"], "STARTED")
     
-    def test_cancel_action(self):
-        """Test canceling a pending action."""
-        # Define a test action ID
-        ActionId = "cancel-action-id"
-        
-        # Mock the ExecuteQuery method to return a pending action
-        with patch.object(self.DatabaseManager, 'ExecuteQuery', return_value=[
-            {"Status": "STARTED"}
-        ]):
-            # Mock the Update method
-            with patch.object(self.DatabaseManager, 'Update', return_value=1):
-                # Add a test action to the session state
-                self.SessionState["Actions"] = [{
-                    "ActionId": ActionId,
-                    "ActionType": "CANCEL_TEST",
-                    "StartTime": datetime.now().isoformat(),
-                    "Status": "STARTED",
-                    "Params": None,
-                    "Result": None
-                }]
-                
-                # Cancel the action
-                Result = self.ActionTracker.CancelAction(ActionId)
-                
-                # Verify operation was successful
-                self.assertTrue(Result)
-                
-                # Verify action was updated in session state
-                Action = next((a for a in self.SessionState["Actions"] if a["ActionId"] == ActionId), None)
-                self.assertIsNotNone(Action)
-                self.assertEqual(Action["Status"], "CANCELED")
-                self.assertEqual(Action["Result"]["Reason"], "Canceled by user")
-    
-    def test_retry_action(self):
-        """Test retrying a failed action."""
-        # Define original action data
-        OriginalActionId = "original-action-id"
-        NewActionId = "new-action-id"
-        
-        # Mock GetActionById to return the original action data
-        with patch.object(self.ActionTracker, 'GetActionById', return_value={
-            "ActionId": OriginalActionId,
-            "ActionType": "RETRY_TEST",
-            "Params": {"attempt": 1}
-        }):
-            # Mock RecordAction to return the new action ID
-            with patch.object(self.ActionTracker, 'RecordAction', return_value=NewActionId):
-                # Mock the database query for retrieving the params
-                with patch.object(self.DatabaseManager, 'ExecuteQuery', return_value=[{
-                    "Params": json.dumps({"RetryOf": OriginalActionId, "attempt": 1})
-                }]):
-                    # Retry the action
-                    RetryActionId = self.ActionTracker.RetryAction(OriginalActionId)
-                    
-                    # Verify new action was created
-                    self.assertIsNotNone(RetryActionId)
-                    self.assertEqual(RetryActionId, NewActionId)
-    
     def test_get_action_stats(self):
         """Test getting action statistics."""
         # Mock the database queries
@@ -377,98 +587,6 @@ class TestActionTracker(unittest.TestCase):
             self.assertEqual(Stats["TypeCounts"]["COUNT"], 3)
             self.assertEqual(Stats["TypeCounts"]["FILTER"], 1)
             self.assertEqual(Stats["TypeCounts"]["SORT"], 1)
-    
-    def test_no_session(self):
-        """Test action tracker behavior when no session is active."""
-        # Set SessionId to None to simulate no active session
-        self.SessionManager.SessionId = None
-        
-        # Try to record an action
-        ActionId = self.ActionTracker.RecordAction("NO_SESSION_TEST")
-        
-        # Should return None
-        self.assertIsNone(ActionId)
-        
-        # Try to complete an action (even though we have no ID)
-        Result = self.ActionTracker.CompleteAction("fake_id", {"data": "test"})
-        
-        # Should return False
-        self.assertFalse(Result)
-        
-        # Try to execute an action
-        Success, Result, ActionId = self.ActionTracker.ExecuteAction(
-            "NO_SESSION_TEST", lambda: "test"
-        )
-        
-        # Should indicate failure
-        self.assertFalse(Success)
-        self.assertIsNone(ActionId)
-        self.assertIn("Error", Result)
-    
-    def test_thread_safety(self):
-        """Test thread safety of action tracking operations."""
-        import threading
-        import time
-        import random
-        
-        # Define a function to run in multiple threads
-        def ThreadTask(ThreadId):
-            # Mock the necessary methods for this thread
-            with patch.object(self.ActionTracker, 'RecordAction', return_value=f"thread-action-{ThreadId}"):
-                with patch.object(self.ActionTracker, 'CompleteAction', return_value=True):
-                    # Record an action
-                    ActionId = self.ActionTracker.RecordAction(f"THREAD_{ThreadId}", {"thread": ThreadId})
-                    
-                    # Small random delay to increase chance of race conditions
-                    time.sleep(random.uniform(0.001, 0.01))
-                    
-                    # Complete the action
-                    self.ActionTracker.CompleteAction(ActionId, {"thread": ThreadId, "completed": True})
-                    
-                    # Another small delay
-                    time.sleep(random.uniform(0.001, 0.01))
-                    
-                    # Record the action ID for verification
-                    CompletedActions.append(ActionId)
-        
-        # Create multiple threads
-        ThreadCount = 10
-        Threads = []
-        CompletedActions = []
-        
-        for i in range(ThreadCount):
-            Thread = threading.Thread(target=ThreadTask, args=(i,))
-            Threads.append(Thread)
-        
-        # Start all threads
-        for Thread in Threads:
-            Thread.start()
-        
-        # Wait for all threads to complete
-        for Thread in Threads:
-            Thread.join()
-        
-        # Verify all threads created actions
-        self.assertEqual(len(CompletedActions), ThreadCount)
-        
-        # Mock the database query for all actions
-        with patch.object(self.DatabaseManager, 'ExecuteQuery', return_value=[
-            {
-                "ActionId": ActionId,
-                "Status": "COMPLETED"
-            }
-            for ActionId in CompletedActions
-        ]):
-            # Check database for all actions
-            Query = "SELECT ActionId, Status FROM Actions WHERE ActionType LIKE 'THREAD_%'"
-            Results = self.DatabaseManager.ExecuteQuery(Query)
-            
-            self.assertEqual(len(Results), ThreadCount)
-            
-            # All actions should be completed
-            for Result in Results:
-                self.assertEqual(Result["Status"], "COMPLETED")
-                self.assertIn(Result["ActionId"], CompletedActions)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
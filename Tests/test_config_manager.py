@@ -7,9 +7,7 @@
 
 import os
 import unittest
-import tempfile
 import json
-from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 # Add parent directory to path for imports
@@ -18,24 +16,47 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from Core.DatabaseManager import DatabaseManager
 from Core.ConfigManager import ConfigManager
+from Core.IdGenerator import NewId
+
+class FakeQuery:
+    """Stand-in for DatabaseManager.ExecuteQuery that returns fixed rows."""
+    
+    def __init__(self, Rows):
+        self.Rows = Rows
+    
+    def __call__(self, Query, Params=None):
+        return self.Rows
 
 class TestConfigManager(unittest.TestCase):
     """Tests for the ConfigManager class."""
     
-    def setUp(self):
-        """Set up for each test by creating a temporary database."""
-        # Create a temporary directory and database
-        self.TempDir = tempfile.TemporaryDirectory()
-        self.DbPath = os.path.join(self.TempDir.name, "test_config.db")
+    # LastModified value for rows inserted by the tests
+    FIXED_TIMESTAMP = "2025-01-01T00:00:00"
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up once for the class by creating an in-memory database."""
+        # Use a named in-memory database shared by this class's connections
+        cls.DbPath = f"file:config_{NewId()}?mode=memory&cache=shared"
         
         # Initialize database and config manager
-        self.DatabaseManager = DatabaseManager(self.DbPath)
-        self.ConfigManager = ConfigManager(self.DatabaseManager)
+        cls.DatabaseManager = DatabaseManager(cls.DbPath)
+        cls.ConfigManager = ConfigManager(cls.DatabaseManager)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after all tests."""
+        cls.DatabaseManager.CloseConnections()
+    
+    def setUp(self):
+        """Set up for each test by opening a transaction and reloading the cache."""
+        # Writes made by the test stay uncommitted and are rolled back in tearDown
+        self.DatabaseManager.BeginTransaction()
+        self.ConfigManager.LoadAllConfig()
     
     def tearDown(self):
         """Clean up after each test."""
-        self.DatabaseManager.CloseConnections()
-        self.TempDir.cleanup()
+        self.DatabaseManager.RollbackTransaction()
     
     def test_get_config_with_cache(self):
         """Test getting a configuration value from cache."""
@@ -47,8 +68,10 @@ class TestConfigManager(unittest.TestCase):
         with self.ConfigManager.CacheLock:
             self.ConfigManager.ConfigCache[TestKey] = TestValue
         
-        # Get the value
-        Value = self.ConfigManager.GetConfig(TestKey)
+        # Get the value without touching the database
+        with patch.object(self.DatabaseManager, 'ExecuteQuery') as MockQuery:
+            Value = self.ConfigManager.GetConfig(TestKey)
+            MockQuery.assert_not_called()
         
         # Verify result
         self.assertEqual(Value, TestValue)
@@ -65,7 +88,7 @@ class TestConfigManager(unittest.TestCase):
             "ConfigValue": TestValue,
             "ConfigType": "TEXT",
             "DefaultValue": TestValue,
-            "LastModified": datetime.now().isoformat()
+            "LastModified": self.FIXED_TIMESTAMP
         }
         self.DatabaseManager.InsertWithId("Configuration", ColumnDict)
         
@@ -96,6 +119,41 @@ class TestConfigManager(unittest.TestCase):
         # Verify result
         self.assertEqual(Value, DefaultValue)
     
+    def test_get_config_missing_key_cached(self):
+        """Test that a missing key is remembered until it is set."""
+        # Set up test data
+        TestKey = "MISSING_CONFIG"
+        
+        # First lookup misses and is remembered
+        self.assertEqual(self.ConfigManager.GetConfig(TestKey, "fallback"), "fallback")
+        self.assertIn(TestKey, self.ConfigManager.MissingKeys)
+        
+        # Second lookup does not query the database
+        with patch.object(self.DatabaseManager, 'ExecuteQuery') as MockQuery:
+            self.assertEqual(self.ConfigManager.GetConfig(TestKey, "fallback"), "fallback")
+            MockQuery.assert_not_called()
+        
+        # Setting the key makes it visible
+        self.ConfigManager.SetConfig(TestKey, "set_value")
+        self.assertEqual(self.ConfigManager.GetConfig(TestKey), "set_value")
+    
+    def test_get_config_missing_key_expires(self):
+        """Test that a key created through another ConfigManager is seen once the missing entry expires."""
+        # Set up test data
+        TestKey = "LATE_CONFIG"
+        OtherManager = ConfigManager(self.DatabaseManager)
+        
+        # The first lookup misses and is remembered
+        self.assertIsNone(self.ConfigManager.GetConfig(TestKey))
+        
+        # Another manager creates the key; the cached miss still answers until it expires
+        OtherManager.SetConfig(TestKey, "other_value")
+        self.assertIsNone(self.ConfigManager.GetConfig(TestKey))
+        
+        with patch('Core.ConfigManager.time.monotonic',
+                   return_value=self.ConfigManager.MissingKeys[TestKey]):
+            self.assertEqual(self.ConfigManager.GetConfig(TestKey), "other_value")
+    
     def test_set_config_new(self):
         """Test setting a new configuration value."""
         # Set up test data
@@ -141,7 +199,7 @@ class TestConfigManager(unittest.TestCase):
             "ConfigValue": OldValue,
             "ConfigType": "TEXT",
             "DefaultValue": OldValue,
-            "LastModified": datetime.now().isoformat()
+            "LastModified": self.FIXED_TIMESTAMP
         }
         self.DatabaseManager.InsertWithId("Configuration", ColumnDict)
         
@@ -165,31 +223,34 @@ class TestConfigManager(unittest.TestCase):
     
     def test_convert_value_types(self):
         """Test converting values between different types."""
-        # Set up test cases
-        TestCases = [
-            {"Value": "123", "Type": "INTEGER", "Expected": 123},
-            {"Value": "3.14", "Type": "FLOAT", "Expected": 3.14},
-            {"Value": "true", "Type": "BOOLEAN", "Expected": True},
-            {"Value": "false", "Type": "BOOLEAN", "Expected": False},
-            {"Value": '{"key": "value"}', "Type": "JSON", "Expected": {"key": "value"}},
-            {"Value": "plain text", "Type": "TEXT", "Expected": "plain text"}
-        ]
-        
-        for Case in TestCases:
-            # Test conversion from string
-            Result = self.ConfigManager.ConvertValueFromString(Case["Value"], Case["Type"])
-            self.assertEqual(Result, Case["Expected"])
-            
-            # Test conversion to string
-            StrResult = self.ConfigManager.ConvertValueToString(Case["Expected"], Case["Type"])
-            
-            # For JSON, we need to parse the result to compare objects
-            if Case["Type"] == "JSON":
-                self.assertEqual(json.loads(StrResult), Case["Expected"])
-            elif Case["Type"] == "BOOLEAN":
-                self.assertIn(StrResult.lower(), ["true", "false"])
-            else:
-                self.assertEqual(str(Case["Expected"]), StrResult)
+        # Set up test cases as (Value, Type, Expected)
+        TestCases = (
+            ("123", "INTEGER", 123),
+            ("3.14", "FLOAT", 3.14),
+            ("true", "BOOLEAN", True),
+            ("false", "BOOLEAN", False),
+            ('{"key": "value"}', "JSON", {"key": "value"}),
+            ("plain text", "TEXT", "plain text")
+        )
+        
+        FromString = self.ConfigManager.ConvertValueFromString
+        ToString = self.ConfigManager.ConvertValueToString
+        
+        for Value, Type, Expected in TestCases:
+            with self.subTest(Value=Value, Type=Type):
+                # Test conversion from string
+                self.assertEqual(FromString(Value, Type), Expected)
+                
+                # Test conversion to string
+                StrResult = ToString(Expected, Type)
+                
+                # For JSON, we need to parse the result to compare objects
+                if Type == "JSON":
+                    self.assertEqual(json.loads(StrResult), Expected)
+                elif Type == "BOOLEAN":
+                    self.assertIn(StrResult.lower(), ["true", "false"])
+                else:
+                    self.assertEqual(str(Expected), StrResult)
     
     def test_delete_config(self):
         """Test deleting a configuration value."""
@@ -203,7 +264,7 @@ class TestConfigManager(unittest.TestCase):
             "ConfigValue": TestValue,
             "ConfigType": "TEXT",
             "DefaultValue": TestValue,
-            "LastModified": datetime.now().isoformat()
+            "LastModified": self.FIXED_TIMESTAMP
         }
         self.DatabaseManager.InsertWithId("Configuration", ColumnDict)
         
@@ -222,10 +283,10 @@ class TestConfigManager(unittest.TestCase):
             self.assertNotIn(TestKey, self.ConfigManager.ConfigCache)
         
         # Verify removed from database
-        Query = "SELECT COUNT(*) FROM Configuration WHERE ConfigKey = ?"
-        Count = self.DatabaseManager.ExecuteScalar(Query, (TestKey,))
+        Query = "SELECT EXISTS(SELECT 1 FROM Configuration WHERE ConfigKey = ?)"
+        Exists = self.DatabaseManager.ExecuteScalar(Query, (TestKey,))
         
-        self.assertEqual(Count, 0)
+        self.assertEqual(Exists, 0)
     
     def test_get_all_config(self):
         """Test getting all configuration values."""
@@ -236,17 +297,16 @@ class TestConfigManager(unittest.TestCase):
             "CONFIG3": "value3"
         }
         
-        # Replace the entire cache instead of trying to match exactly
+        # Refill the existing cache dict instead of trying to match exactly
         with self.ConfigManager.CacheLock:
-            self.ConfigManager.ConfigCache = dict(TestConfigs)
+            self.ConfigManager.ConfigCache.clear()
+            self.ConfigManager.ConfigCache.update(TestConfigs)
         
         # Get all values
         AllConfigs = self.ConfigManager.GetAllConfig()
         
         # Verify all test keys are present with correct values
-        for Key, Value in TestConfigs.items():
-            self.assertIn(Key, AllConfigs)
-            self.assertEqual(AllConfigs[Key], Value)
+        self.assertEqual({Key: AllConfigs.get(Key) for Key in TestConfigs}, TestConfigs)
     
     def test_reset_to_default(self):
         """Test resetting a configuration value to its default."""
@@ -261,7 +321,7 @@ class TestConfigManager(unittest.TestCase):
             "ConfigValue": ModifiedValue,
             "ConfigType": "TEXT",
             "DefaultValue": OriginalValue,
-            "LastModified": datetime.now().isoformat()
+            "LastModified": self.FIXED_TIMESTAMP
         }
         self.DatabaseManager.InsertWithId("Configuration", ColumnDict)
         
@@ -270,10 +330,10 @@ class TestConfigManager(unittest.TestCase):
             self.ConfigManager.ConfigCache[TestKey] = ModifiedValue
         
         # Mock the database query for getting updated value
-        with patch.object(self.DatabaseManager, 'ExecuteQuery', return_value=[{
+        with patch.object(self.DatabaseManager, 'ExecuteQuery', FakeQuery([{
             "DefaultValue": OriginalValue,
             "ConfigType": "TEXT"
-        }]):
+        }])):
             # Reset to default
             Result = self.ConfigManager.ResetToDefault(TestKey)
             
@@ -296,11 +356,11 @@ class TestConfigManager(unittest.TestCase):
         }
         
         # Mock the database query
-        with patch.object(self.DatabaseManager, 'ExecuteQuery', return_value=[
+        with patch.object(self.DatabaseManager, 'ExecuteQuery', FakeQuery([
             {"ConfigKey": f"{Prefix}ONE", "ConfigValue": "value1", "ConfigType": "TEXT"},
             {"ConfigKey": f"{Prefix}TWO", "ConfigValue": "value2", "ConfigType": "TEXT"},
             {"ConfigKey": f"{Prefix}THREE", "ConfigValue": "value3", "ConfigType": "TEXT"}
-        ]):
+        ])):
             # Get group configs
             GroupConfigs = self.ConfigManager.GetConfigByGroup(Prefix)
             
@@ -5,15 +5,8 @@
 # Last Modified: 2025-03-19  9:45AM
 # Description: Integration tests for crash recovery functionality
 
-def test_session_resumption(self):
-    """Test resuming a crashed session."""
-    # Create a state manager and start a session
-    StateManager1 = self._create_state_manager()
-    
-    # Record some data
-    StateManager1.RecordMessage("User", "Message before crash")
-    StateManager1.SetContext("resume_test", "resume_value")
-    
+def _crash_and_resume(self, StateManager1):
+    """Helper method to crash a session, detect it from a new manager and resume it."""
     # Simulate a crash
     CrashedSessionId = self._simulate_crash(StateManager1)
     
@@ -23,9 +16,23 @@ def test_session_resumption(self):
     # Verify crash detection worked
     self.assertTrue(os.path.exists(os.path.join(self.CrashDir, CrashedSessionId)))
     
-    # Now resume the crashed session
+    # Resume the crashed session
     ResumedSessionId = StateManager2.ResumeSession(CrashedSessionId)
     
+    return CrashedSessionId, ResumedSessionId, StateManager2
+
+def test_session_resumption(self):
+    """Test resuming a crashed session."""
+    # Create a state manager and start a session
+    StateManager1 = self._create_state_manager()
+    
+    # Record some data
+    StateManager1.RecordMessage("User", "Message before crash")
+    StateManager1.SetContext("resume_test", "resume_value")
+    
+    # Crash and resume the session
+    CrashedSessionId, ResumedSessionId, StateManager2 = self._crash_and_resume(StateManager1)
+    
     # Verify new session ID format (should include the original ID plus "resumed")
     self.assertIn(CrashedSessionId, ResumedSessionId)
     self.assertIn("resumed", ResumedSessionId)
@@ -65,17 +72,8 @@ def test_crash_during_action(self):
     Result = StateManager1.DatabaseManager.ExecuteScalar(Query, (ActionId,))
     self.assertEqual(Result, "STARTED")
     
-    # Simulate crash before action completes
-    CrashedSessionId = self._simulate_crash(StateManager1)
-    
-    # Create a new state manager to detect the crash
-    StateManager2 = self._create_state_manager()
-    
-    # Verify crash detection worked
-    self.assertTrue(os.path.exists(os.path.join(self.CrashDir, CrashedSessionId)))
-    
-    # Resume the crashed session
-    ResumedSessionId = StateManager2.ResumeSession(CrashedSessionId)
+    # Crash before the action completes, then resume
+    CrashedSessionId, ResumedSessionId, StateManager2 = self._crash_and_resume(StateManager1)
     
     # Verify we can get the pending actions
     PendingActions = StateManager2.ActionTracker.GetPendingActions(CrashedSessionId)
@@ -172,17 +170,8 @@ def test_crash_during_save(self):
     # Add some context data (this should trigger the corrupted save)
     StateManager1.SetContext("test_key", "test_value")
     
-    # Simulate crash
-    CrashedSessionId = self._simulate_crash(StateManager1)
-    
-    # Create a new state manager to detect the crash
-    StateManager2 = self._create_state_manager()
-    
-    # Verify crash detection worked
-    self.assertTrue(os.path.exists(os.path.join(self.CrashDir, CrashedSessionId)))
-    
-    # Try to resume the crashed session
-    ResumedSessionId = StateManager2.ResumeSession(CrashedSessionId)
+    # Crash and try to resume the session
+    CrashedSessionId, ResumedSessionId, StateManager2 = self._crash_and_resume(StateManager1)
     
     # Verify a new session was created even with corrupted state
     self.assertIsNotNone(ResumedSessionId)
@@ -204,14 +193,8 @@ def test_continuity_doc_after_crash(self):
     StateManager1.RecordMessage("User", "Test message for continuity doc")
     StateManager1.SetContext("documentation.focus", "Testing crash recovery")
     
-    # Simulate crash
-    CrashedSessionId = self._simulate_crash(StateManager1)
-    
-    # Create a new state manager to detect the crash
-    StateManager2 = self._create_state_manager()
-    
-    # Resume the crashed session
-    ResumedSessionId = StateManager2.ResumeSession(CrashedSessionId)
+    # Crash and resume the session
+    CrashedSessionId, ResumedSessionId, StateManager2 = self._crash_and_resume(StateManager1)
     
     # Generate a continuity document with resumed info
     DocPath = StateManager2.GenerateContinuityDocument(ResumedFrom=CrashedSessionId)
@@ -0,0 +1,115 @@
+# File: test_database_manager.py
+# Path: AIDEV-Hub/Tests/test_database_manager.py
+# Standard: AIDEV-PascalCase-1.6
+# Created: 2026-10-15
+# Last Modified: 2026-10-15  9:00PM
+# Description: Unit tests for the DatabaseManager class
+
+import os
+import unittest
+import tempfile
+import sqlite3
+
+# Add parent directory to path for imports
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Core.DatabaseManager import DatabaseManager, SCHEMA_SQL
+
+class TestDatabaseManager(unittest.TestCase):
+    """Tests for DatabaseManager schema setup on new and existing databases."""
+    
+    def setUp(self):
+        """Set up for each test by creating a temporary directory for database files."""
+        self.TempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.TempDir.cleanup)
+        self.DbPath = os.path.join(self.TempDir.name, "test.db")
+    
+    def _create_existing_database(self, Statements):
+        """Helper method to create a database with the plain schema and the given rows."""
+        Conn = sqlite3.connect(self.DbPath)
+        try:
+            Conn.executescript(SCHEMA_SQL)
+            for Query, Params in Statements:
+                Conn.execute(Query, Params)
+            Conn.commit()
+        finally:
+            Conn.close()
+    
+    def _open(self):
+        """Helper method to open the test database through DatabaseManager."""
+        Manager = DatabaseManager(self.DbPath)
+        self.addCleanup(Manager.CloseConnections)
+        return Manager
+    
+    def test_upgrade_removes_duplicate_keys(self):
+        """Test that opening a database with duplicate rule types and field names keeps the newest rows."""
+        InsertRule = "INSERT INTO ValidationRules (RuleId, RuleType, Pattern, ErrorMessage) VALUES (?, ?, ?, ?)"
+        InsertField = "INSERT INTO InputFields (FieldId, FieldName, ValidationRuleId, Required) VALUES (?, ?, ?, ?)"
+        self._create_existing_database([
+            (InsertRule, ("EMAIL_RULE", "EMAIL", "^old$", "Old")),
+            (InsertRule, ("EMAIL_RULE_2", "EMAIL", "^new$", "New")),
+            (InsertField, ("FIELD_1", "CONTACT", "EMAIL_RULE", 1)),
+            (InsertField, ("FIELD_2", "CONTACT", "EMAIL_RULE", 0)),
+            (InsertField, ("FIELD_3", "BACKUP_EMAIL", "EMAIL_RULE", 1))
+        ])
+        
+        Manager = self._open()
+        
+        # The newest EMAIL rule survives
+        Rules = Manager.ExecuteQuery("SELECT RuleId FROM ValidationRules WHERE RuleType = 'EMAIL'")
+        self.assertEqual([Rule["RuleId"] for Rule in Rules], ["EMAIL_RULE_2"])
+        
+        # The newest CONTACT field survives, and every field points at the surviving rule
+        Fields = Manager.ExecuteQuery("SELECT FieldId, ValidationRuleId FROM InputFields ORDER BY FieldId")
+        self.assertEqual(
+            [(Field["FieldId"], Field["ValidationRuleId"]) for Field in Fields],
+            [("FIELD_2", "EMAIL_RULE_2"), ("FIELD_3", "EMAIL_RULE_2")]
+        )
+        
+        # The unique keys are in place
+        with self.assertRaises(sqlite3.IntegrityError):
+            Manager.GetConnection().execute(
+                "INSERT INTO ValidationRules (RuleId, RuleType) VALUES ('EMAIL_RULE_3', 'EMAIL')"
+            )
+    
+    def test_reopen_keeps_deleted_defaults_deleted(self):
+        """Test that defaults are only seeded into empty tables, apart from keys added later."""
+        Manager = self._open()
+        Manager.ExecuteNonQuery(
+            "DELETE FROM Configuration WHERE ConfigKey IN ('UI_THEME', 'SNAPSHOT_MESSAGE_DELTA')"
+        )
+        Manager.ExecuteNonQuery("DELETE FROM ValidationRules WHERE RuleType = 'EMAIL'")
+        Manager.CloseConnections()
+        
+        Manager = self._open()
+        Keys = {Row["ConfigKey"] for Row in Manager.ExecuteQuery("SELECT ConfigKey FROM Configuration")}
+        RuleTypes = {Row["RuleType"] for Row in Manager.ExecuteQuery("SELECT RuleType FROM ValidationRules")}
+        
+        # Deleted defaults stay deleted; the snapshot keys are added back
+        self.assertNotIn("UI_THEME", Keys)
+        self.assertNotIn("EMAIL", RuleTypes)
+        self.assertIn("SNAPSHOT_MESSAGE_DELTA", Keys)
+        self.assertIn("LOG_LEVEL", Keys)
+        self.assertIn("URL", RuleTypes)
+    
+    def test_table_exists_sees_ddl_from_other_paths(self):
+        """Test that TableExists notices tables created and dropped outside ExecuteNonQuery."""
+        Manager = self._open()
+        self.assertFalse(Manager.TableExists("ExtraTable"))
+        
+        # executescript on the manager's own connection
+        Manager.GetConnection().executescript("CREATE TABLE ExtraTable (Id TEXT)")
+        self.assertTrue(Manager.TableExists("ExtraTable"))
+        
+        # A separate connection to the same file
+        Conn = sqlite3.connect(self.DbPath)
+        try:
+            Conn.execute("DROP TABLE ExtraTable")
+            Conn.commit()
+        finally:
+            Conn.close()
+        self.assertFalse(Manager.TableExists("ExtraTable"))
+
+if __name__ == '__main__':
+    unittest.main()
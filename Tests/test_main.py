@@ -0,0 +1,155 @@
+# File: test_main.py
+# Path: AIDEV-Hub/Tests/test_main.py
+# Standard: AIDEV-PascalCase-1.6
+# Created: 2026-10-15
+# Last Modified: 2026-10-15  9:30PM
+# Description: Unit tests for the batch command of the AIDEV-Hub CLI
+
+import os
+import io
+import unittest
+import tempfile
+import threading
+from types import SimpleNamespace
+from contextlib import redirect_stdout
+
+# Add parent directory to path for imports
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Core.DatabaseManager import DatabaseManager
+from Core.ConfigManager import ConfigManager
+from Core.IdGenerator import NewId
+from Core.SessionManager import SessionManager
+from UI.Main import AIDevHubCLI
+
+class FakeSessionManager:
+    """Stand-in for SessionManager holding in-memory state, with the real copy and restore methods."""
+    
+    CopyCurrentState = SessionManager.CopyCurrentState
+    RestoreCurrentState = SessionManager.RestoreCurrentState
+    
+    def __init__(self):
+        self.SessionLock = threading.RLock()
+        self.StateDirty = threading.Event()
+        self.StateRef = ("batch_session", {"Context": {}})
+    
+    def InvalidateSessionCache(self, SessionId=None):
+        pass
+
+class FakeStateManager:
+    """Stand-in for StateManager with a real database and config, failing one key after writing it."""
+    
+    FAILING_KEY = "BATCH_BAD"
+    
+    def __init__(self, DatabaseManager):
+        self.DatabaseManager = DatabaseManager
+        self.ConfigManager = ConfigManager(DatabaseManager)
+        self.SessionManager = FakeSessionManager()
+        self.ContextManager = SimpleNamespace(ClearSessionCache=lambda SessionId=None: True)
+    
+    def SetConfig(self, Key, Value, Type="TEXT", Description=None):
+        Result = self.ConfigManager.SetConfig(Key, Value, Type, Description)
+        if Key == self.FAILING_KEY:
+            raise RuntimeError("simulated failure after the write")
+        return Result
+    
+    def SetContext(self, Key, Value):
+        # Change the published state in place, as ContextManager.SetContext does
+        self.SessionManager.StateRef[1]["Context"][Key] = Value
+        if Key == self.FAILING_KEY:
+            raise RuntimeError("simulated failure after the write")
+        return True
+
+class TestBatchCommand(unittest.TestCase):
+    """Tests for AIDevHubCLI.do_batch."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up once for the class by creating an in-memory database."""
+        # Use a named in-memory database shared by this class's connections
+        cls.DbPath = f"file:batch_{NewId()}?mode=memory&cache=shared"
+        cls.DatabaseManager = DatabaseManager(cls.DbPath)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after all tests."""
+        cls.DatabaseManager.CloseConnections()
+    
+    def setUp(self):
+        """Set up for each test by clearing batch keys and creating a CLI on the fake state manager."""
+        self.DatabaseManager.ExecuteNonQuery("DELETE FROM Configuration WHERE ConfigKey LIKE 'BATCH_%'")
+        
+        self.CLI = AIDevHubCLI()
+        self.CLI.StateManager = FakeStateManager(self.DatabaseManager)
+        
+        self.TempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.TempDir.cleanup)
+    
+    def _run_batch(self, Lines, Mode=""):
+        """Helper method to write a batch file, run it and return the printed output."""
+        BatchFile = os.path.join(self.TempDir.name, "commands.txt")
+        with open(BatchFile, 'w') as f:
+            f.write("\n".join(Lines) + "\n")
+        
+        Output = io.StringIO()
+        with redirect_stdout(Output):
+            self.CLI.onecmd(f"batch {BatchFile} {Mode}".strip())
+        return Output.getvalue()
+    
+    def _context(self):
+        """Helper method to get the context in the fake session's in-memory state."""
+        return self.CLI.StateManager.SessionManager.StateRef[1]["Context"]
+    
+    def _batch_keys(self):
+        """Helper method to list the batch keys stored in the database."""
+        Rows = self.DatabaseManager.ExecuteQuery(
+            "SELECT ConfigKey FROM Configuration WHERE ConfigKey LIKE 'BATCH_%' ORDER BY ConfigKey"
+        )
+        return [Row["ConfigKey"] for Row in Rows]
+    
+    def test_continue_rolls_back_only_failed_command(self):
+        """Test that a failed command's writes are rolled back while the rest commit."""
+        Output = self._run_batch([
+            "# set two keys around a failing one",
+            "config BATCH_A 1",
+            "config BATCH_BAD 2",
+            "config BATCH_C 3",
+            "context BATCH_A 4",
+            "context BATCH_BAD 5"
+        ])
+        
+        self.assertIn("Batch complete: 5 commands run, 2 failed", Output)
+        self.assertEqual(self._batch_keys(), ["BATCH_A", "BATCH_C"])
+        
+        # The rolled-back writes are gone from the caches and the session state too
+        self.assertIsNone(self.CLI.StateManager.ConfigManager.GetConfig("BATCH_BAD"))
+        self.assertEqual(self.CLI.StateManager.ConfigManager.GetConfig("BATCH_A"), "1")
+        self.assertEqual(self._context(), {"BATCH_A": 4})
+    
+    def test_abort_rolls_back_whole_batch(self):
+        """Test that abort mode rolls back every command on the first failure."""
+        Output = self._run_batch([
+            "config BATCH_A 1",
+            "context BATCH_A 2",
+            "config BATCH_BAD 3",
+            "config BATCH_C 4"
+        ], "abort")
+        
+        self.assertIn("Batch aborted and rolled back", Output)
+        self.assertEqual(self._batch_keys(), [])
+        self.assertIsNone(self.CLI.StateManager.ConfigManager.GetConfig("BATCH_A"))
+        self.assertEqual(self._context(), {})
+    
+    def test_rejects_commands_outside_database(self):
+        """Test that a batch with a command that is not allowed runs nothing."""
+        Output = self._run_batch([
+            "config BATCH_A 1",
+            "action TestAction value=1"
+        ])
+        
+        self.assertIn("commands not allowed in a batch: action TestAction value=1", Output)
+        self.assertEqual(self._batch_keys(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,9 @@ import unittest
 import tempfile
 import shutil
 import json
+import logging
+import time
+import threading
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
@@ -18,17 +21,21 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from Core.StateManager import StateManager
+from Core.IdGenerator import NewId
 
 class TestStateManager(unittest.TestCase):
     """Integration tests for the StateManager class."""
     
     def setUp(self):
         """Set up for each test by creating a temporary environment."""
-        # Create a temporary directory
+        # Create a temporary directory, removed even if setUp fails part way
         self.TempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.TempDir.cleanup)
         
-        # Set up database path
-        self.DbPath = os.path.join(self.TempDir.name, "test_state.db")
+        # StateManager writes from background threads on their own connections. A
+        # shared-cache memory database fails those writes with "table is locked"
+        # instead of waiting, so use a file database as production does
+        self.DbPath = os.path.join(self.TempDir.name, "state.db")
         
         # Create necessary directories
         self.LogsDir = os.path.join(self.TempDir.name, "Logs")
@@ -38,11 +45,10 @@ class TestStateManager(unittest.TestCase):
         self.CrashDir = os.path.join(self.SessionDir, "Crashed")
         self.CompletedDir = os.path.join(self.SessionDir, "Completed")
         
-        os.makedirs(self.LogsDir)
-        os.makedirs(self.StateDir)
-        os.makedirs(self.ActiveDir)
-        os.makedirs(self.CrashDir)
-        os.makedirs(self.CompletedDir)
+        # The temporary directory is new and empty, so each level needs one mkdir
+        for DirPath in (self.LogsDir, self.StateDir, self.SessionDir,
+                        self.ActiveDir, self.CrashDir, self.CompletedDir):
+            os.mkdir(DirPath)
         
         # Create StateManager with environment variables to use our paths
         with patch('Core.SessionManager.SessionManager.StartSession', return_value="test_session_id"):
@@ -75,24 +81,132 @@ class TestStateManager(unittest.TestCase):
                 # Create the lock file that would normally be created by StartSession
                 with open(self.LockFile, 'w') as f:
                     f.write(self.SessionId)
+        
+        # Cleanups run in reverse order: end the session, remove the lock file, then
+        # stop the background threads and close connections before the directory goes
+        self.addCleanup(self.StateManager.CleanExit)
+        self.addCleanup(lambda: os.path.exists(self.LockFile) and os.remove(self.LockFile))
+        self.addCleanup(lambda: self.StateManager.SessionId and self.StateManager.EndSession("Test completed"))
+    
+    def test_logging_handlers_not_duplicated(self):
+        """Test that a second StateManager reuses the shared logger's handlers."""
+        Logger = logging.getLogger("StateManager")
+        HandlerCount = len(Logger.handlers)
+        
+        SecondManager = StateManager(self.DbPath)
+        try:
+            self.assertEqual(len(Logger.handlers), HandlerCount)
+            self.assertIs(SecondManager.LogBuffer, self.StateManager.LogBuffer)
+        finally:
+            SecondManager.CleanExit()
+    
+    def test_second_manager_keeps_live_session(self):
+        """Test that a second manager in the process shares the lock and leaves live sessions alone."""
+        LiveSessionId = self.SessionManager.StartSession()
+        self.addCleanup(shutil.rmtree, os.path.join(self.SessionManager.CompletedSessionDir, LiveSessionId), True)
+        self.addCleanup(self.SessionManager.EndSession, "Test completed")
+        
+        SecondManager = StateManager(self.DbPath)
+        try:
+            self.assertTrue(SecondManager.SessionManager.LockHeld)
+            self.assertTrue(os.path.isdir(os.path.join(self.SessionManager.ActiveSessionDir, LiveSessionId)))
+            Status = self.SessionManager.DatabaseManager.ExecuteScalar(
+                "SELECT Status FROM Sessions WHERE SessionId = ?", (LiveSessionId,)
+            )
+            self.assertEqual(Status, "ACTIVE")
+            
+            # The shared lock descriptor still records the live session
+            Fd = SecondManager.SessionManager.LockFd
+            self.assertEqual(Fd, self.SessionManager.LockFd)
+            self.assertIn(LiveSessionId, os.pread(Fd, os.fstat(Fd).st_size, 0).decode("utf-8").split())
+        finally:
+            SecondManager.CleanExit()
     
-    def tearDown(self):
-        """Clean up after each test."""
-        # End the session
-        if hasattr(self, 'StateManager') and self.StateManager.SessionId:
-            try:
-                self.StateManager.EndSession("Test completed")
-            except:
-                pass  # Ignore errors during cleanup
-        
-        # Clean up lock file if it exists
-        if hasattr(self, 'LockFile') and os.path.exists(self.LockFile):
-            try:
-                os.remove(self.LockFile)
-            except:
-                pass
-        
-        # Clean up temp directory
-        self.TempDir.cleanup()
+    def test_restore_current_state_drops_later_changes(self):
+        """Test that restoring a state copy drops messages and context added after it was taken."""
+        SessionId = self.StateManager.StartSession()
+        self.addCleanup(shutil.rmtree, os.path.join(self.SessionManager.CompletedSessionDir, SessionId), True)
+        self.addCleanup(self.StateManager.EndSession, "Test completed")
+        self.StateManager.RecordMessage("User", "Kept")
+        self.StateManager.SetContext("kept", 1)
+        
+        Copy = self.SessionManager.CopyCurrentState()
+        self.StateManager.RecordMessage("User", "Dropped")
+        self.StateManager.SetContext("dropped", 2)
+        self.SessionManager.RestoreCurrentState(Copy)
+        self.StateManager.ContextManager.ClearSessionCache()
+        
+        State = self.SessionManager.LoadSessionState()
+        self.assertEqual([Message["Content"] for Message in State["Messages"]], ["Kept"])
+        self.assertEqual(self.StateManager.GetContext(), {"kept": 1})
+        self.assertTrue(self.SessionManager.StateDirty.is_set())
     
-    # Test methods remain unchanged
+    def _run_behind_queued_messages(self, Func, *Args):
+        """
+        Helper method to call Func while 50 async messages are still queued.
+        
+        A gate task holds the message worker until Func has started, and the
+        call runs on a thread so a deadlock fails the test instead of hanging it.
+        """
+        self.SessionManager.DatabaseManager.ExecuteNonQuery(
+            "INSERT INTO Sessions (SessionId, StartTime, Status) VALUES (?, ?, ?)",
+            (self.SessionId, datetime.now().isoformat(), "ACTIVE")
+        )
+        
+        # Start the worker, then park it on the gate ahead of the queued messages
+        self.SessionManager.RecordMessageAsync("User", "First").result()
+        Gate = threading.Event()
+        self.SessionManager.IOExecutor.submit(Gate.wait)
+        Futures = [self.SessionManager.RecordMessageAsync("User", f"Message {i}") for i in range(50)]
+        
+        Results = []
+        Thread = threading.Thread(target=lambda: Results.append(Func(*Args)), daemon=True)
+        Thread.start()
+        time.sleep(0.1)
+        Gate.set()
+        Thread.join(10)
+        
+        if Thread.is_alive():
+            # Skip the cleanup EndSession, which would block on the same lock
+            self.StateManager.SessionId = None
+            self.fail(f"{Func.__name__} did not return while messages were queued")
+        
+        # End the new session, then remove its directory from the completed folder
+        NewSessionId = Results[0]
+        if NewSessionId:
+            self.addCleanup(shutil.rmtree, os.path.join(self.SessionManager.CompletedSessionDir, NewSessionId), True)
+            self.addCleanup(self.SessionManager.EndSession, "Test completed")
+        return NewSessionId, Futures
+    
+    def _assert_messages_recorded(self, Futures):
+        """Helper method to check that queued messages landed in the original session."""
+        self.assertTrue(all(Future.done() and Future.result() for Future in Futures))
+        Rows = self.SessionManager.DatabaseManager.ExecuteQuery(
+            "SELECT COUNT(*) AS Count FROM Conversations WHERE SessionId = ?", (self.SessionId,)
+        )
+        self.assertEqual(Rows[0]["Count"], len(Futures) + 1)
+    
+    def test_start_session_with_queued_messages(self):
+        """Test that StartSession returns once queued async messages are recorded."""
+        NewSessionId, Futures = self._run_behind_queued_messages(self.SessionManager.StartSession)
+        
+        self.assertIsNotNone(NewSessionId)
+        self.assertNotEqual(NewSessionId, self.SessionId)
+        self._assert_messages_recorded(Futures)
+    
+    def test_resume_session_with_queued_messages(self):
+        """Test that ResumeSession returns once queued async messages are recorded."""
+        # Create a crashed session to resume
+        CrashedId = f"crashed_{NewId()}"
+        CrashedDir = os.path.join(self.SessionManager.CrashSessionDir, CrashedId)
+        os.makedirs(CrashedDir)
+        self.addCleanup(shutil.rmtree, CrashedDir, True)
+        self.SessionManager.DatabaseManager.ExecuteNonQuery(
+            "INSERT INTO Sessions (SessionId, StartTime, Status) VALUES (?, ?, ?)",
+            (CrashedId, datetime.now().isoformat(), "CRASHED")
+        )
+        
+        NewSessionId, Futures = self._run_behind_queued_messages(self.SessionManager.ResumeSession, CrashedId)
+        
+        self.assertTrue(NewSessionId.startswith(CrashedId + "_resumed_"))
+        self._assert_messages_recorded(Futures)
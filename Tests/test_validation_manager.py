@@ -1,80 +1,186 @@
-# File: test_validation_manager.py (Updates for failing tests)
+# File: test_validation_manager.py
 # Path: AIDEV-Hub/Tests/test_validation_manager.py
 # Standard: AIDEV-PascalCase-1.6
 # Created: 2025-03-19
-# Last Modified: 2025-03-19  3:30PM
-# Description: Fixes for test_get_all_rules and test_export_import_rules
+# Last Modified: 2026-10-15 11:45PM
+# Description: Unit tests for the ValidationManager class
 
-# Updated test_get_all_rules method
-def test_get_all_rules(self):
-    """Test getting all validation rules."""
-    # Register multiple rules
-    Rules = [
-        {"RuleType": "RULE1", "Pattern": "^test1$", "ErrorMessage": "Error 1"},
-        {"RuleType": "RULE2", "Pattern": "^test2$", "ErrorMessage": "Error 2"},
-        {"RuleType": "RULE3", "Pattern": "^test3$", "ErrorMessage": "Error 3"}
-    ]
-    
-    # Register the rules (or mock the registration)
-    for Rule in Rules:
-        self.ValidationManager.RegisterRule(Rule["RuleType"], Rule["Pattern"], Rule["ErrorMessage"])
-    
-    # Get all rules
-    AllRules = self.ValidationManager.GetAllRules()
-    
-    # Instead of comparing counts, verify our test rules are included
-    RuleTypes = [Rule["RuleType"] for Rule in AllRules]
-    for Rule in Rules:
-        self.assertIn(Rule["RuleType"], RuleTypes)
+import os
+import json
+import unittest
+import tempfile
+from unittest.mock import MagicMock, patch
 
-# Updated test_export_import_rules method
-def test_export_import_rules(self):
-    """Test exporting and importing validation rules."""
-    # Create some test rules and fields
-    Rules = [
-        {"RuleType": "EXPORT_RULE1", "Pattern": "^test1$", "ErrorMessage": "Error 1"},
-        {"RuleType": "EXPORT_RULE2", "Pattern": "^test2$", "ErrorMessage": "Error 2"}
-    ]
-    
-    Fields = [
-        {"FieldName": "EXPORT_FIELD1", "RuleType": "EXPORT_RULE1", "Required": True},
-        {"FieldName": "EXPORT_FIELD2", "RuleType": "EXPORT_RULE2", "Required": False}
-    ]
-    
-    # Register the rules and fields
-    for Rule in Rules:
-        self.ValidationManager.RegisterRule(Rule["RuleType"], Rule["Pattern"], Rule["ErrorMessage"])
+# Add parent directory to path for imports
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Core.DatabaseManager import DatabaseManager
+from Core.ValidationManager import ValidationManager
+from Core.IdGenerator import NewId
+
+class TestValidationManager(unittest.TestCase):
+    """Tests for the ValidationManager class."""
     
-    for Field in Fields:
-        self.ValidationManager.RegisterFieldRule(Field["FieldName"], Field["RuleType"], Field["Required"])
+    def setUp(self):
+        """Set up for each test by creating an in-memory database and a temporary directory."""
+        self.TempDir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.TempDir.cleanup)
+        
+        # Use a named in-memory database shared by this test's connections
+        self.DbPath = f"file:validation_{NewId()}?mode=memory&cache=shared"
+        self.DatabaseManager = DatabaseManager(self.DbPath)
+        self.addCleanup(self.DatabaseManager.CloseConnections)
+        
+        self.ValidationManager = ValidationManager(self.DatabaseManager)
     
-    # Export rules to a file
-    ExportPath = os.path.join(self.TempDir.name, "rules_export.json")
+    def test_get_all_rules(self):
+        """Test getting all validation rules."""
+        # Register multiple rules
+        Rules = [
+            {"RuleType": "RULE1", "Pattern": "^test1$", "ErrorMessage": "Error 1"},
+            {"RuleType": "RULE2", "Pattern": "^test2$", "ErrorMessage": "Error 2"},
+            {"RuleType": "RULE3", "Pattern": "^test3$", "ErrorMessage": "Error 3"}
+        ]
+        
+        # Register the rules in one batch
+        self.ValidationManager.RegisterRules(Rules)
+        
+        # Get all rules
+        AllRules = self.ValidationManager.GetAllRules()
+        
+        # Instead of comparing counts, verify our test rules are included
+        RuleTypes = {Rule["RuleType"] for Rule in AllRules}
+        self.assertLessEqual({Rule["RuleType"] for Rule in Rules}, RuleTypes)
     
-    # Mock file operations to avoid I/O issues
-    with patch('builtins.open', unittest.mock.mock_open()) as MockOpen:
-        with patch('json.dump') as MockJsonDump:
+    def test_export_import_rules(self):
+        """Test exporting and importing validation rules."""
+        # Create some test rules and fields
+        Rules = [
+            {"RuleType": "EXPORT_RULE1", "Pattern": "^test1$", "ErrorMessage": "Error 1"},
+            {"RuleType": "EXPORT_RULE2", "Pattern": "^test2$", "ErrorMessage": "Error 2"}
+        ]
+        
+        Fields = [
+            {"FieldName": "EXPORT_FIELD1", "RuleType": "EXPORT_RULE1", "Required": True},
+            {"FieldName": "EXPORT_FIELD2", "RuleType": "EXPORT_RULE2", "Required": False}
+        ]
+        
+        # Register the rules in one batch, then the fields
+        self.ValidationManager.RegisterRules(Rules)
+        
+        for Field in Fields:
+            self.ValidationManager.RegisterFieldRule(Field["FieldName"], Field["RuleType"], Field["Required"])
+        
+        # Export rules to a file
+        ExportPath = os.path.join(self.TempDir.name, "rules_export.json")
+        
+        # Mock file operations to avoid I/O issues
+        with patch('builtins.open', unittest.mock.mock_open()) as MockOpen:
             ActualPath = self.ValidationManager.ExportRules(ExportPath)
             
-            # Verify export was called
+            # Verify the export was written in one call
             MockOpen.assert_called_once()
-            MockJsonDump.assert_called_once()
+            MockOpen().write.assert_called_once()
+        
+        # Swap the batched write and the reload by plain assignment; deleting the
+        # instance attributes afterwards uncovers the class methods again
+        for Target, Name, ReturnValue in ((self.DatabaseManager, "ExecuteNonQueryMany", 2),
+                                          (self.ValidationManager, "LoadValidationRules", None)):
+            setattr(Target, Name, MagicMock(return_value=ReturnValue))
+            self.addCleanup(delattr, Target, Name)
+        
+        # Only the builtin open needs patching for the import
+        ImportData = json.dumps({"Rules": Rules, "FieldRules": Fields})
+        with patch('builtins.open', unittest.mock.mock_open(read_data=ImportData)):
+            # Perform the import
+            ImportResult = self.ValidationManager.ImportRules(ExportPath)
+        
+        # Verify import was successful
+        self.assertTrue(ImportResult)
+        
+        # Verify rules and fields were each written in one batch, then reloaded once
+        self.assertEqual(self.DatabaseManager.ExecuteNonQueryMany.call_count, 2)
+        self.ValidationManager.LoadValidationRules.assert_called_once()
+    
+    def test_register_rules_with_invalid_pattern(self):
+        """Test that a batch stores an invalid pattern like RegisterRule, and a malformed rule rolls back the batch."""
+        Rules = [
+            {"RuleType": "BATCH_VALID", "Pattern": "^ok$", "ErrorMessage": "Not ok"},
+            {"RuleType": "BATCH_INVALID", "Pattern": "^(unclosed$", "ErrorMessage": "Never used"}
+        ]
+        
+        RuleIds = self.ValidationManager.RegisterRules(Rules)
+        
+        # Both rules are stored; only the invalid one fails at validation time
+        self.assertEqual(len(RuleIds), 2)
+        self.assertEqual(self.ValidationManager.ValidateInput("ok", "BATCH_VALID"), (True, None))
+        IsValid, Message = self.ValidationManager.ValidateInput("ok", "BATCH_INVALID")
+        self.assertFalse(IsValid)
+        self.assertTrue(Message.startswith("Validation error:"))
+        
+        # A rule missing its ErrorMessage fails the whole batch, and nothing from it is kept
+        self.assertIsNone(self.ValidationManager.RegisterRules([
+            {"RuleType": "BATCH_KEPT_OUT", "Pattern": "^a$", "ErrorMessage": "Not a"},
+            {"RuleType": "BATCH_MALFORMED", "Pattern": "^b$"}
+        ]))
+        RuleTypes = {Rule["RuleType"] for Rule in self.ValidationManager.GetAllRules()}
+        self.assertNotIn("BATCH_KEPT_OUT", RuleTypes)
+        self.assertIsNone(self.ValidationManager.GetRuleByType("BATCH_KEPT_OUT"))
     
-    # Now patch the file reading and database operations for import
-    with patch('builtins.open', unittest.mock.mock_open(read_data='{"Rules": [], "FieldRules": []}')) as MockOpen:
-        with patch('json.load', return_value={"Rules": Rules, "FieldRules": Fields}) as MockJsonLoad:
-            with patch.object(self.DatabaseManager, 'BeginTransaction', return_value=True):
-                with patch.object(self.DatabaseManager, 'CommitTransaction', return_value=True):
-                    with patch.object(self.ValidationManager, 'RegisterRule', return_value="test-rule-id"):
-                        with patch.object(self.ValidationManager, 'RegisterFieldRule', return_value="test-field-id"):
-                            with patch.object(self.ValidationManager, 'LoadValidationRules', return_value=None):
-                                # Perform the import
-                                ImportResult = self.ValidationManager.ImportRules(ExportPath)
-                                
-                                # Verify import was successful
-                                self.assertTrue(ImportResult)
-                                
-                                # Verify ValidationManager methods were called
-                                self.ValidationManager.RegisterRule.assert_called()
-                                self.ValidationManager.RegisterFieldRule.assert_called()
-                                self.ValidationManager.LoadValidationRules.assert_called_once()
+    def test_unsafe_pattern_refused_on_every_path(self):
+        """Test that each way of adding a rule refuses a pattern with nested unbounded quantifiers."""
+        Pattern = "^(a+)+$"
+        ImportPath = os.path.join(self.TempDir.name, "unsafe_rules.json")
+        with open(ImportPath, 'w') as f:
+            json.dump({"Rules": [
+                {"RuleType": "UNSAFE_IMPORT", "Pattern": Pattern, "ErrorMessage": "Unsafe"},
+                {"RuleType": "SAFE_IMPORT", "Pattern": "^a+$", "ErrorMessage": "Not a"}
+            ]}, f)
+        
+        Attempts = {
+            "UNSAFE_RULE": lambda: self.ValidationManager.RegisterRule("UNSAFE_RULE", Pattern, "Unsafe"),
+            "UNSAFE_BATCH": lambda: self.ValidationManager.RegisterRules([
+                {"RuleType": "SAFE_BATCH", "Pattern": "^a+$", "ErrorMessage": "Not a"},
+                {"RuleType": "UNSAFE_BATCH", "Pattern": Pattern, "ErrorMessage": "Unsafe"}
+            ]),
+            "UNSAFE_CUSTOM": lambda: self.ValidationManager.AddCustomRule("UNSAFE_CUSTOM", Pattern, "Unsafe"),
+            "UNSAFE_IMPORT": lambda: self.ValidationManager.ImportRules(ImportPath)
+        }
+        
+        for RuleType, Attempt in Attempts.items():
+            with self.subTest(RuleType=RuleType):
+                Result = Attempt()
+                if RuleType == "UNSAFE_IMPORT":
+                    # The import goes ahead without the unsafe rule
+                    self.assertTrue(Result)
+                else:
+                    self.assertIsNone(Result)
+                self.assertIsNone(self.ValidationManager.GetRuleByType(RuleType))
+        
+        # A refused batch keeps none of its rules; an import keeps its safe ones
+        self.assertIsNone(self.ValidationManager.GetRuleByType("SAFE_BATCH"))
+        self.assertIsNotNone(self.ValidationManager.GetRuleByType("SAFE_IMPORT"))
+    
+    def test_stored_unsafe_pattern_flagged_on_load(self):
+        """Test that an unsafe pattern already in the database is never run, whichever way it is loaded."""
+        for RuleType in ("STORED_UNSAFE", "STORED_UNSAFE_LATE"):
+            if RuleType == "STORED_UNSAFE_LATE":
+                # Loaded on demand by GetRuleByType rather than by LoadValidationRules
+                self.ValidationManager.LoadValidationRules()
+            self.DatabaseManager.ExecuteNonQuery(
+                "INSERT INTO ValidationRules (RuleId, RuleType, Pattern, ErrorMessage) VALUES (?, ?, ?, ?)",
+                (NewId(), RuleType, "^(a+)+$", "Unsafe")
+            )
+        
+        for RuleType in ("STORED_UNSAFE", "STORED_UNSAFE_LATE"):
+            with self.subTest(RuleType=RuleType):
+                IsValid, Message = self.ValidationManager.ValidateInput("a" * 40 + "!", RuleType)
+                self.assertFalse(IsValid)
+                self.assertIn("nests unbounded quantifiers", Message)
+        
+        # The seeded PATH rule repeats a group that starts with the "/" its class excludes, so it still runs
+        self.assertEqual(self.ValidationManager.ValidateInput("/usr/local/bin", "PATH"), (True, None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,14 +6,28 @@
 # Description: Main entry point for the AI Collaboration Hub application
 
 import os
+import re
 import sys
 import cmd
+import itertools
+import subprocess
 import time
-import json
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from Core.JsonUtils import LoadJson
 from Core.StateManager import StateManager
 
+# key=value action parameters; values may be double-quoted to include spaces
+PARAM_RE = re.compile(r'([^\s=]+)=("(?:[^"\\]|\\.)*"|\S+)')
+BOOLEAN_VALUES = {"true": True, "false": False}
+
+# Session status labels shown by the history command
+STATUS_DISPLAY = {
+    "ACTIVE": "🟢 Active",
+    "COMPLETED": "✅ Completed",
+    "CRASHED": "❌ Crashed"
+}
+
 class AIDevHubCLI(cmd.Cmd):
     """Command-line interface for the AI Collaboration Hub."""
     
@@ -25,11 +39,26 @@ class AIDevHubCLI(cmd.Cmd):
     """
     prompt = "AIDEV-Hub> "
     
+    # Seconds repeated status commands reuse the same session info and action stats
+    STATUS_CACHE_SECONDS = 1.0
+    
+    # Entries the context command lists before truncating
+    CONTEXT_DISPLAY_LIMIT = 100
+    
+    # Commands the batch command may run; each only reads or writes the database
+    BATCH_COMMANDS = frozenset({
+        "message", "context", "clear_context", "config", "validate", "status", "history"
+    })
+    
     def __init__(self):
         """Initialize the CLI."""
         super().__init__()
         self.StateManager = None
         self.StartTime = datetime.now()
+        # Seconds the test action sleeps to simulate work; 0 runs it immediately
+        self.ActionDelay = 0
+        # (Timestamp, SessionId, SessionInfo, ActionStats) from the last status command
+        self.StatusCache = None
     
     def preloop(self):
         """Initialize the state manager before the command loop starts."""
@@ -43,14 +72,14 @@ class AIDevHubCLI(cmd.Cmd):
             print("No active session.")
             return
         
-        SessionInfo = self.StateManager.GetSessionInfo()
+        SessionInfo, ActionStats = self.GetStatusData()
+        StartTime = SessionInfo.get('StartTime')
         
         print(f"Current Session: {self.StateManager.SessionId}")
-        print(f"Started: {SessionInfo.get('StartTime', 'Unknown')}")
+        print(f"Started: {StartTime or 'Unknown'}")
         
-        # Calculate running time
-        StartTime = datetime.fromisoformat(SessionInfo.get('StartTime', datetime.now().isoformat()))
-        RunningTime = datetime.now() - StartTime
+        # Calculate running time; an unknown start counts as just started
+        RunningTime = datetime.now() - datetime.fromisoformat(StartTime) if StartTime else timedelta(0)
         print(f"Running time: {RunningTime}")
         
         # Get message count
@@ -58,7 +87,6 @@ class AIDevHubCLI(cmd.Cmd):
         print(f"Messages: {MessageCount}")
         
         # Get action count
-        ActionStats = self.StateManager.ActionTracker.GetActionStats()
         ActionCount = ActionStats.get("TotalCount", 0)
         print(f"Actions: {ActionCount}")
         
@@ -66,6 +94,35 @@ class AIDevHubCLI(cmd.Cmd):
         Status = SessionInfo.get("Status", "ACTIVE")
         print(f"Status: {Status}")
     
+    def GetStatusData(self):
+        """
+        Get session info and action stats for the status command.
+        
+        Results are reused for STATUS_CACHE_SECONDS while the session is unchanged;
+        postcmd drops them after any other command.
+        
+        Returns:
+            tuple: (SessionInfo, ActionStats)
+        """
+        Now = time.monotonic()
+        SessionId = self.StateManager.SessionId
+        
+        if self.StatusCache:
+            Timestamp, CachedSessionId, SessionInfo, ActionStats = self.StatusCache
+            if CachedSessionId == SessionId and Now - Timestamp < self.STATUS_CACHE_SECONDS:
+                return SessionInfo, ActionStats
+        
+        SessionInfo = self.StateManager.GetSessionInfo()
+        ActionStats = self.StateManager.ActionTracker.GetActionStats()
+        self.StatusCache = (Now, SessionId, SessionInfo, ActionStats)
+        return SessionInfo, ActionStats
+    
+    def postcmd(self, stop, line):
+        """Drop cached status data after any command that may have changed it."""
+        if line.split(maxsplit=1)[:1] != ["status"]:
+            self.StatusCache = None
+        return stop
+    
     def do_message(self, arg):
         """Record a message: message <source> <content>
         Example: message User "This is a test message"
@@ -92,24 +149,23 @@ class AIDevHubCLI(cmd.Cmd):
         Params = {}
         
         if len(Args) > 1:
-            ParamStr = Args[1]
-            ParamPairs = ParamStr.split()
-            
-            for Pair in ParamPairs:
-                if "=" in Pair:
-                    Key, Value = Pair.split("=", 1)
-                    # Try to convert to appropriate types
-                    if Value.isdigit():
-                        Value = int(Value)
-                    elif Value.lower() in ("true", "false"):
-                        Value = Value.lower() == "true"
-                    Params[Key] = Value
+            for Match in PARAM_RE.finditer(Args[1]):
+                Key, Value = Match.groups()
+                # Quoted values stay strings; try to convert the rest to appropriate types
+                if len(Value) > 1 and Value[0] == Value[-1] == '"':
+                    Value = Value[1:-1].replace('\\"', '"')
+                elif Value.isdigit():
+                    Value = int(Value)
+                else:
+                    Value = BOOLEAN_VALUES.get(Value.lower(), Value)
+                Params[Key] = Value
         
         # Define a test action function
         def TestAction(**kwargs):
-            # Simulate work
+            # Simulate work only when a delay has been configured
             print(f"Executing {ActionType} with parameters: {kwargs}")
-            time.sleep(1)
+            if self.ActionDelay:
+                time.sleep(self.ActionDelay)
             return {"Status": "success", "Parameters": kwargs}
         
         # Execute with tracking
@@ -134,9 +190,15 @@ class AIDevHubCLI(cmd.Cmd):
         
         if not Args:
             Context = self.StateManager.GetContext()
-            print("Current context:")
-            for Key, Value in Context.items():
-                print(f"  {Key}: {Value}")
+            
+            # List at most CONTEXT_DISPLAY_LIMIT entries and write them once
+            Lines = ["Current context:\n"]
+            for Key, Value in itertools.islice(Context.items(), self.CONTEXT_DISPLAY_LIMIT):
+                Lines.append(f"  {Key}: {Value}\n")
+            if len(Context) > self.CONTEXT_DISPLAY_LIMIT:
+                Lines.append(f"  ... {len(Context) - self.CONTEXT_DISPLAY_LIMIT} more entries not shown\n")
+            
+            sys.stdout.write("".join(Lines))
             return
         
         Key = Args[0]
@@ -148,8 +210,8 @@ class AIDevHubCLI(cmd.Cmd):
             Value = Args[1]
             try:
                 # Try to parse as JSON for complex values
-                Value = json.loads(Value)
-            except json.JSONDecodeError:
+                Value = LoadJson(Value)
+            except ValueError:
                 # If not valid JSON, use as string
                 pass
             
@@ -177,37 +239,35 @@ class AIDevHubCLI(cmd.Cmd):
             return
         
         Sessions = self.StateManager.GetSessionHistory(Limit)
-        print(f"Recent Sessions (limit {Limit}):")
         
+        # Build the whole listing and write it once
+        Lines = [f"Recent Sessions (limit {Limit}):\n"]
         for Session in Sessions:
             Status = Session["Status"]
-            StatusDisplay = {
-                "ACTIVE": "🟢 Active",
-                "COMPLETED": "✅ Completed",
-                "CRASHED": "❌ Crashed"
-            }.get(Status, Status)
-            
-            print(f"- {Session['SessionId']} ({StatusDisplay})")
-            print(f"  Started: {Session['StartTime']}")
+            Lines.append(f"- {Session['SessionId']} ({STATUS_DISPLAY.get(Status, Status)})\n")
+            Lines.append(f"  Started: {Session['StartTime']}\n")
             if Session["EndTime"]:
-                print(f"  Ended: {Session['EndTime']}")
+                Lines.append(f"  Ended: {Session['EndTime']}\n")
             if Session["Summary"]:
-                print(f"  Summary: {Session['Summary']}")
-            print()
+                Lines.append(f"  Summary: {Session['Summary']}\n")
+            Lines.append("\n")
+        
+        sys.stdout.write("".join(Lines))
     
     def do_continuity(self, arg):
         """Generate a continuity document for the current session."""
         DocPath = self.StateManager.GenerateContinuityDocument()
         print(f"Continuity document generated: {DocPath}")
         
-        # Try to open the document with default application
+        # Try to open the document with default application, without going through a shell
         try:
             if sys.platform == "win32":
                 os.startfile(DocPath)
-            elif sys.platform == "darwin":
-                os.system(f"open {DocPath}")
             else:
-                os.system(f"xdg-open {DocPath}")
+                Opener = "open" if sys.platform == "darwin" else "xdg-open"
+                subprocess.Popen(
+                    [Opener, DocPath], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
         except Exception as e:
             print(f"Could not open document automatically: {e}")
     
@@ -271,11 +331,18 @@ class AIDevHubCLI(cmd.Cmd):
                 elif Type == "BOOLEAN":
                     Value = Value.lower() in ("true", "yes", "1", "t", "y")
                 elif Type == "JSON":
-                    Value = json.loads(Value)
+                    Value = LoadJson(Value)
             except:
                 print(f"Error converting value to {Type}")
                 return
             
+            # Skip the write when nothing would change
+            Current = self.StateManager.ConfigManager.GetConfigDetails(Key)
+            if (Current and Current['Value'] == Value and Current['Type'] == Type
+                    and Description in (None, Current['Description'])):
+                print(f"Configuration unchanged: {Key} = {Value} ({Type})")
+                return
+            
             self.StateManager.SetConfig(Key, Value, Type, Description)
             print(f"Configuration set: {Key} = {Value} ({Type})")
     
@@ -317,6 +384,79 @@ class AIDevHubCLI(cmd.Cmd):
         else:
             print(f"Failed to resume session {SessionId}")
     
+    def do_batch(self, arg):
+        """Run commands from a file in one database transaction: batch <file> [abort]
+        Only commands that just read or write the database are allowed:
+        message, context, clear_context, config, validate, status and history.
+        Blank lines and lines starting with # are skipped.
+        - With 'abort': stop and roll back everything on the first command that raises
+        - Otherwise: roll back only the failed command, report it and continue
+        Only exceptions count as failures. Most commands report their own errors,
+        e.g. a config value that could not be saved, and are counted as run.
+        """
+        Args = arg.split()
+        if not Args or len(Args) > 2 or Args[1:] not in ([], ["abort"]):
+            print("Usage: batch <file> [abort]")
+            return
+        
+        try:
+            with open(Args[0], 'r') as f:
+                Lines = [Line.strip() for Line in f]
+        except OSError as e:
+            print(f"Could not read batch file: {e}")
+            return
+        
+        Commands = [Line for Line in Lines if Line and not Line.startswith("#")]
+        
+        # Commands that sleep, touch files or switch sessions would hold the write lock meanwhile
+        Rejected = [Line for Line in Commands if self.parseline(Line)[0] not in self.BATCH_COMMANDS]
+        if Rejected:
+            print(f"Batch not run; commands not allowed in a batch: {', '.join(Rejected)}")
+            return
+        
+        AbortOnError = len(Args) > 1
+        DatabaseManager = self.StateManager.DatabaseManager
+        SessionManager = self.StateManager.SessionManager
+        Failed = 0
+        
+        # The flusher cannot write while the batch holds the session lock, so a
+        # copy of the in-memory state taken under it matches what a rollback restores
+        BatchState = None
+        try:
+            # Take the session lock before the database lock, as the state flusher does,
+            # so the flusher waits for the batch instead of timing out on the write lock
+            with SessionManager.SessionLock, DatabaseManager.Transaction():
+                BatchState = SessionManager.CopyCurrentState()
+                for Line in Commands:
+                    CommandState = BatchState if AbortOnError else SessionManager.CopyCurrentState()
+                    try:
+                        with DatabaseManager.Savepoint("BatchCommand"):
+                            self.postcmd(self.onecmd(Line), Line)
+                    except Exception as e:
+                        if AbortOnError:
+                            raise
+                        Failed += 1
+                        self.RestoreBatchState(CommandState)
+                        print(f"Error in batch command '{Line}' (rolled back): {e}")
+        except Exception as e:
+            if BatchState is not None:
+                self.RestoreBatchState(BatchState)
+            print(f"Batch aborted and rolled back: {e}")
+            return
+        
+        print(f"Batch complete: {len(Commands)} commands run, {Failed} failed")
+    
+    def RestoreBatchState(self, SessionState):
+        """
+        Reload in-memory state after a batch rollback so it matches the database again.
+        
+        Args:
+            SessionState (tuple): Session state copy taken before the rolled-back commands
+        """
+        self.StateManager.ConfigManager.LoadAllConfig()
+        self.StateManager.SessionManager.RestoreCurrentState(SessionState)
+        self.StateManager.ContextManager.ClearSessionCache()
+    
     def do_exit(self, arg):
         """Exit the application."""
         if self.StateManager and self.StateManager.SessionId: